@@ -3,15 +3,55 @@ from __future__ import annotations
 
 import json
 import random
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import (
+    TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar, Union,
+)
 
-# Mantém os imports exatamente no padrão atual do projeto
-from engligen.core.crossword import Crossword
-from engligen.core.wordsearch import WordSearch
-from engligen.rendering.clue_generator import ClueGenerator
-from engligen.rendering.crossword_renderer import CrosswordRenderer
-from engligen.rendering.wordsearch_renderer import WordSearchRenderer
+# Só módulos leves no topo: engines, renderizadores (Pillow), multiprocessing e
+# sqlite3 são importados na primeira geração, para o menu/CLI abrir rápido.
+from engligen.core.wordbank import COMMON, THEMED, WordBank
+from engligen.storage.bank_cache import CompiledBank, load_bank, read_bank_items
+from engligen.storage.history import UsageHistory
+from engligen.storage.usage_bitmap import load_used_bits
+
+if TYPE_CHECKING:
+    from engligen.core.crossword import Crossword
+    from engligen.core.wordsearch import WordSearch
+    from engligen.rendering.vector_renderer import Scene
+    from engligen.storage.puzzle_cache import PuzzleCache
+    from engligen.storage.sqlite_store import SQLiteWordStore
+
+
+OUTPUT_FORMATS = ("png", "svg", "pdf")
+AUTO_TEMPLATE = "auto"  # gerar_crossword(template="auto"): molde simétrico sorteado
+RESERVE_ATTEMPTS = 3  # gerações seguidas quando outra execução leva as palavras antes
+T = TypeVar("T")
+
+
+class _UsageConflict(Exception):
+    """Outra execução registrou alguma palavra do puzzle antes desta: nada foi gravado."""
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    """Prazo (time.monotonic()) vencido? Avisa: o puzzle será descartado sem tocar no histórico."""
+    if deadline is None or time.monotonic() <= deadline:
+        return False
+    print("⏱️  Prazo esgotado: puzzle descartado (histórico não alterado).")
+    return True
+
+
+def _seed_value(seed):
+    """Seed normalizada: inteiro se for numérica ("42" == 42), senão o próprio texto."""
+    if seed is None:
+        return None
+    try:
+        return int(seed)
+    except (TypeError, ValueError):
+        return str(seed)
 
 
 class EngligenApp:
@@ -31,10 +71,9 @@ class EngligenApp:
         self.wordlists_dir = self.data_dir / "wordlists"
         self.output_dir = self.project_root / "output"
         self.config_path = self.data_dir / "config.json"
+        self.cache_dir = self.data_dir / ".cache"
 
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.wordlists_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # diretórios são criados sob demanda (ao gravar), não na inicialização
 
         self.config: Dict = self._load_config() or {}
 
@@ -42,6 +81,33 @@ class EngligenApp:
         used_cfg = (self.config.get("used_words") or {})
         self.used_common_path = self.wordlists_dir / (used_cfg.get("common_file") or "used_common.json")
         self.used_thematic_path = self.wordlists_dir / (used_cfg.get("themed_file") or "used_thematic.json")
+        # histórico append-only (used_*.jsonl), consolidado no used_*.json a cada N puzzles
+        self.history_compact_every = int(used_cfg.get("compact_every") or 256)
+        self._histories: Dict[Path, UsageHistory] = {}
+
+        # bancos indexados já montados nesta sessão (chave: arquivos + mtime/tamanho)
+        self._wordbanks: Dict[Tuple, WordBank] = {}
+
+        # backend de armazenamento: "json" (padrão) ou "sqlite"
+        storage_cfg = (self.config.get("storage") or {})
+        self.storage_backend = str(storage_cfg.get("backend") or "json").lower()
+        self.sqlite_path = self._as_path(storage_cfg.get("path") or "data/engligen.db")
+        self._store: Optional[SQLiteWordStore] = None
+        # id(banco do SQLite) -> escopo da consulta que o montou (ver _load_used_bits); os
+        # bancos ficam em _wordbanks a sessão toda, então o id não é reaproveitado
+        self._store_scopes: Dict[int, Dict[str, Optional[int]]] = {}
+
+        # cache de puzzles (só gerações com seed: mesmas entradas => mesmo puzzle)
+        cache_cfg = (self.config.get("puzzle_cache") or {})
+        self.puzzle_cache_enabled = bool(cache_cfg.get("enabled", True))
+        self.puzzle_cache_max_mb = float(cache_cfg.get("max_mb") or 64)
+        self._puzzle_cache: Optional[PuzzleCache] = None
+        # puzzle gerado -> chave no cache (para guardar as renderizações junto)
+        self._puzzle_keys: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+        # serializa histórico + geração quando vários jobs rodam em threads (engligen batch)
+        self._generation_lock = threading.RLock()
+        self._wordbanks_lock = threading.Lock()
 
     def _detect_project_root(self) -> Path:
         here = Path(__file__).resolve()
@@ -55,6 +121,30 @@ class EngligenApp:
         return p if p.is_absolute() else (self.project_root / p)
 
     # -------------------- Config --------------------
+    def _output_format(self, output_format: Optional[str]) -> str:
+        """Formato das imagens: parâmetro do job > config renderer.output_format > png."""
+        fmt = output_format or (self.config.get("renderer") or {}).get("output_format") or "png"
+        fmt = str(fmt).lower().lstrip(".")
+        if fmt not in OUTPUT_FORMATS:
+            print(f"⚠️ Formato de saída desconhecido '{fmt}'; usando png ({', '.join(OUTPUT_FORMATS)}).")
+            fmt = "png"
+        return fmt
+
+    def _png_options(self) -> Dict:
+        """Modo/compressão dos PNGs (config renderer.output_mode, png_compress_level, png_optimize)."""
+        from engligen.rendering.png_modes import OUTPUT_MODES
+
+        rcfg = self.config.get("renderer") or {}
+        mode = str(rcfg.get("output_mode") or "rgb").lower()
+        if mode not in OUTPUT_MODES:
+            print(f"⚠️ renderer.output_mode desconhecido '{mode}'; usando rgb ({', '.join(OUTPUT_MODES)}).")
+            mode = "rgb"
+        level = rcfg.get("png_compress_level", 6)
+        if not isinstance(level, int) or not 0 <= level <= 9:
+            print("⚠️ renderer.png_compress_level deve ser de 0 a 9; usando 6.")
+            level = 6
+        return {"output_mode": mode, "png_compress_level": level, "png_optimize": bool(rcfg.get("png_optimize"))}
+
     def _load_config(self) -> Optional[Dict]:
         if not self.config_path.exists():
             return None
@@ -77,46 +167,205 @@ class EngligenApp:
         p = self._as_path(rel)
         return p if p.exists() else None
 
-    def _read_json_list(self, path: Path) -> Optional[List[Dict]]:
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data if isinstance(data, list) else None
-        except Exception:
+    def _read_bank_items(self, path: Path) -> Optional[Iterator]:
+        # array JSON ou JSON Lines (.jsonl lido em fluxo, linha a linha)
+        items = read_bank_items(path)
+        if items is None:
             print(f"❌ ERRO ao ler JSON: {path}")
-            return None
+        return items
+
+    def _compiled_bank(self, path: Path) -> Optional[CompiledBank]:
+        # cache compilado em data/.cache/ (invalida por mtime + tamanho);
+        # o saneamento mínimo (strip/upper) é feito uma vez, na compilação
+        return load_bank(path, self.cache_dir, self._read_bank_items)
 
     def _load_words_file(self, path: Path) -> Optional[List[Dict]]:
-        arr = self._read_json_list(path)
-        if arr is None:
+        bank = self._compiled_bank(path)
+        if bank is None:
             return None
-        # saneamento mínimo
-        out: List[Dict] = []
-        for it in arr:
-            if not isinstance(it, dict):
-                continue
-            w = (it.get("word") or "").strip().upper()
-            if w:
-                out.append({"word": w, "clue": it.get("clue") or ""})
+        return bank.items()
+
+    def _unit_slug_by_path(self) -> Dict[Path, str]:
+        units = ((self.config or {}).get("course") or {}).get("units") or []
+        out: Dict[Path, str] = {}
+        for u in units:
+            if isinstance(u, dict) and u.get("themed_words_file") and u.get("slug"):
+                out[self._as_path(u["themed_words_file"]).resolve()] = str(u["slug"])
         return out
 
+    def load_wordbank(
+        self,
+        common_file: Optional[Path],
+        themed_files: List[Path],
+        *,
+        max_len: Optional[int] = None,
+    ) -> Optional[WordBank]:
+        """
+        Monta (ou reaproveita da sessão) o WordBank com os temáticos + coringa.
+        A origem de cada temática é o slug da unidade (se estiver no config) ou o nome do arquivo.
+        Com `max_len`, só entram as palavras que cabem na grade (as demais nem viram objetos).
+        """
+        files = [(THEMED, p) for p in themed_files]
+        if common_file and common_file.exists():
+            files.append((COMMON, common_file))
+
+        key_parts = []
+        for role, p in files:
+            try:
+                st = p.stat()
+                key_parts.append((role, str(p.resolve()), st.st_mtime_ns, st.st_size))
+            except OSError:
+                key_parts.append((role, str(p), None, None))
+        key = (tuple(key_parts), max_len)
+        with self._wordbanks_lock:
+            cached = self._wordbanks.get(key)
+            if cached is None:
+                cached = self._build_wordbank(files, max_len)
+                if cached is not None:
+                    self._wordbanks[key] = cached
+            return cached
+
+    def _build_wordbank(self, files: List[Tuple[str, Path]], max_len: Optional[int]) -> Optional[WordBank]:
+        slugs = self._unit_slug_by_path()
+        bank = WordBank()
+        for role, p in files:
+            compiled = self._compiled_bank(p)
+            if compiled is None:
+                if role == THEMED:
+                    return None
+                continue
+            source = COMMON if role == COMMON else slugs.get(p.resolve(), p.stem)
+            bank.add_items(compiled.iter_items(max_len), role=role, source=source)
+        return bank
+
+    # -------------------- Cache de puzzles --------------------
+    def puzzle_cache(self) -> Optional[PuzzleCache]:
+        if not self.puzzle_cache_enabled:
+            return None
+        if self._puzzle_cache is None:
+            from engligen.storage.puzzle_cache import PuzzleCache
+
+            self._puzzle_cache = PuzzleCache(
+                self.cache_dir / "puzzles", max_bytes=int(self.puzzle_cache_max_mb * 1024 * 1024)
+            )
+        return self._puzzle_cache
+
+    def _cached_outputs(self, puzzle, render_parts: Dict, render) -> Dict[str, bytes]:
+        """Saídas renderizadas do cache (mesmo puzzle + mesmos parâmetros) ou `render()` e guarda."""
+        cache = self.puzzle_cache()
+        key = self._puzzle_keys.get(puzzle)
+        if cache is None or key is None:
+            return render()
+        from engligen.storage.puzzle_cache import cache_key
+
+        render_key = cache_key(render=render_parts)[:32]
+        outputs = cache.get_outputs(key, render_key)
+        if outputs is None:
+            outputs = render()
+            cache.put_outputs(key, render_key, outputs)
+        return outputs
+
+    # -------------------- SQLite (opcional) --------------------
+    def word_store(self) -> Optional[SQLiteWordStore]:
+        """Store SQLite quando config.storage.backend == "sqlite" (importa os JSONs na 1ª vez)."""
+        if self.storage_backend != "sqlite":
+            return None
+        if self._store is None:
+            from engligen.storage.sqlite_store import SQLiteWordStore, import_from_json_layout
+
+            store = SQLiteWordStore(self.sqlite_path)
+            if not store.has_words():
+                store.close()
+                counts = import_from_json_layout(self, self.sqlite_path)
+                print(f"✔️  Bancos importados para {self.sqlite_path.name}: "
+                      f"{counts['themed']} temáticas, {counts['common']} coringa.")
+                store = SQLiteWordStore(self.sqlite_path)
+            self._store = store
+        return self._store
+
+    def _course_scope(self, store: SQLiteWordStore) -> Optional[Dict[str, Optional[int]]]:
+        """Escopo das temáticas no SQLite; None se active_unit não for uma unidade importada."""
+        course = (self.config or {}).get("course") or {}
+        active = course.get("active_unit")
+        if not active:
+            return {}
+        ordv = store.unit_ord(active)
+        if ordv is None:
+            # como nos JSONs: unidade desconhecida não vira "todas as unidades"
+            return None
+        if course.get("include_previous_units"):
+            return {"max_unit_ord": ordv}
+        return {"only_unit_ord": ordv}
+
+    def _load_bank_for_run(
+        self,
+        common_override: Optional[str],
+        themed_overrides: Optional[List[str]],
+        *,
+        include_common: bool = True,
+        max_len: Optional[int] = None,
+    ) -> Tuple[Optional[WordBank], bool]:
+        """
+        Banco da execução: SQLite (sem overrides do menu) ou JSONs resolvidos.
+        Retorna (bank, havia_tematicos). bank None = erro de leitura ou nada definido.
+        """
+        store = self.word_store()
+        if store is not None and not common_override and not themed_overrides:
+            with self._wordbanks_lock:
+                scope = self._course_scope(store)
+                if scope is None:
+                    return (None, False)
+                # como nos JSONs: um banco por sessão, refeito só se o SQLite for reimportado
+                key = ("sqlite", store.words_version(), tuple(sorted(scope.items())), max_len, include_common)
+                bank = self._wordbanks.get(key)
+                if bank is None:
+                    bank = store.load_wordbank(max_length=max_len, include_common=include_common, **scope)
+                    self._wordbanks[key] = bank
+                    self._store_scopes[id(bank)] = {"max_length": max_len, **scope}
+            return (bank, bool(bank.themed_words))
+
+        common_file, themed_files = self.resolve_wordlists_from_config(
+            common_override=common_override,
+            themed_overrides=themed_overrides,
+        )
+        if not themed_files:
+            return (None, False)
+        return (self.load_wordbank(common_file if include_common else None, themed_files, max_len=max_len), True)
+
     # -------------------- Histórico --------------------
-    def _load_used(self, path: Path) -> Set[str]:
-        if not path.exists():
-            return set()
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                arr = json.load(f)
-            if isinstance(arr, list):
-                return set((w or "").upper() for w in arr if isinstance(w, str))
-        except Exception:
-            pass
-        return set()
+    def _history_kind(self, path: Path) -> str:
+        return THEMED if path == self.used_thematic_path else COMMON
 
-    def _save_used(self, path: Path, used: Set[str]) -> None:
+    def _history(self, path: Path) -> UsageHistory:
+        h = self._histories.get(path)
+        if h is None:
+            h = UsageHistory(path, compact_every=self.history_compact_every)
+            self._histories[path] = h
+        return h
+
+    def _load_used_bits(self, path: Path, bank: WordBank) -> int:
+        """Histórico como bitmap alinhado ao índice de `bank` (filtro por operação bit a bit)."""
+        store = self.word_store()
+        if store is not None:
+            kind = self._history_kind(path)
+            scope = self._store_scopes.get(id(bank))
+            if scope is None:  # banco dos JSONs (overrides do menu) com histórico no SQLite
+                return bank.bits_for(store.load_used(kind))
+            mask = bank.mask(kind)
+            if not mask:
+                return 0
+            # usadas = banco − não usadas do mesmo escopo (consulta indexada no SQLite)
+            return mask & ~bank.bits_for(store.unused_words(kind, **scope))
+        return load_used_bits(self._history(path), bank, self.cache_dir)
+
+    def _reset_used(self, path: Path, words: Set[str]) -> None:
+        """Zera o histórico de `path` e já registra `words` (reset do menu/CLI)."""
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(sorted(list(used)), f, ensure_ascii=False, indent=2)
+            store = self.word_store()
+            if store is not None:
+                store.replace_used(self._history_kind(path), set(words))
+            else:
+                self._history(path).reset(words)
         except Exception as e:
             print(f"⚠️  Não foi possível salvar histórico '{path.name}': {e}")
 
@@ -148,25 +397,39 @@ class EngligenApp:
         if not common_file and cfg.get("common_words_file"):
             common_file = self._resolve_file(cfg.get("common_words_file"))
 
+        themed_files = self.unit_wordlists((cfg.get("course") or {}).get("active_unit") or "")[1]
+        return (common_file, themed_files)
+
+    def course_units(self) -> List[str]:
+        """Slugs das unidades de course.units, na ordem do config."""
+        units = ((self.config or {}).get("course") or {}).get("units") or []
+        return [u.get("slug") for u in units if isinstance(u, dict) and u.get("slug")]
+
+    def unit_wordlists(self, slug: str) -> Tuple[Optional[Path], List[Path]]:
+        """
+        (coringa, temáticos) da unidade `slug` pelo config — os temáticos incluem as
+        unidades anteriores se include_previous_units (o mesmo que active_unit = slug).
+        """
+        cfg = self.config or {}
+        common_file = self._resolve_file(cfg.get("common_words_file"))
         course = cfg.get("course") or {}
         include_prev = bool(course.get("include_previous_units"))
-        active_slug = (course.get("active_unit") or "")
         units = course.get("units") or []
 
         themed_map = {u.get("slug"): u.get("themed_words_file") for u in units if isinstance(u, dict)}
         order = [u.get("slug") for u in units if isinstance(u, dict)]
-        if active_slug and active_slug in themed_map:
+        themed_files: List[Path] = []
+        if slug and slug in themed_map:
             if include_prev and order:
-                upto = order.index(active_slug) + 1 if active_slug in order else len(order)
+                upto = order.index(slug) + 1 if slug in order else len(order)
                 slugs = order[:upto]
             else:
-                slugs = [active_slug]
-            for slug in slugs:
-                fp = themed_map.get(slug)
+                slugs = [slug]
+            for s in slugs:
+                fp = themed_map.get(s)
                 p = self._resolve_file(fp) if fp else None
                 if p is not None:
                     themed_files.append(p)
-
         return (common_file, themed_files)
 
     # ======================================================================
@@ -186,94 +449,183 @@ class EngligenApp:
         themed_files_override: Optional[List[str]] = None,
         prefill_words_count: int = 0,
         prefill_prefer_thematic: bool = True,
+        output_format: Optional[str] = None,
+        template: Optional[Union[str, Sequence[str]]] = None,
     ) -> bool:
-        # Resolve arquivos (overrides > config.json)
-        common_file, themed_files = self.resolve_wordlists_from_config(
-            common_override=common_file_override,
-            themed_overrides=themed_files_override,
+        gen = self.gerar_crossword(
+            altura=altura,
+            largura=largura,
+            seed=seed,
+            reset=reset,
+            common_file_override=common_file_override,
+            themed_files_override=themed_files_override,
+            template=template,
         )
-        if not themed_files:
-            print("❌ ERRO: Nenhum arquivo temático definido.")
+        if gen is None:
             return False
+        cw, bank = gen
 
-        # Carrega bancos
-        themed_data: List[Dict] = []
-        for p in themed_files:
-            data = self._load_words_file(p)
-            if data is None:
-                return False
-            themed_data.extend(data)
+        outputs = self.renderizar_crossword(
+            cw,
+            bank,
+            ink_saver=ink_saver,
+            header_text=header_text,
+            prefill_words_count=prefill_words_count,
+            prefill_prefer_thematic=prefill_prefer_thematic,
+            output_format=output_format,
+        )
+        self.gravar_saidas(output_basename, outputs)
+        print("🎉 Tudo pronto!")
+        return True
 
-        common_data: List[Dict] = []
-        if common_file and common_file.exists():
-            tmp = self._load_words_file(common_file)
-            if tmp is None:
-                return False
-            common_data = tmp
+    def gerar_crossword(
+        self,
+        *,
+        altura: int,
+        largura: int,
+        seed: Optional[int] = None,
+        reset: bool = False,
+        common_file_override: Optional[str] = None,
+        themed_files_override: Optional[List[str]] = None,
+        pool=None,
+        registrar: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Iterable[str]] = None,
+        template: Optional[Union[str, Sequence[str]]] = None,
+    ) -> Optional[Tuple["Crossword", WordBank]]:
+        """
+        Etapa 1 (geração): monta a grade e registra o uso no histórico.
+        `pool` reaproveita um multiprocessing.Pool já aquecido (ver engligen.pipeline).
+        `registrar=False` gera um rascunho (prévia) sem tocar no histórico; se for
+        aceito, registre com registrar_crossword.
+        `deadline` (time.monotonic()): vencido o prazo, o puzzle é descartado sem
+        registrar nada e o retorno é None (ver engligen.ui.server).
+        `exclude`: palavras tratadas como já usadas, sem estar no histórico (ex.: as
+        reservadas por outros puzzles do estoque, ver engligen.stock).
+        `template`: modo modelo (molde fixo de blocos, ver engligen.core.template) —
+        "auto" sorteia um molde simétrico dentro de altura×largura; uma lista de linhas
+        ou o caminho de um .txt usa aquele molde. None = modo livre (padrão).
+        """
+        try:
+            rows = self._template_rows(template)
+        except (OSError, ValueError) as e:
+            print(f"❌ ERRO: molde inválido: {e}")
+            return None
+        if rows:
+            altura, largura = len(rows), len(rows[0])
 
-        themed_set_all = set(it["word"] for it in themed_data)
-        # Histórico (considera reset)
-        used_them = set() if reset else self._load_used(self.used_thematic_path)
-        used_com = set() if reset else self._load_used(self.used_common_path)
+        # Resolve e carrega bancos (overrides > config.json; indexados e reaproveitados na sessão)
+        bank, has_themed = self._load_bank_for_run(
+            common_file_override, themed_files_override, max_len=max(int(altura), int(largura))
+        )
+        if not has_themed:
+            print("❌ ERRO: Nenhum arquivo temático definido.")
+            return None
+        if bank is None:
+            return None
 
-        # Filtra já usados
-        themed_words = [it["word"] for it in themed_data if it["word"] not in used_them]
-        common_words = [it["word"] for it in common_data if it["word"] not in used_com]
+        # Histórico + geração + registro sob o lock da app: jobs paralelos (batch)
+        # não disputam o random global nem leem um histórico desatualizado
+        with self._generation_lock:
+            cw = self._com_reserva(lambda: self._gerar_e_registrar_crossword(
+                bank, altura=altura, largura=largura, seed=seed, reset=reset, pool=pool,
+                registrar=registrar, deadline=deadline, exclude=exclude,
+                template=None if template is None else (rows or AUTO_TEMPLATE),
+            ))
+        if cw is None:
+            return None
+        return (cw, bank)
 
-        if not themed_words and not common_words:
-            print("❌ ERRO: Sem palavras disponíveis (todas já usadas?).")
-            return False
+    def renderizar_crossword(
+        self,
+        cw: "Crossword",
+        bank: Mapping[str, str],
+        *,
+        ink_saver: bool = True,
+        header_text: Optional[str] = None,
+        prefill_words_count: int = 0,
+        prefill_prefer_thematic: bool = True,
+        output_format: Optional[str] = None,
+    ) -> Dict[str, bytes]:
+        """
+        Etapa 2 (renderização): dicas + imagens (PNG, SVG ou PDF) + arquivo de puzzle em
+        memória, {sufixo: bytes}. Não grava nada em disco nem toca no histórico — pode
+        rodar numa thread. `bank`: WordBank ou dict word -> dica (ex.: cw.clues de um
+        puzzle carregado com Crossword.load).
+        """
+        from engligen.core import puzzle_file
 
-        # Seed global (o core usa random do módulo)
-        if seed is not None:
-            try:
-                random.seed(int(seed))
-            except Exception:
-                pass
-
-        # Instancia o gerador de cruzadas conforme a API do core
-        cw = Crossword(
-            themed_words=themed_words,
-            common_words=common_words,
-            num_attempts=50,
-            max_size=(int(altura), int(largura)),
-            target_density=0.70,
+        fmt = self._output_format(output_format)
+        options = {
+            "ink_saver": bool(ink_saver),
+            "header_text": header_text,
+            "prefill_words_count": int(prefill_words_count or 0),
+            "prefill_prefer_thematic": bool(prefill_prefer_thematic),
+        }
+
+        def render() -> Dict[str, bytes]:
+            renderer, cg = self._crossword_renderer(cw, bank, fmt, **options)
+            exercise, answers = renderer.to_bytes_pair()
+            return {
+                f"_exercicio.{fmt}": exercise,
+                f"_respostas.{fmt}": answers,
+                "_clues.txt": cg.to_bytes(),
+                puzzle_file.PUZZLE_SUFFIX: puzzle_file.dumps(cw.to_dict(bank)),
+            }
+
+        # as dicas vêm do banco: entram na chave (o hash do banco cobre só as palavras)
+        clues = {w: bank.get(w, "") for w in sorted(cw.placed_words)}
+        render_parts = {"fmt": fmt, "png": self._png_options(), "clues": clues, **options}
+        return self._cached_outputs(cw, render_parts, render)
+
+    def folhas_crossword(
+        self,
+        cw: "Crossword",
+        bank: Mapping[str, str],
+        *,
+        ink_saver: bool = True,
+        header_text: Optional[str] = None,
+        prefill_words_count: int = 0,
+        prefill_prefer_thematic: bool = True,
+    ) -> Tuple["Scene", "Scene", List[str]]:
+        """Etapa 2 para o caderno PDF: (cena do exercício, cena do gabarito, linhas de dicas)."""
+        from engligen.rendering.booklet import clue_lines
+
+        renderer, cg = self._crossword_renderer(
+            cw, bank, "pdf",
+            ink_saver=ink_saver,
+            header_text=header_text,
+            prefill_words_count=prefill_words_count,
+            prefill_prefer_thematic=prefill_prefer_thematic,
         )
-        ok = cw.generate()
-        if not ok or not cw.placed_words:
-            print("❌ Não foi possível montar uma grade válida. Tente reduzir a lista.")
-            return False
+        exercise, answers = renderer.render_pair()
+        return exercise, answers, clue_lines(cg.to_text())
 
-        # Mapa de dicas (palavras efetivamente colocadas)
-        clue_by_word: Dict[str, str] = {}
-        placed_words_set = set(cw.placed_words.keys())
-        for it in themed_data + common_data:
-            w = it.get("word", "")
-            if w and w in placed_words_set:
-                clue_by_word[w] = it.get("clue", "") or ""
+    def _crossword_renderer(
+        self,
+        cw: "Crossword",
+        bank: Mapping[str, str],
+        fmt: str,
+        *,
+        ink_saver: bool,
+        header_text: Optional[str],
+        prefill_words_count: int,
+        prefill_prefer_thematic: bool,
+    ):
+        """(renderer do formato `fmt`, ClueGenerator) com o prefill já aplicado."""
+        from engligen.rendering.clue_generator import ClueGenerator
+        from engligen.rendering.crossword_renderer import CrosswordRenderer
+        from engligen.rendering.vector_renderer import CrosswordVectorRenderer
 
-        # Atualiza históricos apenas com as colocadas
-        for w in placed_words_set:
-            if w in set(it["word"] for it in themed_data):
-                used_them.add(w)
-            elif w in set(it["word"] for it in common_data):
-                used_com.add(w)
-        self._save_used(self.used_thematic_path, used_them)
-        self._save_used(self.used_common_path, used_com)
-        print(f"✔️  used_thematic.json: {len(used_them)} itens.")
-        print(f"✔️  used_common.json: {len(used_com)} itens.")
-
-        # Gera arquivo de dicas
-        cg = ClueGenerator(cw, clue_by_word)
-        clues_path = self.output_dir / f"{output_basename}_clues.txt"
-        cg.generate_text_file(str(clues_path))
+        # Dicas (o WordBank é o próprio mapa word -> clue)
+        cg = ClueGenerator(cw, bank)
 
         # Prefill por PALAVRAS inteiras (opcional)
         prefilled_cells: Set[Tuple[int, int]] = set()
         if prefill_words_count and prefill_words_count > 0:
-            ordered = list(placed_words_set)
+            ordered = list(cw.placed_words.keys())
             if prefill_prefer_thematic:
-                ordered.sort(key=lambda w: (0 if w in themed_set_all else 1, -len(w)))
+                ordered.sort(key=lambda w: (0 if w in cw.themed_word_set else 1, -len(w)))
             else:
                 ordered.sort(key=lambda w: -len(w))
             pick = ordered[: int(prefill_words_count)]
@@ -288,28 +640,266 @@ class EngligenApp:
                     prefilled_cells.add((r0 + i * dr, c0 + i * dc))
 
         # Renderização
-        renderer = CrosswordRenderer(
-            cw,
-            cg,
-            cell_size=40,
-            padding=25,
-            ink_saver=bool(ink_saver),
-            header_text=header_text,
-        )
+        if fmt == "png":
+            renderer = CrosswordRenderer(cw, cg, cell_size=40, padding=25,
+                                         ink_saver=bool(ink_saver), header_text=header_text,
+                                         **self._png_options())
+        else:
+            renderer = CrosswordVectorRenderer(cw, cg, fmt=fmt, cell_size=40, padding=25,
+                                               ink_saver=bool(ink_saver), header_text=header_text)
         if hasattr(renderer, "prefilled_positions"):
             renderer.prefilled_positions = prefilled_cells
+        return renderer, cg
 
-        ex_path = self.output_dir / f"{output_basename}_exercicio.png"
-        an_path = self.output_dir / f"{output_basename}_respostas.png"
-        renderer.generate_image(str(ex_path), answers=False)
-        renderer.generate_image(str(an_path), answers=True)
-
+    def gravar_saidas(self, output_basename: str, outputs: Dict[str, bytes]) -> List[Path]:
+        """Etapa 3: grava as saídas renderizadas em output/<nome-base><sufixo>."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths: List[Path] = []
+        for suffix, data in outputs.items():
+            path = self.output_dir / f"{output_basename}{suffix}"
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append(path)
         print(f"📦 Saída: {self.output_dir}")
-        print(f"   - {ex_path.name}")
-        print(f"   - {an_path.name}")
-        print(f"   - {clues_path.name}")
-        print("🎉 Tudo pronto!")
-        return True
+        for path in paths:
+            print(f"   - {path.name}")
+        return paths
+
+    def rerenderizar(
+        self,
+        puzzle_path,
+        *,
+        output_basename: Optional[str] = None,
+        output_format: Optional[str] = None,
+        ink_saver: bool = True,
+        header_text: Optional[str] = None,
+        prefill_words_count: int = 0,
+        prefill_prefer_thematic: bool = True,
+        highlight_style: str = "fill",
+        stroke_width: int = 5,
+    ) -> List[Path]:
+        """
+        Refaz as folhas de um `<nome-base>_puzzle.json` com outro estilo/header/formato,
+        sem regenerar a grade nem tocar no histórico. Nome-base padrão: o do arquivo.
+        """
+        from engligen.core.crossword import Crossword
+        from engligen.core.puzzle_file import PUZZLE_SUFFIX, load_puzzle
+
+        puzzle_path = Path(puzzle_path)
+        puzzle = load_puzzle(puzzle_path)
+        if output_basename is None:
+            name = puzzle_path.name
+            output_basename = name[: -len(PUZZLE_SUFFIX)] if name.endswith(PUZZLE_SUFFIX) else puzzle_path.stem
+
+        if isinstance(puzzle, Crossword):
+            outputs = self.renderizar_crossword(
+                puzzle, puzzle.clues,
+                ink_saver=ink_saver,
+                header_text=header_text,
+                prefill_words_count=prefill_words_count,
+                prefill_prefer_thematic=prefill_prefer_thematic,
+                output_format=output_format,
+            )
+        else:
+            outputs = self.renderizar_wordsearch(
+                puzzle, highlight_style=highlight_style, stroke_width=stroke_width, output_format=output_format
+            )
+        outputs.pop(PUZZLE_SUFFIX, None)  # o arquivo de origem não é regravado
+        return self.gravar_saidas(output_basename, outputs)
+
+    def aquecer(self) -> None:
+        """
+        Para processos de vida longa (engligen serve): carrega os bancos do config
+        (compilados + indexados) e as fontes/atlas de glifos, renderizando uma grade mínima.
+        """
+        from engligen.core.crossword import Crossword
+        from engligen.core.wordsearch import WordSearch
+
+        self._load_bank_for_run(None, None)
+        cw = Crossword.from_dict({
+            "grid": ["######", "#ABCD#", "######"],
+            "words": [{"word": "ABCD", "row": 1, "col": 1, "direction": "horizontal"}],
+        })
+        ws = WordSearch(words=["ABCD"], size=5)
+        ws.generate()
+        for fmt in OUTPUT_FORMATS:
+            renderer, _cg = self._crossword_renderer(
+                cw, {}, fmt, ink_saver=True, header_text="Engligen",
+                prefill_words_count=0, prefill_prefer_thematic=True,
+            )
+            renderer.to_bytes_pair()
+            self._wordsearch_renderer(ws, fmt, "fill", 5).to_bytes_pair()
+
+    def previa(self, puzzle, *, ascii: bool = True) -> bytes:
+        """
+        Prévia rápida (milissegundos) de um rascunho Crossword ou WordSearch: imprime a
+        grade em ASCII e devolve um PNG pequeno do gabarito (células de 16 px, paleta).
+        Não toca no histórico; a renderização completa fica para quando for aceito.
+        """
+        from engligen.core.crossword import Crossword
+        from engligen.rendering.text_preview import crossword_ascii, wordsearch_ascii
+
+        png = {"preview": True, "output_mode": "palette", "png_compress_level": 1}
+        if isinstance(puzzle, Crossword):
+            from engligen.rendering.crossword_renderer import CrosswordRenderer
+
+            renderer = CrosswordRenderer(puzzle, None, **png)
+            text = crossword_ascii(puzzle)
+        else:
+            from engligen.rendering.wordsearch_renderer import WordSearchRenderer
+
+            renderer = WordSearchRenderer(puzzle, **png)
+            text = wordsearch_ascii(puzzle, answers=True)
+        if ascii:
+            print(text)
+        return renderer.to_bytes(answers=True)
+
+    def registrar_crossword(self, cw: "Crossword", bank: WordBank, *, reset: bool = False) -> Set[str]:
+        """
+        Registra no histórico as palavras de um rascunho aceito (gerar_crossword(registrar=False)).
+        Retorna as que outra execução usou nesse meio-tempo — nesse caso nada foi gravado.
+        """
+        with self._generation_lock:
+            return self._registrar_uso(bank, cw.placed_words.keys(), reset=reset)
+
+    def _registrar_uso(self, bank: WordBank, words, *, reset: bool = False) -> Set[str]:
+        """
+        Grava o uso das palavras de um puzzle: reserva atômica nos dois históricos (nada é
+        gravado se alguma já constar, ex.: usada por outra execução em paralelo depois que
+        esta leu o histórico). Retorna as conflitantes; vazio = registrado.
+        """
+        placed_them, placed_com = bank.split_by_role(words)
+        if reset:
+            self._reset_used(self.used_thematic_path, set(placed_them))
+            self._reset_used(self.used_common_path, set(placed_com))
+            return set()
+        try:
+            conflicts = self.reservar_uso(placed_them, placed_com)
+        except Exception as e:
+            print(f"⚠️  Não foi possível salvar o histórico de uso: {e}")
+            return set()
+        if conflicts:
+            print(f"⚠️  {len(conflicts)} palavra(s) já tinham sido usadas por outra execução em paralelo: "
+                  f"{', '.join(sorted(conflicts)[:5])}{'…' if len(conflicts) > 5 else ''}")
+        return conflicts
+
+    def reservar_uso(self, themed: Iterable[str], common: Iterable[str]) -> Set[str]:
+        """
+        Reserva atômica (ex.: ao tirar um puzzle do estoque): registra TODAS as palavras no
+        histórico só se nenhuma já constar — também entre processos. Retorna as que já
+        constavam; vazio = reservado, senão nada foi gravado.
+        """
+        from engligen.storage.history import reserve_all
+
+        themed, common = set(themed), set(common)
+        with self._generation_lock:
+            store = self.word_store()
+            if store is not None:
+                return store.reserve_used({THEMED: themed, COMMON: common})
+            return reserve_all([
+                (self._history(self.used_thematic_path), themed),
+                (self._history(self.used_common_path), common),
+            ])
+
+    def _template_rows(self, template: Optional[Union[str, Sequence[str]]]) -> Optional[List[str]]:
+        """Linhas do molde: None para o modo livre ou "auto"; lista/arquivo .txt validados."""
+        if template is None or template == AUTO_TEMPLATE:
+            return None
+        from engligen.core.template import find_slots, parse_template, template_rows
+
+        if isinstance(template, str):
+            with open(self._as_path(template), "r", encoding="utf-8-sig") as f:
+                template = f.read().splitlines()
+        cells = parse_template(template)
+        find_slots(cells)  # valida já aqui (trechos de 2, casas soltas)
+        return template_rows(cells)
+
+    def _gerar_e_registrar_crossword(
+        self, bank: WordBank, *, altura: int, largura: int, seed: Optional[int], reset: bool, pool=None,
+        registrar: bool = True, deadline: Optional[float] = None, exclude: Optional[Iterable[str]] = None,
+        template: Optional[Union[str, List[str]]] = None,
+    ) -> Optional["Crossword"]:
+        if _expired(deadline):
+            return None
+        # Histórico (considera reset) + palavras excluídas à parte
+        used_them = 0 if reset else self._load_used_bits(self.used_thematic_path, bank)
+        used_com = 0 if reset else self._load_used_bits(self.used_common_path, bank)
+        held = bank.bits_for(exclude) if exclude else 0
+
+        if not bank.unused(used_them | held, role=THEMED) and not bank.unused(used_com | held, role=COMMON):
+            print("❌ ERRO: Sem palavras disponíveis (todas já usadas?).")
+            return None
+
+        seed = _seed_value(seed)
+        cache = self.puzzle_cache() if seed is not None else None
+        key = None
+        cw = None
+        if cache is not None:
+            from engligen.storage.puzzle_cache import cache_key, digest_bits
+
+            key = cache_key(
+                kind="crossword", bank=bank.fingerprint(), themed=digest_bits(bank.mask(THEMED)),
+                used=[digest_bits(used_them | held), digest_bits(used_com | held)], seed=seed,
+                size=[int(altura), int(largura)], num_attempts=50, density=0.70,
+                **({} if template is None else {"template": template}),
+            )
+            cw = cache.get(key)
+            if cw is not None:
+                print(f"⚡ Puzzle em cache (seed {seed}): {len(cw.placed_words)} palavras.")
+
+        if cw is None:
+            # Seed global (o core usa random do módulo)
+            if seed is not None:
+                random.seed(seed)
+
+            from engligen.core.crossword import Crossword
+            from engligen.storage.trie_cache import load_trie
+
+            # Instancia o gerador de cruzadas conforme a API do core
+            cw = Crossword.from_wordbank(
+                bank,
+                used_themed=used_them | held,
+                used_common=used_com | held,
+                num_attempts=50,
+                max_size=(int(altura), int(largura)),
+                target_density=0.70,
+                trie=load_trie(bank, self.cache_dir),
+            )
+            if template is None:
+                ok = cw.generate(pool=pool)
+            else:
+                from engligen.core.template import DEFAULT_MAX_NODES, DEFAULT_TIME_BUDGET
+
+                opts = self.config.get("crossword_template") or {}
+                budget = float(opts.get("time_budget", DEFAULT_TIME_BUDGET))
+                if deadline is not None:
+                    budget = min(budget, max(0.0, deadline - time.monotonic()))
+                ok = cw.generate_from_template(
+                    None if template == AUTO_TEMPLATE else template,
+                    time_budget=budget, max_nodes=int(opts.get("max_nodes", DEFAULT_MAX_NODES)),
+                )
+            if not ok or not cw.placed_words:
+                print("❌ Não foi possível montar uma grade válida. Tente reduzir a lista.")
+                return None
+            if cache is not None:
+                cache.put(key, cw)
+        if key is not None:
+            self._puzzle_keys[cw] = key
+
+        if _expired(deadline):
+            return None
+        if not registrar:
+            return cw
+
+        # Atualiza históricos apenas com as colocadas
+        placed_them, placed_com = bank.split_by_role(cw.placed_words.keys())
+        used_them |= bank.bits_for(placed_them)
+        used_com |= bank.bits_for(placed_com)
+        if self._registrar_uso(bank, cw.placed_words.keys(), reset=reset):
+            raise _UsageConflict()
+        print(f"✔️  used_thematic.json: {used_them.bit_count()} itens do banco.")
+        print(f"✔️  used_common.json: {used_com.bit_count()} itens do banco.")
+        return cw
 
     # ======================================================================
     #                            WORDSEARCH
@@ -329,7 +919,48 @@ class EngligenApp:
         min_words: int = 12,
         target_occupancy: Optional[float] = None,
         seed: Optional[int] = None,
+        output_format: Optional[str] = None,
     ) -> bool:
+        ws = self.gerar_wordsearch(
+            size=size,
+            allow_fallback_common=allow_fallback_common,
+            common_file_override=common_file_override,
+            themed_files_override=themed_files_override,
+            max_words=max_words,
+            min_words=min_words,
+            target_occupancy=target_occupancy,
+            seed=seed,
+        )
+        if ws is None:
+            return False
+
+        outputs = self.renderizar_wordsearch(
+            ws, highlight_style=highlight_style, stroke_width=stroke_width, output_format=output_format
+        )
+        self.gravar_saidas(output_basename, outputs)
+        print("🎉 Tudo pronto!")
+        return True
+
+    def gerar_wordsearch(
+        self,
+        *,
+        size: int,
+        allow_fallback_common: bool = True,
+        common_file_override: Optional[str] = None,
+        themed_files_override: Optional[List[str]] = None,
+        max_words: Optional[int] = None,
+        min_words: int = 12,
+        target_occupancy: Optional[float] = None,
+        seed: Optional[int] = None,
+        registrar: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> Optional["WordSearch"]:
+        """
+        Etapa 1 (geração): monta o caça-palavras e registra as colocadas no histórico
+        (`registrar=False`: rascunho para prévia; registre depois com registrar_wordsearch).
+        `deadline` e `exclude`: como em gerar_crossword.
+        """
         # Carrega preferências do WS da config (se não vierem por parâmetro)
         ws_cfg = (self.config.get("wordsearch") or {})
         if target_occupancy is None:
@@ -340,54 +971,171 @@ class EngligenApp:
         if not isinstance(min_words, int) or min_words < 1:
             min_words = int(ws_cfg.get("min_words", 12) or 12)
 
-        # Resolve arquivos
-        common_file, themed_files = self.resolve_wordlists_from_config(
-            common_override=common_file_override,
-            themed_overrides=themed_files_override,
+        # Resolve e carrega bancos (coringa só se o fallback estiver habilitado)
+        bank, has_themed = self._load_bank_for_run(
+            common_file_override, themed_files_override,
+            include_common=allow_fallback_common, max_len=int(size),
         )
-        if not themed_files:
+        if not has_themed:
             print("❌ ERRO: Nenhum arquivo temático definido para o WordSearch.")
-            return False
+            return None
+        if bank is None:
+            return None
+
+        with self._generation_lock:
+            return self._com_reserva(lambda: self._gerar_e_registrar_wordsearch(
+                bank,
+                size=size,
+                allow_fallback_common=allow_fallback_common,
+                max_words=max_words,
+                min_words=min_words,
+                target_occupancy=target_occupancy,
+                seed=seed,
+                registrar=registrar,
+                deadline=deadline,
+                exclude=exclude,
+            ))
+
+    @staticmethod
+    def _com_reserva(gerar: Callable[[], Optional[T]]) -> Optional[T]:
+        """
+        Roda `gerar` (geração + reserva no histórico); se outra execução tiver usado alguma
+        das palavras nesse meio-tempo, gera de novo com o histórico atualizado — até
+        RESERVE_ATTEMPTS vezes. Nenhuma palavra sai em dois puzzles.
+        """
+        for _ in range(RESERVE_ATTEMPTS):
+            try:
+                return gerar()
+            except _UsageConflict:
+                print("♻️  Gerando de novo sem as palavras já usadas...")
+        print(f"❌ FALHA: as palavras continuaram sendo usadas por outras execuções ({RESERVE_ATTEMPTS} tentativas).")
+        return None
 
-        # Carrega bancos
-        themed_data: List[Dict] = []
-        for p in themed_files:
-            data = self._load_words_file(p)
-            if data is None:
-                return False
-            themed_data.extend(data)
-        themed_words_all = [it["word"] for it in themed_data]
-        themed_set = set(themed_words_all)
-
-        common_words_all: List[str] = []
-        if allow_fallback_common and common_file and common_file.exists():
-            tmp = self._load_words_file(common_file)
-            if tmp:
-                common_words_all = [it["word"] for it in tmp]
-        common_set = set(common_words_all)
-
-        # Históricos
-        used_them = self._load_used(self.used_thematic_path)
-        used_com = self._load_used(self.used_common_path)
-
-        # Filtra já usados
-        themed_words = [w for w in themed_words_all if w not in used_them]
-        common_words = [w for w in common_words_all if w not in used_com]
-
-        # Candidatos (temático primeiro)
-        words = list(dict.fromkeys(themed_words))
+    def registrar_wordsearch(
+        self,
+        ws: "WordSearch",
+        *,
+        allow_fallback_common: bool = True,
+        common_file_override: Optional[str] = None,
+        themed_files_override: Optional[List[str]] = None,
+    ) -> Set[str]:
+        """Como registrar_crossword, para o caça-palavras (mesmos bancos da geração)."""
+        bank, _has_themed = self._load_bank_for_run(
+            common_file_override, themed_files_override,
+            include_common=allow_fallback_common, max_len=int(ws.size),
+        )
+        if bank is None:
+            return set()
+        with self._generation_lock:
+            return self._registrar_uso(bank, ws.source_words())
+
+    def renderizar_wordsearch(
+        self,
+        ws: "WordSearch",
+        *,
+        highlight_style: str = "fill",
+        stroke_width: int = 5,
+        output_format: Optional[str] = None,
+    ) -> Dict[str, bytes]:
+        """Etapa 2 (renderização): dicas + imagens (PNG, SVG ou PDF) + arquivo de puzzle, {sufixo: bytes}."""
+        from engligen.core import puzzle_file
+
+        fmt = self._output_format(output_format)
+
+        def render() -> Dict[str, bytes]:
+            exercise, answers = self._wordsearch_renderer(ws, fmt, highlight_style, stroke_width).to_bytes_pair()
+            return {
+                f"_exercicio.{fmt}": exercise,
+                f"_respostas.{fmt}": answers,
+                "_clues.txt": "".join(line + "\n" for line in self._wordsearch_clues(ws)).encode("utf-8"),
+                puzzle_file.PUZZLE_SUFFIX: puzzle_file.dumps(ws.to_dict()),
+            }
+
+        render_parts = {
+            "fmt": fmt, "png": self._png_options(),
+            "highlight_style": highlight_style or "fill", "stroke_width": int(stroke_width or 5),
+        }
+        return self._cached_outputs(ws, render_parts, render)
+
+    def folhas_wordsearch(
+        self,
+        ws: "WordSearch",
+        *,
+        highlight_style: str = "fill",
+        stroke_width: int = 5,
+    ) -> Tuple["Scene", "Scene", List[str]]:
+        """Etapa 2 para o caderno PDF: (cena do exercício, cena do gabarito, lista de palavras)."""
+        exercise, answers = self._wordsearch_renderer(ws, "pdf", highlight_style, stroke_width).render_pair()
+        return exercise, answers, self._wordsearch_clues(ws)
+
+    @staticmethod
+    def _wordsearch_clues(ws: "WordSearch") -> List[str]:
+        # somente as colocadas, ordem alfabética p/ correção fácil
+        return [f"{i}. {w}" for i, w in enumerate(sorted(ws.placed_words.keys()), 1)]
+
+    def _wordsearch_renderer(self, ws: "WordSearch", fmt: str, highlight_style: str, stroke_width: int):
+        from engligen.rendering.vector_renderer import WordSearchVectorRenderer
+        from engligen.rendering.wordsearch_renderer import WordSearchRenderer
+
+        style = {"highlight_style": highlight_style or "fill", "stroke_width": int(stroke_width or 5)}
+        if fmt == "png":
+            return WordSearchRenderer(ws, cell_size=40, padding=25, **style, **self._png_options())
+        return WordSearchVectorRenderer(ws, fmt=fmt, cell_size=40, padding=25, **style)
+
+    def _gerar_e_registrar_wordsearch(
+        self,
+        bank: WordBank,
+        *,
+        size: int,
+        allow_fallback_common: bool,
+        max_words: Optional[int],
+        min_words: int,
+        target_occupancy: Optional[float],
+        seed: Optional[int],
+        registrar: bool = True,
+        deadline: Optional[float] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> Optional["WordSearch"]:
+        if _expired(deadline):
+            return None
+        # Históricos + palavras excluídas à parte
+        used_them = self._load_used_bits(self.used_thematic_path, bank)
+        used_com = self._load_used_bits(self.used_common_path, bank)
+        held = bank.bits_for(exclude) if exclude else 0
+
+        # Candidatos (temático primeiro; o banco já não tem duplicadas)
+        words = bank.unused(used_them | held, role=THEMED)
+        common_words = bank.unused(used_com | held, role=COMMON)
 
         # Completa mínimo com coringa se habilitado
         if allow_fallback_common and common_words and len(words) < min_words:
-            for w in common_words:
-                if w not in words:
-                    words.append(w)
-                if len(words) >= min_words:
-                    break
+            words.extend(common_words[:min_words - len(words)])
 
         if not words:
             print("❌ ERRO: Nenhuma palavra disponível para o WordSearch.")
-            return False
+            return None
+
+        seed = _seed_value(seed)
+        cache = self.puzzle_cache() if seed is not None else None
+        key = None
+        if cache is not None:
+            from engligen.storage.puzzle_cache import cache_key, digest_bits
+
+            key = cache_key(
+                kind="wordsearch", bank=bank.fingerprint(), themed=digest_bits(bank.mask(THEMED)),
+                used=[digest_bits(used_them | held), digest_bits(used_com | held)], seed=seed, size=int(size),
+                fallback=bool(allow_fallback_common), max_words=max_words, min_words=min_words,
+                occupancy=target_occupancy,
+            )
+            ws = cache.get(key)
+            if ws is not None:
+                print(f"⚡ Puzzle em cache (seed {seed}): {len(ws.placed_words)} palavras.")
+                self._puzzle_keys[ws] = key
+                if _expired(deadline):
+                    return None
+                if registrar and self._registrar_uso(bank, ws.source_words()):
+                    raise _UsageConflict()
+                return ws
 
         # Cálculo de CAP da lista
         cap: int
@@ -405,52 +1153,23 @@ class EngligenApp:
 
         # Amostra com leve aleatoriedade preservando prioridade por tamanho
         words_sorted = sorted(words, key=len, reverse=True)
-        try:
-            rng = random.Random(int(seed)) if seed is not None else random.Random()
-        except Exception:
-            rng = random.Random()
+        rng = random.Random(seed) if seed is not None else random.Random()
         pool = words_sorted[:min(len(words_sorted), cap * 2)]
         rng.shuffle(pool)
         selected = pool[:cap]
 
+        from engligen.core.wordsearch import WordSearch
+
         # Gerar
-        ws = WordSearch(words=selected, size=int(size))
+        ws = WordSearch(words=selected, size=int(size), seed=seed)
         ws.generate()
+        if cache is not None:
+            cache.put(key, ws)
+            self._puzzle_keys[ws] = key
 
-        # Palavras efetivamente posicionadas
-        placed = list(ws.placed_words.keys())
-
-        # Clues (somente as colocadas, ordem alfabética p/ correção fácil)
-        clues_path = self.output_dir / f"{output_basename}_clues.txt"
-        with open(clues_path, "w", encoding="utf-8") as f:
-            for i, w in enumerate(sorted(placed), 1):
-                f.write(f"{i}. {w}\n")
-        print(f"📄 Arquivo de dicas '{clues_path.name}' gerado.")
-
+        if _expired(deadline):
+            return None
         # Atualiza históricos com APENAS as colocadas
-        for w in placed:
-            if w in themed_set:
-                used_them.add(w)
-            elif w in common_set:
-                used_com.add(w)
-        self._save_used(self.used_thematic_path, used_them)
-        self._save_used(self.used_common_path, used_com)
-
-        # Render
-        renderer = WordSearchRenderer(
-            ws,
-            cell_size=40,
-            padding=25,
-            highlight_style=(highlight_style or "fill"),
-            stroke_width=int(stroke_width or 5),
-        )
-        ex = self.output_dir / f"{output_basename}_exercicio.png"
-        an = self.output_dir / f"{output_basename}_respostas.png"
-        renderer.generate_image(filename=str(ex), answers=False)
-        renderer.generate_image(filename=str(an), answers=True)
-        print(f"📦 Saída: {self.output_dir}")
-        print(f"   - {ex.name}")
-        print(f"   - {an.name}")
-        print(f"   - {clues_path.name}")
-        print("🎉 Tudo pronto!")
-        return True
+        if registrar and self._registrar_uso(bank, ws.source_words()):
+            raise _UsageConflict()
+        return ws
@@ -1,12 +1,14 @@
 import random
-import multiprocessing
 import sys
-from typing import List, Optional, Dict, Tuple, Set
+import time
+from typing import List, Mapping, Optional, Dict, Tuple, Set
+
+from engligen.core.wordtrie import WILDCARD, WordTrie
 
 # --- FUNÇÃO TRABALHADORA (definida fora da classe) ---
 def _run_single_attempt(args: Tuple) -> Optional[Dict[str, Dict]]:
     """Executa uma única tentativa de geração num processo separado."""
-    seed_word, other_words, themed_word_set, directions, full_word_list, max_size, target_density = args
+    seed_word, other_words, themed_word_set, common_word_set, directions, trie, max_size, target_density = args
     
     dynamic_grid: Dict[Tuple[int, int], str] = {}
     placed_words: Dict[str, Dict] = {}
@@ -27,12 +29,25 @@ def _run_single_attempt(args: Tuple) -> Optional[Dict[str, Dict]]:
             for i, char in enumerate(word):
                 dynamic_grid[(row + i * dr, col + i * dc)] = char
 
-    _fill_slots(dynamic_grid, placed_words, directions, full_word_list, themed_word_set, target_density, max_size)
+    _fill_slots(dynamic_grid, placed_words, directions, trie, themed_word_set, common_word_set, target_density, max_size)
     
     return placed_words
 
+def _run_indexed_attempt(item: Tuple[int, Tuple]) -> Tuple[int, Optional[Dict[str, Dict]]]:
+    """(índice da tentativa, resultado): permite desempatar independentemente da ordem de chegada."""
+    i, args = item
+    return i, _run_single_attempt(args)
+
 # --- Funções auxiliares ---
 
+def _covered_cells(placed_words: Dict, directions: Dict) -> Dict[str, Set[Tuple[int, int]]]:
+    """Casas cobertas por palavras em cada direção (uma casa coberta não aceita outra palavra nessa direção)."""
+    covered: Dict[str, Set[Tuple[int, int]]] = {d: set() for d in directions}
+    for word, info in placed_words.items():
+        dr, dc = directions[info["direction"]]
+        covered[info["direction"]].update((info["row"] + i * dr, info["col"] + i * dc) for i in range(len(word)))
+    return covered
+
 def _find_best_placement_for(word: str, grid: Dict, directions: Dict, themed_set: Set, max_size: Tuple[int, int], placed_words: Dict) -> Optional[Dict]:
     """Encontra a melhor posição para uma palavra, com verificações de qualidade aprimoradas."""
     best_placement = None
@@ -44,30 +59,23 @@ def _find_best_placement_for(word: str, grid: Dict, directions: Dict, themed_set
         min_c, max_c = min(c for r, c in coords), max(c for r, c in coords)
     current_bounds = (min_r, max_r, min_c, max_c)
 
-    for i, letter in enumerate(word):
-        for (r, c), char_in_grid in grid.items():
-            if char_in_grid == letter:
-                for d_name, (dr, dc) in directions.items():
-                    is_crossing_occupied = False
-                    for p_word, p_info in placed_words.items():
-                        if p_info['direction'] == d_name:
-                            p_r, p_c = p_info['row'], p_info['col']
-                            p_len = len(p_word)
-                            p_dr, p_dc = directions[d_name]
-                            if d_name == 'horizontal' and r == p_r and c >= p_c and c < p_c + p_len * p_dc:
-                                is_crossing_occupied = True
-                                break
-                            if d_name == 'vertical' and c == p_c and r >= p_r and r < p_r + p_len * p_dr:
-                                is_crossing_occupied = True
-                                break
-                    if is_crossing_occupied:
-                        continue
+    # índices montados uma vez por palavra (mesma ordem de grid.items(): desempates iguais)
+    cells_by_letter: Dict[str, List[Tuple[int, int]]] = {}
+    for cell, char_in_grid in grid.items():
+        cells_by_letter.setdefault(char_in_grid, []).append(cell)
+    covered = _covered_cells(placed_words, directions)
 
-                    row_start, col_start = r - i * dr, c - i * dc
-                    if _can_place_dynamically(word, row_start, col_start, d_name, grid, directions, max_size, current_bounds):
-                        score = _calculate_score(word, row_start, col_start, d_name, grid, directions, themed_set, current_bounds)
-                        if not best_placement or score > best_placement.get("score", -1):
-                            best_placement = {"row": row_start, "col": col_start, "direction": d_name, "score": score}
+    for i, letter in enumerate(word):
+        for (r, c) in cells_by_letter.get(letter, ()):
+            for d_name, (dr, dc) in directions.items():
+                if (r, c) in covered[d_name]:
+                    continue
+
+                row_start, col_start = r - i * dr, c - i * dc
+                if _can_place_dynamically(word, row_start, col_start, d_name, grid, directions, max_size, current_bounds):
+                    score = _calculate_score(word, row_start, col_start, d_name, grid, directions, themed_set, current_bounds)
+                    if not best_placement or score > best_placement.get("score", -1):
+                        best_placement = {"row": row_start, "col": col_start, "direction": d_name, "score": score}
     return best_placement
 
 def _calculate_score(word: str, r_start: int, c_start: int, d_name: str, grid: Dict, directions: Dict, themed_set: Set, bounds: Tuple) -> int:
@@ -156,78 +164,86 @@ def _can_place_dynamically(word: str, r_start: int, c_start: int, d_name: str,
                 return False
 
     return True
-def _fill_slots(grid: Dict, placed: Dict, directions: Dict, full_word_list: List[str], themed_word_set: Set, target_density: float, max_size: Tuple[int, int]):
-    themed_fill_words = [w for w in full_word_list if w in themed_word_set]
-    common_fill_words = [w for w in full_word_list if w not in themed_word_set]
-    prioritized_list = themed_fill_words + common_fill_words
-
-    was_improved = True
-    while was_improved:
-        was_improved = False
-        coords = list(grid.keys())
-        if not coords: return
-        
-        min_r, max_r = min(r for r,c in coords), max(r for r,c in coords)
-        min_c, max_c = min(c for r,c in coords), max(c for r,c in coords)
-
-        current_width = max_c - min_c + 1
-        current_height = max_r - min_r + 1
-        total_cells = current_width * current_height
-        if total_cells > 0 and (len(grid) / total_cells) >= target_density:
-            break
-
-        for d_name, (dr, dc) in directions.items():
-            if d_name == 'horizontal':
-                outer_range, inner_range = range(min_r, max_r + 1), range(min_c - 1, max_c + 2)
-            else:
-                outer_range, inner_range = range(min_c, max_c + 1), range(min_r - 1, max_r + 2)
-
-            for fixed_axis_val in outer_range:
-                slot_start_coord = -1
-                for scan_axis_val in inner_range:
-                    r, c = (fixed_axis_val, scan_axis_val) if d_name == 'horizontal' else (scan_axis_val, fixed_axis_val)
-                    
-                    if grid.get((r, c)) is None:
-                        if slot_start_coord == -1: slot_start_coord = scan_axis_val
+def _fill_slots(grid: Dict, placed: Dict, directions: Dict, trie: WordTrie, themed_word_set: Set, common_word_set: Set, target_density: float, max_size: Tuple[int, int]):
+    """
+    Completa a grade até a densidade alvo: cada trecho de linha/coluna com ao menos uma
+    letra já colocada e uma casa livre vira um padrão ("A..LE") consultado no trie —
+    temáticas primeiro, depois coringa. As casas livres seguem as regras de
+    _can_place_dynamically (sem vizinho ortogonal, nada colado antes/depois) e as letras
+    reaproveitadas não podem pertencer a outra palavra na mesma direção.
+    """
+    while _fill_one_slot(grid, placed, directions, trie, themed_word_set, common_word_set, target_density, max_size):
+        pass
+
+def _fill_one_slot(grid: Dict, placed: Dict, directions: Dict, trie: WordTrie, themed_word_set: Set, common_word_set: Set, target_density: float, max_size: Tuple[int, int]) -> bool:
+    """Coloca a primeira palavra que couber num trecho da grade; False se nada couber (ou densidade atingida)."""
+    coords = list(grid.keys())
+    if not coords: return False
+    min_r, max_r = min(r for r,c in coords), max(r for r,c in coords)
+    min_c, max_c = min(c for r,c in coords), max(c for r,c in coords)
+    total_cells = (max_r - min_r + 1) * (max_c - min_c + 1)
+    if (len(grid) / total_cells) >= target_density:
+        return False
+
+    # casas já cobertas por palavras em cada direção (não podem ser estendidas/reusadas)
+    covered = _covered_cells(placed, directions)
+
+    for d_name, (dr, dc) in directions.items():
+        pr, pc = directions["vertical" if d_name == "horizontal" else "horizontal"]
+        if d_name == "horizontal":
+            outer_range, lo, hi, limit = range(min_r, max_r + 1), min_c, max_c, max_size[1]
+        else:
+            outer_range, lo, hi, limit = range(min_c, max_c + 1), min_r, max_r, max_size[0]
+        same_dir = covered[d_name]
+        for fixed in outer_range:
+            at = (lambda v: (fixed, v)) if d_name == "horizontal" else (lambda v: (v, fixed))
+            # início possível: sem ultrapassar o tamanho máximo da grade
+            for s in range(hi - limit + 1, lo + limit):
+                if grid.get(at(s - 1)) is not None:
+                    continue  # colado no fim de outra palavra
+                chars: List[str] = []
+                has_letter = has_blank = False
+                for e in range(s, s + limit):
+                    if max(e, hi) - min(s, lo) + 1 > limit:
+                        break
+                    cell = at(e)
+                    ch = grid.get(cell)
+                    if ch is not None:
+                        if cell in same_dir:
+                            break
+                        has_letter = True
+                        chars.append(ch)
                     else:
-                        if slot_start_coord != -1:
-                            length = scan_axis_val - slot_start_coord
-                            if length > 2:
-                                s_r, s_c = (fixed_axis_val, slot_start_coord) if d_name == 'horizontal' else (slot_start_coord, fixed_axis_val)
-                                
-                                creates_connection = False
-                                for i in range(length):
-                                    check_r, check_c = s_r + i * dr, s_c + i * dc
-                                    perp_dr, perp_dc = directions['vertical' if d_name == 'horizontal' else 'horizontal']
-                                    if grid.get((check_r - perp_dr, check_c - perp_dc)) or grid.get((check_r + perp_dr, check_c + perp_dc)):
-                                        creates_connection = True
-                                        break
-                                
-                                if not creates_connection:
-                                    slot_start_coord = -1
-                                    continue
-                                    
-                                pattern = "".join([grid.get((s_r + i * dr, s_c + i * dc)) or '.' for i in range(length)])
-                                if '.' not in pattern:
-                                    for word in prioritized_list:
-                                        if len(word) == length and word not in placed:
-                                            if all(pattern[i] == char for i, char in enumerate(word)):
-                                                placed[word] = {"row": s_r, "col": s_c, "direction": d_name}
-                                                for i, char_to_place in enumerate(word): grid[(s_r + i * dr, s_c + i * dc)] = char_to_place
-                                                was_improved = True
-                                                break
-                            slot_start_coord = -1
-                        if was_improved: break
-                if was_improved: break
-            if was_improved: break
+                        r, c = cell
+                        if grid.get((r - pr, c - pc)) is not None or grid.get((r + pr, c + pc)) is not None:
+                            break
+                        has_blank = True
+                        chars.append(WILDCARD)
+                    if len(chars) < 3 or not (has_letter and has_blank) or grid.get(at(e + 1)) is not None:
+                        continue
+                    pattern = "".join(chars)
+                    word = (trie.first(pattern, allowed=themed_word_set, exclude=placed)
+                            or trie.first(pattern, allowed=common_word_set, exclude=placed))
+                    if word:
+                        s_r, s_c = at(s)
+                        placed[word] = {"row": s_r, "col": s_c, "direction": d_name}
+                        for i, char_to_place in enumerate(word): grid[(s_r + i * dr, s_c + i * dc)] = char_to_place
+                        return True
+    return False
 
 class Crossword:
-    def __init__(self, themed_words: List[str], common_words: List[str], num_attempts: int = 50, max_size: Tuple[int, int] = (30, 30), target_density: float = 0.7):
-        self.themed_words = sorted(list(set(w.upper() for w in themed_words if len(w) > 2)), key=len, reverse=True)
-        self.common_words = sorted(list(set(w.upper() for w in common_words if len(w) > 2)), key=len, reverse=True)
+    def __init__(self, themed_words: List[str], common_words: List[str], num_attempts: int = 50, max_size: Tuple[int, int] = (30, 30), target_density: float = 0.7, trie: Optional[WordTrie] = None):
+        # ordem total (tamanho desc., depois alfabética): a ordem de um set muda entre
+        # processos (hash aleatório), e com ela a grade gerada para a mesma seed
+        self.themed_words = sorted(set(w.upper() for w in themed_words if len(w) > 2), key=lambda w: (-len(w), w))
+        self.common_words = sorted(set(w.upper() for w in common_words if len(w) > 2), key=lambda w: (-len(w), w))
         self.themed_word_set = set(self.themed_words)
+        self.common_word_set = set(self.common_words) - self.themed_word_set
         self.full_word_list = self.themed_words + self.common_words
         random.shuffle(self.full_word_list)
+        # dicionário para o preenchimento por padrão (_fill_slots); pode conter mais palavras
+        # do que as listas acima (ex.: o banco inteiro) — as consultas filtram pelos sets
+        self.trie = trie
         
         self.num_attempts = num_attempts
         self.max_size = max_size
@@ -236,52 +252,141 @@ class Crossword:
         self.grid: List[List[Optional[str]]] = []
         self.placed_words: Dict[str, Dict] = {}
         self.width, self.height = 0, 0
-
-    def generate(self) -> bool:
+        # dicas das palavras colocadas (preenchidas ao carregar um arquivo de puzzle)
+        self.clues: Dict[str, str] = {}
+
+    @classmethod
+    def from_wordbank(cls, bank, *, used_themed=frozenset(), used_common=frozenset(), **kwargs) -> "Crossword":
+        """
+        Instancia a partir de um WordBank, descartando as palavras já usadas no histórico.
+        `used_*` aceita um set de palavras ou um bitmap (int) alinhado ao índice do banco.
+        O trie do banco (bank.trie()) é reaproveitado, salvo se `trie` vier em kwargs.
+        """
+        kwargs.setdefault("trie", bank.trie())
+        return cls(
+            themed_words=bank.unused(used_themed, role="themed"),
+            common_words=bank.unused(used_common, role="common"),
+            **kwargs,
+        )
+
+    def generate(self, pool=None) -> bool:
+        """
+        Roda as tentativas em paralelo. `pool` (multiprocessing.Pool) permite reaproveitar
+        um pool já aquecido entre vários puzzles; sem ele, um pool é criado e fechado aqui.
+        """
         words_to_try_as_seed = self.themed_words[:self.num_attempts]
         if not words_to_try_as_seed:
             print("❌ ERRO: Nenhuma palavra temática longa o suficiente para iniciar a geração.")
             return False
         
+        if self.trie is None:
+            self.trie = WordTrie.from_words(self.themed_words + self.common_words)
+
         tasks_args = []
         for seed in words_to_try_as_seed:
             other_words = [w for w in self.full_word_list if w != seed]
             random.shuffle(other_words)
-            tasks_args.append((seed, other_words, self.themed_word_set, self.directions, self.full_word_list, self.max_size, self.target_density))
+            tasks_args.append((seed, other_words, self.themed_word_set, self.common_word_set, self.directions, self.trie, self.max_size, self.target_density))
 
         print(f"⚙️  Executando {len(tasks_args)} tentativas em paralelo (limite: {self.max_size[0]}x{self.max_size[1]}, densidade alvo: {self.target_density:.0%})...")
         results = []
         try:
-            with multiprocessing.Pool() as pool:
-                imap_results = pool.imap_unordered(_run_single_attempt, tasks_args)
-                for i, result in enumerate(imap_results):
-                    progress = (i + 1) / len(tasks_args)
-                    bar_length = 30
-                    filled_length = int(bar_length * progress)
-                    bar = '█' * filled_length + '-' * (bar_length - filled_length)
-                    sys.stdout.write(f'\r   Progresso: |{bar}| {i+1}/{len(tasks_args)} Concluído')
-                    sys.stdout.flush()
-                    if result:
-                        results.append(result)
+            if pool is not None:
+                self._collect(pool, tasks_args, results)
+            else:
+                import multiprocessing  # importado só aqui: acelera a abertura do CLI
+
+                with multiprocessing.Pool() as own_pool:
+                    self._collect(own_pool, tasks_args, results)
         except (ImportError, OSError, AttributeError):
             print("\n⚠️  Aviso: Multiprocessing não pôde ser iniciado. Executando em modo sequencial (mais lento).")
-            for args in tasks_args:
+            for i, args in enumerate(tasks_args):
                 result = _run_single_attempt(args)
                 if result:
-                    results.append(result)
+                    results.append((i, result))
         print("\n")
 
-        successful_results = [res for res in results if res]
+        successful_results = [(i, res) for i, res in results if res]
         if not successful_results: 
             print("❌ FALHA: Nenhuma grade válida encontrada. Tente novamente ou ajuste os bancos de palavras.")
             return False
 
-        best_placed_words = max(successful_results, key=len)
+        # mais palavras vence; empate -> a tentativa de menor índice (determinístico,
+        # não depende de qual processo terminou primeiro)
+        _, best_placed_words = max(successful_results, key=lambda ir: (len(ir[1]), -ir[0]))
         print(f"✨ Melhor resultado encontrado com {len(best_placed_words)} palavras.")
         self.placed_words = best_placed_words
         self._finalize_grid()
         return True
 
+    def generate_from_template(
+        self,
+        template: Optional[List[str]] = None,
+        *,
+        time_budget: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        attempts: int = 5,
+    ) -> bool:
+        """
+        Modo modelo: preenche um molde fixo de blocos (engligen.core.template) em vez de
+        crescer a grade. `template`: linhas do molde ("#" bloco, "." livre, letra fixa);
+        None = molde simétrico sorteado dentro de max_size (um novo a cada tentativa que
+        falhar, até `attempts`). Orçamento total de tempo/nós dividido entre as tentativas.
+        Produz placed_words/grid no mesmo formato do modo livre.
+        """
+        from engligen.core import template as tpl
+
+        time_budget = tpl.DEFAULT_TIME_BUDGET if time_budget is None else float(time_budget)
+        max_nodes = tpl.DEFAULT_MAX_NODES if max_nodes is None else int(max_nodes)
+        if self.trie is None:
+            self.trie = WordTrie.from_words(self.themed_words + self.common_words)
+        tries = 1 if template is not None else max(1, int(attempts))
+        deadline = time.monotonic() + time_budget
+        nodes_left = max_nodes
+        statuses: List[str] = []
+        for attempt in range(tries):
+            rows = template if template is not None else tpl.symmetric_template(*self.max_size, rng=random)
+            filler = tpl.TemplateFiller(
+                tpl.parse_template(rows), self.trie, self.themed_word_set, self.common_word_set, rng=random,
+                time_budget=max(0.0, deadline - time.monotonic()) / (tries - attempt), max_nodes=nodes_left // (tries - attempt),
+            )
+            placed = filler.fill()
+            nodes_left -= filler.nodes
+            statuses.append(filler.status)
+            print(f"🧩 Molde {len(filler.cells)}x{len(filler.cells[0])} ({len(filler.slots)} vagas): "
+                  f"{filler.status}, {filler.nodes} nós em {filler.seconds:.2f}s.")
+            if placed is not None:
+                self.placed_words = placed
+                self.grid = filler.grid()
+                self.height, self.width = len(self.grid), len(self.grid[0])
+                print(f"✨ Molde preenchido com {len(placed)} palavras.")
+                return True
+            if time.monotonic() >= deadline or nodes_left <= 0:
+                break
+        if "budget" in statuses or len(statuses) < tries:
+            print("❌ FALHA: o orçamento (tempo/nós) acabou antes de o molde ser preenchido. "
+                  "Aumente crossword_template.time_budget/max_nodes no config ou tente outro molde.")
+        elif template is not None:
+            print("❌ FALHA: o molde não tem preenchimento com estes bancos (busca completa). "
+                  "Tente outro molde ou bancos maiores.")
+        else:
+            print(f"❌ FALHA: nenhum dos {tries} moldes sorteados tem preenchimento com estes bancos. "
+                  "Tente outro tamanho ou bancos maiores.")
+        return False
+
+    @staticmethod
+    def _collect(pool, tasks_args: List[Tuple], results: List[Tuple[int, Dict]]) -> None:
+        imap_results = pool.imap_unordered(_run_indexed_attempt, enumerate(tasks_args))
+        for i, (index, result) in enumerate(imap_results):
+            progress = (i + 1) / len(tasks_args)
+            bar_length = 30
+            filled_length = int(bar_length * progress)
+            bar = '█' * filled_length + '-' * (bar_length - filled_length)
+            sys.stdout.write(f'\r   Progresso: |{bar}| {i+1}/{len(tasks_args)} Concluído')
+            sys.stdout.flush()
+            if result:
+                results.append((index, result))
+
     def _finalize_grid(self):
         if not self.placed_words: return
 
@@ -310,4 +415,69 @@ class Crossword:
             dr, dc = self.directions[d]
             for i, char in enumerate(word):
                 self.grid[new_r + i * dr][new_c + i * dc] = char
-        self.placed_words = final_placed_words
\ No newline at end of file
+        self.placed_words = final_placed_words
+
+    # --- Arquivo de puzzle (engligen.core.puzzle_file) ---
+
+    def to_dict(self, clues: Optional[Mapping[str, str]] = None) -> Dict:
+        """
+        Conteúdo do arquivo de puzzle: grade, posições, numeração (a mesma do
+        ClueGenerator) e dicas. `clues`: WordBank ou dict word -> dica (padrão: self.clues).
+        """
+        from engligen.core.puzzle_file import BLOCK
+        from engligen.rendering.clue_generator import ClueGenerator
+
+        cg = ClueGenerator(self, self.clues if clues is None else clues)
+        words = []
+        for word, info in sorted(self.placed_words.items(), key=lambda item: cg.word_clues[item[0]]["num"]):
+            words.append({
+                "word": word,
+                "row": info["row"],
+                "col": info["col"],
+                "direction": info["direction"],
+                "num": cg.word_clues[word]["num"],
+                "clue": cg.clues_map.get(word, ""),
+                "themed": word in self.themed_word_set,
+            })
+        return {
+            "kind": "crossword",
+            "size": [self.height, self.width],
+            "max_size": list(self.max_size),
+            "target_density": self.target_density,
+            "grid": ["".join(BLOCK if ch is None else ch for ch in row) for row in self.grid],
+            "words": words,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Crossword":
+        """Reconstrói a cruzada de um arquivo de puzzle (sem gerar nada)."""
+        from engligen.core.puzzle_file import BLOCK
+
+        cw = cls([], [], max_size=tuple(data.get("max_size") or (30, 30)),
+                 target_density=float(data.get("target_density", 0.7)))
+        words = data["words"]
+        cw.placed_words = {w["word"]: {"row": int(w["row"]), "col": int(w["col"]), "direction": w["direction"]}
+                           for w in words}
+        cw.clues = {w["word"]: w.get("clue", "") for w in words}
+        cw.themed_words = [w["word"] for w in words if w.get("themed")]
+        cw.themed_word_set = set(cw.themed_words)
+        cw.grid = [[None if ch == BLOCK else ch for ch in row] for row in data["grid"]]
+        cw.height = len(cw.grid)
+        cw.width = len(cw.grid[0]) if cw.grid else 0
+        return cw
+
+    def save(self, target, clues: Optional[Mapping[str, str]] = None) -> None:
+        """Grava o arquivo de puzzle em `target` (caminho ou arquivo binário)."""
+        from engligen.core import puzzle_file
+
+        puzzle_file.write(self.to_dict(clues), target)
+
+    @classmethod
+    def load(cls, source) -> "Crossword":
+        """Lê um arquivo de puzzle de cruzada (caminho ou arquivo binário)."""
+        from engligen.core import puzzle_file
+
+        data = puzzle_file.read(source)
+        if data["kind"] != "crossword":
+            raise ValueError(f"o arquivo contém um puzzle do tipo {data['kind']!r}, não uma cruzada")
+        return cls.from_dict(data)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Union
+
+# Arquivo de puzzle (`<nome-base>_puzzle.json`): JSON compacto e versionado com tudo o
+# que os renderers precisam para refazer as folhas sem regenerar a grade:
+#   {"format": "engligen-puzzle", "version": 1, "kind": "crossword"|"wordsearch",
+#    "grid": ["CAT#", ...], "words": [{"word", posição, "num", "clue"?...}], ...}
+# Crossword.save/load e WordSearch.save/load montam/leem o conteúdo de cada tipo.
+FORMAT = "engligen-puzzle"
+FORMAT_VERSION = 1
+PUZZLE_SUFFIX = "_puzzle.json"
+BLOCK = "#"  # casa bloqueada (None) na grade da cruzada
+
+
+def dumps(payload: Dict) -> bytes:
+    """Envelope versionado + JSON compacto (uma linha), em UTF-8."""
+    data = {"format": FORMAT, "version": FORMAT_VERSION, **payload}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: Union[bytes, str]) -> Dict:
+    """Lê e valida o envelope; ValueError se não for um arquivo de puzzle suportado."""
+    data = json.loads(raw)
+    if not isinstance(data, dict) or data.get("format") != FORMAT:
+        raise ValueError("não é um arquivo de puzzle do engligen")
+    version = data.get("version")
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"versão do arquivo de puzzle não suportada: {version!r} (máx. {FORMAT_VERSION})")
+    if data.get("kind") not in ("crossword", "wordsearch"):
+        raise ValueError(f"tipo de puzzle desconhecido: {data.get('kind')!r}")
+    return data
+
+
+def write(payload: Dict, target) -> None:
+    """Grava `payload` em `target` (caminho ou arquivo binário)."""
+    raw = dumps(payload)
+    if hasattr(target, "write"):
+        target.write(raw)
+        return
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(raw)
+
+
+def read(source) -> Dict:
+    """Lê um arquivo de puzzle de `source` (caminho ou arquivo binário)."""
+    if hasattr(source, "read"):
+        return loads(source.read())
+    with open(source, "rb") as f:
+        return loads(f.read())
+
+
+def load_puzzle(source):
+    """Crossword ou WordSearch, conforme o "kind" do arquivo."""
+    data = read(source)
+    if data["kind"] == "crossword":
+        from engligen.core.crossword import Crossword
+
+        return Crossword.from_dict(data)
+    from engligen.core.wordsearch import WordSearch
+
+    return WordSearch.from_dict(data)
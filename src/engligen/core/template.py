@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from engligen.core.wordtrie import WILDCARD, WordTrie
+
+# Modo "modelo" da cruzada: em vez de crescer a grade a partir de uma palavra, preenche
+# um molde fixo de blocos. O molde é uma lista de linhas:
+#   "#" = bloco   "." = casa livre   letra = casa já preenchida (fica como está)
+# Vagas = trechos de 3+ casas livres numa linha/coluna; trechos de 1 casa são "não
+# cruzados" (a casa pertence só à palavra da outra direção). Trechos de 2 são inválidos.
+#
+# O preenchimento é uma busca com retrocesso sobre as vagas (TemplateFiller):
+#   - ordem: a vaga com menos candidatas primeiro (contagem no WordTrie, memorizada)
+#   - candidatas: temáticas primeiro, depois coringa (embaralhadas pelo `rng`)
+#   - verificação adiante: toda vaga cruzada precisa continuar com alguma candidata
+#   - salto dirigido por conflito (conflict-directed backjumping): ao falhar, volta
+#     direto à vaga mais recente que causou o conflito, sem testar as do meio
+#   - orçamento: tempo (segundos) e nós (palavras testadas) — molde impossível não trava
+BLOCK = "#"
+OPEN = WILDCARD
+MIN_SLOT = 3
+DEFAULT_TIME_BUDGET = 10.0
+DEFAULT_MAX_NODES = 200_000
+DEFAULT_MAX_RUN = 7  # maior trecho nos moldes gerados (palavras longas são raras no banco)
+
+Cells = List[List[Optional[str]]]  # None = bloco, "." = livre, letra = pré-preenchida
+
+
+class BudgetExceeded(Exception):
+    """Tempo ou número de nós do preenchimento esgotado."""
+
+
+class _Slot:
+    __slots__ = ("index", "row", "col", "direction", "cells", "crossers")
+
+    def __init__(self, index: int, row: int, col: int, direction: str, cells: List[Tuple[int, int]]) -> None:
+        self.index = index
+        self.row = row
+        self.col = col
+        self.direction = direction
+        self.cells = cells
+        self.crossers: List[int] = []
+
+
+# -------------------- moldes --------------------
+def parse_template(rows: Sequence[str]) -> Cells:
+    """Linhas do molde -> matriz de casas. ValueError se não for retangular/vazio."""
+    rows = [r.strip().upper() for r in rows if r.strip()]
+    if not rows:
+        raise ValueError("molde vazio")
+    width = len(rows[0])
+    if any(len(r) != width for r in rows):
+        raise ValueError("todas as linhas do molde precisam ter o mesmo tamanho")
+    return [[None if ch == BLOCK else ch for ch in r] for r in rows]
+
+
+def template_rows(cells: Cells) -> List[str]:
+    return ["".join(BLOCK if ch is None else ch for ch in row) for row in cells]
+
+
+def find_slots(cells: Cells) -> List[_Slot]:
+    """Vagas do molde (horizontais, depois verticais) com os cruzamentos já ligados."""
+    height, width = len(cells), len(cells[0])
+    slots: List[_Slot] = []
+    in_slot: Dict[Tuple[int, int], List[int]] = {}
+    for direction, outer, inner in (("horizontal", height, width), ("vertical", width, height)):
+        for a in range(outer):
+            run: List[Tuple[int, int]] = []
+            for b in range(inner + 1):
+                cell = (a, b) if direction == "horizontal" else (b, a)
+                if b < inner and cells[cell[0]][cell[1]] is not None:
+                    run.append(cell)
+                    continue
+                if len(run) == 2:
+                    raise ValueError(f"trecho de 2 casas em {run[0]} ({direction}): use 1 ou 3+")
+                if len(run) >= MIN_SLOT:
+                    slot = _Slot(len(slots), run[0][0], run[0][1], direction, run)
+                    for c in run:
+                        in_slot.setdefault(c, []).append(slot.index)
+                    slots.append(slot)
+                run = []
+    for r in range(height):
+        for c in range(width):
+            if cells[r][c] is not None and (r, c) not in in_slot:
+                raise ValueError(f"casa ({r}, {c}) do molde não pertence a nenhuma palavra")
+    for owners in in_slot.values():
+        if len(owners) == 2:
+            a, b = owners
+            slots[a].crossers.append(b)
+            slots[b].crossers.append(a)
+    return slots
+
+
+def _runs(n: int, points: Sequence[int]) -> List[int]:
+    bounds = [-1] + sorted(points) + [n]
+    return [bounds[i + 1] - bounds[i] - 1 for i in range(len(bounds) - 1)]
+
+
+def _split_points(n: int, rng, weights: Dict[int, int], palindrome: bool) -> List[int]:
+    """
+    Posições (ímpares) dos blocos que quebram uma linha de `n` casas (n ímpar) em trechos
+    sorteados por `weights` ({tamanho ímpar: peso}); a cada passo o trecho restante
+    inteiro também concorre, se o tamanho dele estiver em `weights`. `palindrome`: a
+    linha é o próprio espelho (linha/coluna central) — sorteia a metade e espelha.
+    """
+    best: List[int] = []
+    best_bad = n + 1
+    for _ in range(30):
+        points: List[int] = []
+        s = 0
+        limit = (n - 1) // 2 if palindrome else n
+        while True:
+            rest = n - s
+            choices = [L for L in weights if s + L < limit and rest - L - 1 >= MIN_SLOT]
+            if not palindrome and rest in weights:
+                choices.append(rest)
+            if not choices:
+                break
+            L = rng.choices(choices, [weights[L] for L in choices])[0]
+            if L == rest:
+                break
+            points.append(s + L)
+            s += L + 1
+        if palindrome:
+            center = (n - 1) // 2
+            points = points + [n - 1 - p for p in points]
+            if center % 2 == 1 and min(_runs(n, points + [center])) >= MIN_SLOT and rng.random() < 0.5:
+                points.append(center)
+        runs = _runs(n, points)
+        if min(runs) < MIN_SLOT:
+            continue
+        bad = sum(1 for L in runs if L not in weights)  # trechos de tamanho fora da lista
+        if not bad:
+            return sorted(points)
+        if bad < best_bad:
+            best, best_bad = sorted(points), bad
+    return best
+
+
+def symmetric_template(
+    altura: int,
+    largura: int,
+    *,
+    rng=None,
+    max_run: int = DEFAULT_MAX_RUN,
+) -> List[str]:
+    """
+    Molde com simetria rotacional (180°) dentro de altura×largura — dimensões pares
+    perdem uma linha/coluna. Base em treliça: linhas e colunas pares são palavras,
+    blocos nas casas (ímpar, ímpar); blocos extras quebram os trechos em tamanhos
+    ímpares de 3 a `max_run`.
+    """
+    rng = rng or random
+    h = altura if altura % 2 else altura - 1
+    w = largura if largura % 2 else largura - 1
+    if h < MIN_SLOT or w < MIN_SLOT:
+        raise ValueError(f"molde precisa de pelo menos {MIN_SLOT}x{MIN_SLOT}")
+    weights = {L: 1 for L in range(MIN_SLOT, max(max_run, MIN_SLOT) + 1, 2)}
+    cells: Cells = [[OPEN if r % 2 == 0 or c % 2 == 0 else None for c in range(w)] for r in range(h)]
+    for r in range(0, h, 2):
+        mirror = h - 1 - r
+        if mirror < r:
+            break
+        for c in _split_points(w, rng, weights, palindrome=(mirror == r)):
+            cells[r][c] = None
+            cells[mirror][w - 1 - c] = None
+    for c in range(0, w, 2):
+        mirror = w - 1 - c
+        if mirror < c:
+            break
+        for r in _split_points(h, rng, weights, palindrome=(mirror == c)):
+            cells[r][c] = None
+            cells[h - 1 - r][mirror] = None
+    return template_rows(cells)
+
+
+# -------------------- preenchimento --------------------
+class TemplateFiller:
+    """
+    Preenche um molde com palavras do `trie` (restritas a `themed`/`common`):
+
+        filler = TemplateFiller(parse_template(rows), trie, themed_set, common_set)
+        placed = filler.fill()     # {word: {"row","col","direction"}} ou None
+        filler.status, filler.nodes, filler.seconds
+
+    `status`: "ok", "impossible" (busca esgotada) ou "budget" (tempo/nós acabaram).
+    """
+
+    def __init__(
+        self,
+        cells: Cells,
+        trie: WordTrie,
+        themed: Set[str],
+        common: Set[str],
+        *,
+        rng=None,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ) -> None:
+        self.cells = cells
+        self.slots = find_slots(cells)
+        self.trie = trie
+        self.themed = themed
+        self.common = common
+        self.allowed = themed | common
+        self.rng = rng or random
+        self.time_budget = float(time_budget)
+        self.max_nodes = int(max_nodes)
+        self.nodes = 0
+        self.seconds = 0.0
+        self.status = ""
+        self._deadline = 0.0
+        # estado da busca
+        self._letters: Dict[Tuple[int, int], str] = {
+            (r, c): ch for r, row in enumerate(cells) for c, ch in enumerate(row) if ch is not None and ch != OPEN
+        }
+        self._preset = set(self._letters)
+        self._cover: Dict[Tuple[int, int], int] = {}
+        self._word_of: Dict[int, str] = {}
+        self._owner: Dict[str, int] = {}  # palavra -> vaga (também serve de "exclude")
+        self._counts: Dict[str, int] = {}
+
+    # ---------- consultas ----------
+    def _pattern(self, slot: _Slot) -> str:
+        letters = self._letters
+        return "".join(letters.get(cell, OPEN) for cell in slot.cells)
+
+    def _count(self, pattern: str) -> int:
+        n = self._counts.get(pattern)
+        if n is None:
+            n = self._counts[pattern] = self.trie.count(pattern, allowed=self.allowed)
+        return n
+
+    def _pick_slot(self) -> Optional[_Slot]:
+        """Vaga livre com menos candidatas (empate: a mais longa, depois a primeira)."""
+        best = None
+        best_key = None
+        for slot in self.slots:
+            if slot.index in self._word_of:
+                continue
+            key = (self._count(self._pattern(slot)), -len(slot.cells), slot.index)
+            if best_key is None or key < best_key:
+                best, best_key = slot, key
+        return best
+
+    def _candidates(self, pattern: str) -> List[str]:
+        themed = list(self.trie.matches(pattern, allowed=self.themed, exclude=self._owner))
+        common = list(self.trie.matches(pattern, allowed=self.common, exclude=self._owner))
+        self.rng.shuffle(themed)
+        self.rng.shuffle(common)
+        return themed + common
+
+    def _reasons(self, slot: _Slot, pattern: str) -> Set[int]:
+        """Vagas que explicam a falta de candidatas em `slot`: cruzadas preenchidas + donas das palavras que serviriam."""
+        reasons = {i for i in slot.crossers if i in self._word_of}
+        for word in self.trie.matches(pattern, allowed=self.allowed):
+            owner = self._owner.get(word)
+            if owner is not None:
+                reasons.add(owner)
+        return reasons
+
+    # ---------- atribuição ----------
+    def _assign(self, slot: _Slot, word: str) -> None:
+        self._word_of[slot.index] = word
+        self._owner[word] = slot.index
+        for cell, ch in zip(slot.cells, word):
+            self._letters[cell] = ch
+            self._cover[cell] = self._cover.get(cell, 0) + 1
+
+    def _unassign(self, slot: _Slot, word: str) -> None:
+        del self._word_of[slot.index]
+        del self._owner[word]
+        for cell in slot.cells:
+            self._cover[cell] -= 1
+            if not self._cover[cell] and cell not in self._preset:
+                del self._letters[cell]
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes > self.max_nodes or time.monotonic() > self._deadline:
+            raise BudgetExceeded()
+
+    def _forward_check(self, slot: _Slot) -> Optional[Set[int]]:
+        """None se toda vaga cruzada ainda tem candidata; senão, o conjunto de conflito."""
+        for i in slot.crossers:
+            if i in self._word_of:
+                continue
+            other = self.slots[i]
+            pattern = self._pattern(other)
+            if not self._count(pattern) or self.trie.first(pattern, allowed=self.allowed, exclude=self._owner) is None:
+                return self._reasons(other, pattern)
+        return None
+
+    # ---------- busca ----------
+    def _search(self) -> Tuple[bool, Set[int]]:
+        slot = self._pick_slot()
+        if slot is None:
+            return True, set()
+        pattern = self._pattern(slot)
+        conflict: Set[int] = set()
+        for word in self._candidates(pattern):
+            self._tick()
+            self._assign(slot, word)
+            sub = self._forward_check(slot)
+            if sub is None:
+                ok, sub = self._search()
+                if ok:
+                    return True, set()
+            self._unassign(slot, word)
+            if slot.index not in sub:
+                return False, sub  # o conflito não depende desta vaga: salta por cima dela
+            conflict |= sub
+        conflict.discard(slot.index)
+        return False, conflict | self._reasons(slot, pattern)
+
+    def fill(self) -> Optional[Dict[str, Dict]]:
+        start = time.monotonic()
+        self._deadline = start + self.time_budget
+        self.nodes = 0
+        try:
+            ok, _ = self._search()
+            self.status = "ok" if ok else "impossible"
+        except BudgetExceeded:
+            ok = False
+            self.status = "budget"
+        finally:
+            self.seconds = time.monotonic() - start
+        if not ok:
+            return None
+        return {
+            self._word_of[s.index]: {"row": s.row, "col": s.col, "direction": s.direction}
+            for s in self.slots
+        }
+
+    def grid(self) -> List[List[Optional[str]]]:
+        """Grade final (letras; None nos blocos) — válida depois de um fill() com sucesso."""
+        return [
+            [None if ch is None else self._letters.get((r, c)) for c, ch in enumerate(row)]
+            for r, row in enumerate(self.cells)
+        ]
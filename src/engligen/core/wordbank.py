@@ -0,0 +1,222 @@
+from __future__ import annotations
+import hashlib
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from engligen.core.wordtrie import WordTrie
+
+# histórico de uso: conjunto de palavras OU bitmap (int) alinhado a WordBank.index_of
+Used = Union[Set[str], int]
+
+THEMED = "themed"
+COMMON = "common"
+
+
+def _bits_from_indices(indices: Iterable[int]) -> int:
+    """Monta o bitmap num bytearray (evita recriar um int gigante a cada bit)."""
+    buf = bytearray()
+    for i in indices:
+        byte_i = i >> 3
+        if byte_i >= len(buf):
+            buf.extend(b"\x00" * (byte_i + 1 - len(buf)))
+        buf[byte_i] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class WordBank(Mapping):
+    """
+    Banco de palavras indexado (temático + coringa), montado uma vez por sessão.
+
+    Funciona como um Mapping word -> clue (pode ser passado direto ao
+    ClueGenerator) e oferece, todos em O(1) por palavra:
+      - pertinência:       "WEALTH" in bank
+      - dica:              bank["WEALTH"] / bank.get("WEALTH", "")
+      - papel e origem:    bank.role(w) -> "themed"|"common" ; bank.source(w) -> unidade/arquivo
+      - baldes por tamanho: bank.by_length(6, role="themed")
+      - visões de uso:     bank.unused(used, role=...) / bank.used(used, role=...)
+      - índice estável:    bank.index_of(w) -> posição de inserção; bitmaps de uso (int,
+                           bit i = palavra i) filtram com operações bit a bit
+      - padrões:           bank.trie().matches("A..LE") (ids do trie = index_of)
+
+    Uma palavra presente nos dois bancos conta como TEMÁTICA (mesma prioridade
+    do histórico em EngligenApp) e mantém a primeira dica encontrada.
+    """
+
+    def __init__(self) -> None:
+        # word -> (clue, role, source)
+        self._entries: Dict[str, Tuple[str, str, str]] = {}
+        self._by_role: Dict[str, List[str]] = {THEMED: [], COMMON: []}
+        self._by_len: Dict[Tuple[str, int], List[str]] = {}
+        self._index: Dict[str, int] = {}
+        self._order: List[str] = []
+        self._masks: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+        self._fingerprint: Optional[str] = None
+        self._trie: Optional[WordTrie] = None
+
+    # ---------- construção ----------
+    def add(self, word: str, clue: str = "", *, role: str = THEMED, source: str = "") -> bool:
+        """Adiciona uma palavra já normalizada. Retorna False se já existia."""
+        if not word or word in self._entries:
+            return False
+        if role not in self._by_role:
+            raise ValueError(f"papel inválido: {role!r}")
+        self._entries[word] = (clue or "", role, source)
+        self._index[word] = len(self._order)
+        self._order.append(word)
+        self._masks.clear()
+        self._fingerprint = None
+        self._trie = None
+        self._by_role[role].append(word)
+        self._by_len.setdefault((role, len(word)), []).append(word)
+        return True
+
+    def add_items(self, items: Iterable[Dict], *, role: str = THEMED, source: str = "") -> int:
+        """Adiciona itens no formato [{'word','clue'}, ...]. Retorna quantos entraram."""
+        n = 0
+        for it in items:
+            if self.add(it.get("word", ""), it.get("clue", ""), role=role, source=source):
+                n += 1
+        return n
+
+    # ---------- Mapping (word -> clue) ----------
+    def __getitem__(self, word: str) -> str:
+        return self._entries[word][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._entries
+
+    # ---------- consultas ----------
+    def clue(self, word: str, default: str = "") -> str:
+        e = self._entries.get(word)
+        return e[0] if e is not None else default
+
+    def role(self, word: str) -> Optional[str]:
+        e = self._entries.get(word)
+        return e[1] if e is not None else None
+
+    def source(self, word: str) -> Optional[str]:
+        e = self._entries.get(word)
+        return e[2] if e is not None else None
+
+    def is_themed(self, word: str) -> bool:
+        return self.role(word) == THEMED
+
+    def words(self, role: Optional[str] = None) -> List[str]:
+        """Palavras na ordem de inserção (todas ou só de um papel)."""
+        if role is None:
+            return self._by_role[THEMED] + self._by_role[COMMON]
+        return list(self._by_role[role])
+
+    @property
+    def themed_words(self) -> List[str]:
+        return list(self._by_role[THEMED])
+
+    @property
+    def common_words(self) -> List[str]:
+        return list(self._by_role[COMMON])
+
+    def by_length(self, length: int, role: Optional[str] = None) -> List[str]:
+        if role is not None:
+            return list(self._by_len.get((role, length), []))
+        return self._by_len.get((THEMED, length), []) + self._by_len.get((COMMON, length), [])
+
+    def lengths(self) -> List[int]:
+        return sorted({L for (_, L) in self._by_len})
+
+    def unused(self, used: Used, role: Optional[str] = None) -> List[str]:
+        """Palavras ainda não consumidas pelo histórico `used` (set ou bitmap)."""
+        if isinstance(used, int):
+            return self.words_from_bits(self.mask(role) & ~used)
+        return [w for w in self.words(role) if w not in used]
+
+    def used(self, used: Used, role: Optional[str] = None) -> List[str]:
+        """Palavras do banco que já constam no histórico `used` (set ou bitmap)."""
+        if isinstance(used, int):
+            return self.words_from_bits(self.mask(role) & used)
+        return [w for w in self.words(role) if w in used]
+
+    # ---------- índice estável / bitmaps ----------
+    def index_of(self, word: str) -> Optional[int]:
+        return self._index.get(word)
+
+    def fingerprint(self) -> str:
+        """Hash da sequência de palavras: muda se o índice deixar de ser válido."""
+        if self._fingerprint is None:
+            h = hashlib.sha1()
+            for w in self._order:
+                h.update(w.encode("utf-8"))
+                h.update(b"\n")
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def mask(self, role: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Bitmap com as palavras de um papel e/ou origem (todas se ambos None)."""
+        key = (role, source)
+        m = self._masks.get(key)
+        if m is None:
+            if role is None and source is None:
+                m = (1 << len(self._order)) - 1
+            else:
+                entries = self._entries
+                m = _bits_from_indices(
+                    i for i, w in enumerate(self._order)
+                    if (role is None or entries[w][1] == role) and (source is None or entries[w][2] == source)
+                )
+            self._masks[key] = m
+        return m
+
+    def bits_for(self, words: Iterable[str]) -> int:
+        """Bitmap das palavras de `words` que pertencem ao banco."""
+        idx = self._index
+        return _bits_from_indices(i for i in (idx.get(w) for w in words) if i is not None)
+
+    def words_from_bits(self, bits: int) -> List[str]:
+        """Palavras cujos bits estão ligados, na ordem do índice."""
+        if bits <= 0:
+            return []
+        order = self._order
+        out: List[str] = []
+        raw = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for byte_i, b in enumerate(raw):
+            if not b:
+                continue
+            base = byte_i * 8
+            while b:
+                low = b & -b
+                out.append(order[base + low.bit_length() - 1])
+                b ^= low
+        return out
+
+    # ---------- consultas por padrão ----------
+    def has_trie(self) -> bool:
+        return self._trie is not None
+
+    def trie(self) -> WordTrie:
+        """Trie de todas as palavras (id = index_of), montado na primeira chamada."""
+        if self._trie is None:
+            self._trie = WordTrie.from_words(self._order)
+        return self._trie
+
+    def use_trie(self, trie: WordTrie) -> None:
+        """Adota um trie já montado (ex.: lido de data/.cache por storage.trie_cache)."""
+        if len(trie) != len(self._order):
+            raise ValueError("trie não corresponde ao banco")
+        self._trie = trie
+
+    def split_by_role(self, words: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Separa `words` em (temáticas, coringa); ignora as que não são do banco."""
+        themed: List[str] = []
+        common: List[str] = []
+        for w in words:
+            r = self.role(w)
+            if r == THEMED:
+                themed.append(w)
+            elif r == COMMON:
+                common.append(w)
+        return themed, common
@@ -15,6 +15,7 @@ class WordSearch:
       - .size : int
       - .grid : List[List[str]]   # N×N, letras A–Z
       - .placed_words : Dict[str, Dict[str,int]]  # {word:{r,c,dr,dc}}
+      - source_words() -> List[str]  # colocadas, como vieram na lista (chaves do banco)
 
     Observações:
       - Palavras são normalizadas (A–Z, sem acentos/traços/espaços).
@@ -54,15 +55,15 @@ class WordSearch:
         self._seed = seed
 
         # normaliza e ordena por tamanho (decrescente)
-        base = [self._normalize(w) for w in (words or [])]
-        base = [w for w in base if len(w) >= 2]
-        # remove duplicadas preservando ordem
-        seen = set()
+        # remove duplicadas preservando ordem; guarda a grafia original ("ZERO-SUM")
+        # de cada normalizada ("ZEROSUM"), que é a chave no banco e no histórico
         self.words: List[str] = []
-        for w in base:
-            if w not in seen:
+        self.original: Dict[str, str] = {}
+        for raw in (words or []):
+            w = self._normalize(raw)
+            if len(w) >= 2 and w not in self.original:
                 self.words.append(w)
-                seen.add(w)
+                self.original[w] = str(raw).strip()
         self.words.sort(key=len, reverse=True)
 
         # inicializa grid e estruturas
@@ -121,6 +122,66 @@ class WordSearch:
                 if self.grid[r][c] == "":
                     self.grid[r][c] = random.choice(self._alphabet)
 
+    def find_all(self, words: Optional[List[str]] = None) -> Dict[str, List[Dict[str, int]]]:
+        """
+        Localiza todas as ocorrências de `words` (padrão: as colocadas) na grade atual.
+        Retorna {word: [{r,c,dr,dc}, ...]} — ver engligen.core.wordsearch_solver.
+        """
+        from engligen.core.wordsearch_solver import WordSearchSolver
+
+        if words is None:
+            words = list(self.placed_words.keys())
+        # o aluno procura nas 8 direções, mesmo com allow_reverse=False
+        return WordSearchSolver(words, directions=self._DIRS_ALL).find_all(self.grid)
+
+    def source_words(self) -> List[str]:
+        """Palavras colocadas na grafia da lista de entrada (o que vai para o histórico)."""
+        return [self.original.get(w, w) for w in self.placed_words]
+
+    # ------------------------- Arquivo de puzzle -------------------------
+
+    def to_dict(self) -> Dict:
+        """Conteúdo do arquivo de puzzle (engligen.core.puzzle_file): grade, posições e numeração."""
+        words = [
+            {"word": w, **{k: int(v) for k, v in self.placed_words[w].items()}, "num": i}
+            for i, w in enumerate(sorted(self.placed_words), 1)  # mesma ordem da lista de palavras
+        ]
+        for entry in words:  # "source" só quando a normalização mudou a palavra
+            if self.original.get(entry["word"], entry["word"]) != entry["word"]:
+                entry["source"] = self.original[entry["word"]]
+        return {
+            "kind": "wordsearch",
+            "size": self.size,
+            "grid": ["".join(row) for row in self.grid],
+            "words": words,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WordSearch":
+        """Reconstrói o caça-palavras de um arquivo de puzzle (sem gerar nada)."""
+        words = data["words"]
+        ws = cls(words=[w["word"] for w in words], size=int(data["size"]))
+        ws.grid = [list(row) for row in data["grid"]]
+        ws.placed_words = {w["word"]: {k: int(w[k]) for k in ("r", "c", "dr", "dc")} for w in words}
+        ws.original.update({w["word"]: w["source"] for w in words if "source" in w})
+        return ws
+
+    def save(self, target) -> None:
+        """Grava o arquivo de puzzle em `target` (caminho ou arquivo binário)."""
+        from engligen.core import puzzle_file
+
+        puzzle_file.write(self.to_dict(), target)
+
+    @classmethod
+    def load(cls, source) -> "WordSearch":
+        """Lê um arquivo de puzzle de caça-palavras (caminho ou arquivo binário)."""
+        from engligen.core import puzzle_file
+
+        data = puzzle_file.read(source)
+        if data["kind"] != "wordsearch":
+            raise ValueError(f"o arquivo contém um puzzle do tipo {data['kind']!r}, não um caça-palavras")
+        return cls.from_dict(data)
+
     # ------------------------- Heurística -------------------------
 
     def _best_candidate(
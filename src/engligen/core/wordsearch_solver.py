@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from engligen.core.wordsearch import WordSearch
+
+
+# Direções (dr, dc) — mesma ordem de WordSearch._DIRS_ALL
+_DIRS_ALL: List[Tuple[int, int]] = list(WordSearch._DIRS_ALL)
+_DIRS_CANON = frozenset(WordSearch._DIRS_CANON)
+
+# chave terminal do trie (não é uma letra A–Z, então não colide)
+_END = "$"
+
+
+class WordSearchSolver:
+    """
+    Localiza palavras em grades de caça-palavras (N×N ou retangulares).
+
+    Em vez de testar cada palavra em cada célula/direção (força bruta),
+    monta um trie com todas as palavras procuradas e percorre a grade
+    UMA vez: de cada célula, em cada direção, avança pelo trie até o
+    ramo morrer. O custo fica limitado pelo tamanho da grade × 8 × a
+    profundidade útil do trie, independente de quantas palavras há na lista.
+
+    Uso:
+        solver = WordSearchSolver(["SMITH", "WEALTH"])
+        hits = solver.find_all(grid)   # {word: [{r,c,dr,dc}, ...]}
+
+    O trie pode ser reaproveitado para validar milhares de grades com a
+    mesma lista de palavras.
+    """
+
+    def __init__(self, words: Iterable[str], *, directions: Optional[Sequence[Tuple[int, int]]] = None) -> None:
+        self.directions: List[Tuple[int, int]] = list(directions or _DIRS_ALL)
+        self.words: List[str] = []
+        self._trie: Dict = {}
+
+        seen = set()
+        for w in words or []:
+            nw = WordSearch._normalize(w)
+            if len(nw) < 2 or nw in seen:
+                continue
+            seen.add(nw)
+            self.words.append(nw)
+            node = self._trie
+            for ch in nw:
+                node = node.setdefault(ch, {})
+            node[_END] = nw
+
+        # palíndromos aparecem "duas vezes" (ida e volta sobre as mesmas células)
+        self._palindromes = {w for w in self.words if w == w[::-1]}
+
+    def find_all(self, grid: Sequence[Sequence[str]]) -> Dict[str, List[Dict[str, int]]]:
+        """
+        Retorna todas as ocorrências de cada palavra: {word: [{r,c,dr,dc}, ...]}.
+        Palavras não encontradas aparecem com lista vazia.
+        Palíndromos são contados uma única vez por trecho de células.
+        """
+        out: Dict[str, List[Dict[str, int]]] = {w: [] for w in self.words}
+        if not self._trie or not grid:
+            return out
+
+        h = len(grid)
+        trie = self._trie
+        palins = self._palindromes
+        dirs = self.directions
+
+        for r in range(h):
+            row = grid[r]
+            for c in range(len(row)):
+                first = trie.get(row[c])
+                if first is None:
+                    continue
+                for dr, dc in dirs:
+                    node = first
+                    rr, cc = r, c
+                    while True:
+                        w = node.get(_END)
+                        if w is not None and (w not in palins or (dr, dc) in _DIRS_CANON):
+                            out[w].append({"r": r, "c": c, "dr": dr, "dc": dc})
+                        rr += dr
+                        cc += dc
+                        if not (0 <= rr < h and 0 <= cc < len(grid[rr])):
+                            break
+                        node = node.get(grid[rr][cc])
+                        if node is None:
+                            break
+        return out
+
+
+def find_all(
+    grid: Sequence[Sequence[str]],
+    words: Iterable[str],
+    *,
+    directions: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Dict[str, List[Dict[str, int]]]:
+    """Atalho: monta o trie e resolve uma grade."""
+    return WordSearchSolver(words, directions=directions).find_all(grid)
+
+
+def verify_placements(
+    grid: Sequence[Sequence[str]],
+    placed_words: Dict[str, Dict[str, int]],
+    *,
+    directions: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Dict[str, int]:
+    """
+    Confere se cada entrada de `placed_words` ocorre EXATAMENTE uma vez na grade
+    e na posição declarada. Retorna {word: nº de ocorrências} apenas para as
+    palavras com problema (dict vazio = gabarito válido). Quando a palavra ocorre
+    uma vez mas em posição diferente da declarada, o valor é -1.
+    """
+    hits = find_all(grid, placed_words.keys(), directions=directions)
+    problems: Dict[str, int] = {}
+    for w, pos in placed_words.items():
+        nw = WordSearch._normalize(w)
+        occ = hits.get(nw, [])
+        if len(occ) != 1:
+            problems[w] = len(occ)
+            continue
+        o = occ[0]
+        if (o["r"], o["c"], o["dr"], o["dc"]) != (pos.get("r"), pos.get("c"), pos.get("dr"), pos.get("dc")):
+            # palíndromo declarado no sentido inverso ainda é o mesmo trecho
+            L = len(nw)
+            rev = (o["r"] + (L - 1) * o["dr"], o["c"] + (L - 1) * o["dc"], -o["dr"], -o["dc"])
+            if nw != nw[::-1] or rev != (pos.get("r"), pos.get("c"), pos.get("dr"), pos.get("dc")):
+                problems[w] = -1
+    return problems
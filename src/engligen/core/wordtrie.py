@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Container
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Trie compacto para consultas de padrão com curinga ("A..LE" = 5 letras, A no início,
+# LE no fim). Os nós ficam em ordem de largura (BFS), então os filhos de cada nó são
+# contíguos e tudo cabe em quatro colunas planas:
+#   labels : str           letra da aresta que chega ao nó (nó 0 = raiz, label "\0")
+#   start  : uint32 × n+1  filhos do nó i = start[i]:start[i+1] (letras em ordem)
+#   term   : int32  × n    id da palavra que termina no nó (-1 = nenhuma)
+#   lens   : uint64 × n    bit k ligado = alguma palavra termina k letras abaixo do nó
+# `lens` poda a busca pelo tamanho do padrão sem descer em ramos que não fecham.
+# Serialização (.trie, ver storage/trie_cache.py): header + colunas + labels em UTF-8.
+WILDCARD = "."
+MAGIC = b"EGWT"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+_BLOB_LEN = struct.Struct("<I")
+_LITTLE = 0 if sys.byteorder == "little" else 1
+_ROOT = "\x00"
+_MAX_LEN = 63  # palavras maiores não entram em `lens` (nenhuma grade chega perto)
+
+
+class WordTrie:
+    """
+    Dicionário em trie para consultas por padrão, sem montar listas:
+
+        trie = WordTrie.from_words(["APPLE", "ANKLE", "TABLE"])
+        trie.count("A..LE")                          # 2
+        trie.first("A..LE", exclude={"ANKLE"})       # "APPLE"
+        for w in trie.matches("...LE"): ...          # ordem alfabética
+
+    `allowed`/`exclude` (qualquer container: set, dict...) filtram as palavras na folha,
+    então o mesmo trie atende bancos inteiros e recortes (ex.: só as não usadas).
+    """
+
+    __slots__ = ("labels", "start", "term", "lens", "n_words")
+
+    def __init__(self, labels: str, start: array, term: array, lens: array, n_words: int) -> None:
+        self.labels = labels
+        self.start = start
+        self.term = term
+        self.lens = lens
+        self.n_words = n_words
+
+    # ---------- construção ----------
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "WordTrie":
+        """Monta o trie; o id de cada palavra é a posição da primeira ocorrência em `words`."""
+        root: Dict = {}
+        ids: Dict[str, int] = {}
+        for w in words:
+            if not w or w in ids:
+                continue
+            ids[w] = len(ids)
+            node = root
+            for ch in w:
+                node = node.setdefault(ch, {})
+            node[""] = ids[w]  # chave vazia marca fim de palavra
+
+        labels: List[str] = [_ROOT]
+        start = array("I", [0])
+        term = array("i")
+        queue: List[Dict] = [root]
+        for i, node in enumerate(queue):  # BFS: a fila cresce enquanto é percorrida
+            term.append(node.get("", -1))
+            start[i] = len(queue)
+            for ch in sorted(k for k in node if k):
+                labels.append(ch)
+                queue.append(node[ch])
+            start.append(len(queue))  # provisório: vira o início dos filhos do próximo nó
+
+        lens = array("Q", bytes(8 * len(queue)))
+        for i in range(len(queue) - 1, -1, -1):  # filhos vêm depois dos pais no BFS
+            m = 1 if term[i] >= 0 else 0
+            for child in range(start[i], start[i + 1]):
+                m |= lens[child] << 1
+            lens[i] = m & ((1 << (_MAX_LEN + 1)) - 1)
+        return cls("".join(labels), start, term, lens, len(ids))
+
+    # ---------- consultas ----------
+    def __len__(self) -> int:
+        return self.n_words
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str) or not word:
+            return False
+        labels, start = self.labels, self.start
+        node = 0
+        for ch in word:
+            node = labels.find(ch, start[node], start[node + 1])
+            if node < 0:
+                return False
+        return self.term[node] >= 0
+
+    def _walk(self, pattern: str) -> Iterator[Tuple[str, int]]:
+        """(palavra, id) de cada palavra com o tamanho e as letras fixas de `pattern`, em ordem."""
+        size = len(pattern)
+        if size == 0 or size > _MAX_LEN or not (self.lens[0] >> size) & 1:
+            return
+        labels, start, term, lens = self.labels, self.start, self.term, self.lens
+        stack: List[Tuple[int, int, str]] = [(0, 0, "")]
+        while stack:
+            node, depth, prefix = stack.pop()
+            if depth == size:
+                yield prefix, term[node]
+                continue
+            need = 1 << (size - depth - 1)  # o filho precisa fechar palavra nesse tamanho
+            ch = pattern[depth]
+            if ch == WILDCARD:
+                # empilha do fim para o começo: desempilha em ordem alfabética
+                for child in range(start[node + 1] - 1, start[node] - 1, -1):
+                    if lens[child] & need:
+                        stack.append((child, depth + 1, prefix + labels[child]))
+            else:
+                child = labels.find(ch, start[node], start[node + 1])
+                if child >= 0 and lens[child] & need:
+                    stack.append((child, depth + 1, prefix + ch))
+
+    def matches(
+        self,
+        pattern: str,
+        *,
+        allowed: Optional[Container] = None,
+        exclude: Optional[Container] = None,
+    ) -> Iterator[str]:
+        """Palavras que casam com `pattern` ("." = qualquer letra), em ordem alfabética."""
+        for word, _ in self._walk(pattern):
+            if (allowed is None or word in allowed) and (exclude is None or word not in exclude):
+                yield word
+
+    def first(
+        self,
+        pattern: str,
+        *,
+        allowed: Optional[Container] = None,
+        exclude: Optional[Container] = None,
+    ) -> Optional[str]:
+        """Primeira palavra (alfabética) que casa com `pattern`, ou None."""
+        return next(self.matches(pattern, allowed=allowed, exclude=exclude), None)
+
+    def count(
+        self,
+        pattern: str,
+        *,
+        allowed: Optional[Container] = None,
+        exclude: Optional[Container] = None,
+    ) -> int:
+        """Quantas palavras casam com `pattern` (sem montar lista)."""
+        if allowed is None and exclude is None:
+            return sum(1 for _ in self._walk(pattern))
+        return sum(1 for _ in self.matches(pattern, allowed=allowed, exclude=exclude))
+
+    def ids(self, pattern: str) -> Iterator[int]:
+        """Ids (posição em `from_words`) das palavras que casam com `pattern`."""
+        for _, word_id in self._walk(pattern):
+            yield word_id
+
+    # ---------- serialização ----------
+    def to_bytes(self) -> bytes:
+        n = len(self.term)
+        lb = self.labels.encode("utf-8")
+        return b"".join([
+            _HEADER.pack(MAGIC, VERSION, _LITTLE, n, self.n_words),
+            self.start.tobytes(),
+            self.term.tobytes(),
+            self.lens.tobytes(),
+            _BLOB_LEN.pack(len(lb)), lb,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "WordTrie":
+        """Levanta ValueError se os bytes não forem um trie válido."""
+        mv = memoryview(data)
+        try:
+            magic, version, order, n, n_words = _HEADER.unpack_from(mv, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("trie incompatível")
+            pos = _HEADER.size
+            start = array("I")
+            start.frombytes(mv[pos:pos + 4 * (n + 1)])
+            pos += 4 * (n + 1)
+            term = array("i")
+            term.frombytes(mv[pos:pos + 4 * n])
+            pos += 4 * n
+            lens = array("Q")
+            lens.frombytes(mv[pos:pos + 8 * n])
+            pos += 8 * n
+            (ln,) = _BLOB_LEN.unpack_from(mv, pos)
+            pos += _BLOB_LEN.size
+            labels = bytes(mv[pos:pos + ln]).decode("utf-8")
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError("trie truncado") from e
+        if order != _LITTLE:
+            start.byteswap()
+            term.byteswap()
+            lens.byteswap()
+        if len(start) != n + 1 or len(term) != n or len(lens) != n or len(labels) != n:
+            raise ValueError("trie truncado")
+        return cls(labels, start, term, lens, n_words)
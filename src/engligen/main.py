@@ -1,9 +1,137 @@
-from engligen.ui.menu import Menu
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="engligen", description="Gerador de exercícios de Inglês.")
+    sub = parser.add_subparsers(dest="command")
+
+    batch = sub.add_parser("batch", help="gera os puzzles de um manifesto JSON, sem perguntas")
+    batch.add_argument("manifest", type=Path, help="arquivo JSON com a lista de jobs")
+    batch.add_argument("--workers", type=int, default=None, help="jobs em paralelo (padrão: manifesto ou 1)")
+    batch.add_argument("--summary", type=Path, default=None,
+                       help="onde gravar o resumo JSON (padrão: output/<manifesto>_summary.json)")
+    batch.add_argument("--booklet", type=Path, default=None,
+                       help="grava todos os puzzles num único caderno PDF em vez de arquivos por job")
+
+    render = sub.add_parser("render", help="refaz as folhas de puzzles salvos (*_puzzle.json), sem regenerar")
+    render.add_argument("puzzles", type=Path, nargs="+", help="arquivos <nome-base>_puzzle.json")
+    render.add_argument("--format", dest="output_format", choices=("png", "svg", "pdf"), default=None,
+                        help="formato das folhas (padrão: renderer.output_format do config)")
+    render.add_argument("--header", default=None, help="header da cruzada")
+    render.add_argument("--prefill", type=int, default=0, help="cruzada: palavras completas exibidas")
+    render.add_argument("--style", choices=("fill", "stroke"), default="fill",
+                        help="caça-palavras: destaque do gabarito")
+    render.add_argument("--stroke-width", type=int, default=5, help="caça-palavras: espessura da linha")
+    render.add_argument("--suffix", default="", help="acrescentado ao nome-base (ex.: _v2)")
+
+    serve = sub.add_parser("serve", help="serviço HTTP local (JSON) com bancos, fontes e pool sempre quentes")
+    serve.add_argument("--host", default="127.0.0.1", help="endereço (padrão: 127.0.0.1; 0.0.0.0 = toda a rede)")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--concurrency", type=int, default=2, help="puzzles gerados/renderizados ao mesmo tempo")
+    serve.add_argument("--max-waiting", type=int, default=8, help="pedidos na fila antes de responder 503")
+    serve.add_argument("--timeout", type=float, default=60.0, help="prazo máximo por pedido (s), fila incluída")
+    serve.add_argument("--processes", type=int, default=None, help="processos do pool das cruzadas")
+
+    stock = sub.add_parser("stock", help="estoque de puzzles prontos por unidade (config \"stock\")")
+    stock.add_argument("action", choices=("status", "refill"), help="status: o que há pronto; refill: completa")
+    stock.add_argument("--unit", action="append", default=None, help="só estas unidades (repetível)")
+    return parser
+
+
+def _run_stock(args) -> int:
+    from engligen.app import EngligenApp
+    from engligen.pipeline import open_pool
+    from engligen.stock import PuzzleStock
+
+    app = EngligenApp()
+    stock = PuzzleStock(app)
+    if args.action == "refill":
+        stock.pool = open_pool(None)
+        try:
+            made = stock.refill(args.unit)
+        finally:
+            if stock.pool is not None:
+                stock.pool.close()
+                stock.pool.join()
+        print(f"🎉 Estoque: {made} puzzle(s) gerado(s).")
+    for row in stock.status():
+        if args.unit and row["unit"] not in args.unit:
+            continue
+        print(f"   {row['unit']:<8} {row['type']:<10} {row['size']:<7} {row['ready']}/{row['target']}")
+    return 0
+
+
+def _run_render(args) -> int:
+    import time
+
+    from engligen.app import EngligenApp
+    from engligen.core.puzzle_file import PUZZLE_SUFFIX
+
+    app = EngligenApp()
+    failed = 0
+    for path in args.puzzles:
+        t0 = time.perf_counter()
+        name = path.name
+        base = name[: -len(PUZZLE_SUFFIX)] if name.endswith(PUZZLE_SUFFIX) else path.stem
+        try:
+            app.rerenderizar(
+                path,
+                output_basename=base + args.suffix,
+                output_format=args.output_format,
+                header_text=args.header,
+                prefill_words_count=args.prefill,
+                highlight_style=args.style,
+                stroke_width=args.stroke_width,
+            )
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        print(f"✔️ {path.name} ({time.perf_counter() - t0:.2f}s)")
+    return 0 if failed == 0 else 1
+
+
+def run(argv: Optional[List[str]] = None):
+    """
+    Sem argumentos abre o menu interativo; `engligen batch manifesto.json` roda em lote,
+    `engligen render x_puzzle.json` refaz as folhas de um puzzle salvo,
+    `engligen stock refill` completa o estoque por unidade e `engligen serve` sobe o
+    serviço HTTP local.
+    """
+    args = _build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        from engligen.ui.batch import run_batch
+
+        try:
+            summary = run_batch(
+                args.manifest, workers=args.workers, summary_path=args.summary, booklet_path=args.booklet
+            )
+        except (OSError, ValueError) as e:
+            print(f"❌ ERRO no manifesto {args.manifest}:\n{e}")
+            sys.exit(2)
+        sys.exit(0 if summary["failed"] == 0 else 1)
+
+    if args.command == "render":
+        sys.exit(_run_render(args))
+
+    if args.command == "stock":
+        sys.exit(_run_stock(args))
+
+    if args.command == "serve":
+        from engligen.ui.server import run_server
+
+        run_server(host=args.host, port=args.port, concurrency=args.concurrency,
+                   max_waiting=args.max_waiting, timeout=args.timeout, processes=args.processes)
+        return
+
+    from engligen.ui.menu import Menu
 
-def run():
-    """Inicializa e executa a interface de menu do usuário."""
     menu = Menu()
     menu.run()
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import inspect
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from engligen.app import EngligenApp
+    from engligen.rendering.booklet import BookletWriter
+
+# tipo do job -> (etapa de geração, etapa de renderização) da EngligenApp
+STAGES = {
+    "crossword": ("gerar_crossword", "renderizar_crossword"),
+    "wordsearch": ("gerar_wordsearch", "renderizar_wordsearch"),
+}
+# renderização quando a saída é um caderno PDF único (cenas vetoriais em vez de arquivos)
+BOOKLET_STAGES = {
+    "crossword": "folhas_crossword",
+    "wordsearch": "folhas_wordsearch",
+}
+
+
+def _accepts(fn: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    names = inspect.signature(fn).parameters
+    return {k: v for k, v in kwargs.items() if k in names}
+
+
+def open_pool(processes: Optional[int]):
+    """Pool de processos criado uma vez e mantido quente entre os puzzles (None = sem pool)."""
+    try:
+        import multiprocessing
+
+        return multiprocessing.Pool(processes)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def run_pipeline(
+    app: "EngligenApp",
+    jobs: List[Dict[str, Any]],
+    *,
+    render_workers: int = 2,
+    processes: Optional[int] = None,
+    booklet: Optional["BookletWriter"] = None,
+) -> Dict[str, Any]:
+    """
+    Gera vários puzzles em pipeline:
+
+      geração      (thread principal; cruzadas no pool de processos, reaproveitado)
+      renderização (ThreadPoolExecutor; o Pillow solta o GIL ao codificar o PNG)
+      gravação     (thread principal, sempre na ordem dos jobs)
+
+    Enquanto o puzzle k é renderizado/codificado, o k+1 já está gerando. Cada job é
+    {"type": "crossword"|"wordsearch", "output_basename": ..., **parâmetros de executar_*}.
+    Com `booklet`, nada é gravado por job: cada puzzle vira páginas do caderno PDF,
+    acrescentadas em fluxo e na ordem dos jobs.
+    Retorna {"jobs": [resultado por job, na ordem], "seconds", "per_minute", ...}.
+    """
+    render_workers = max(1, int(render_workers))
+    results: List[Dict[str, Any]] = [
+        {"index": i, "type": job.get("type"), "output_basename": job.get("output_basename"),
+         "ok": False, "seconds": 0.0, "outputs": [], "error": None}
+        for i, job in enumerate(jobs)
+    ]
+    # (índice, instante de início, future da renderização) aguardando gravação
+    pending: Deque[Tuple[int, float, Future]] = deque()
+    gen_seconds = 0.0
+
+    def write_oldest() -> None:
+        i, t0, fut = pending.popleft()
+        res = results[i]
+        try:
+            if booklet is not None:
+                res["pages"] = booklet.add_puzzle(res["output_basename"], *fut.result())
+            else:
+                res["outputs"] = [str(p) for p in app.gravar_saidas(res["output_basename"], fut.result())]
+            res["ok"] = True
+        except Exception as e:  # um job com erro não derruba o lote
+            res["error"] = f"{type(e).__name__}: {e}"
+        res["seconds"] = round(time.perf_counter() - t0, 3)
+
+    t_start = time.perf_counter()
+    pool = open_pool(processes) if any(j.get("type") == "crossword" for j in jobs) else None
+    try:
+        with ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="render") as renderers:
+            for i, job in enumerate(jobs):
+                t0 = time.perf_counter()
+                kwargs = {k: v for k, v in job.items() if k not in ("type", "output_basename")}
+                try:
+                    gerar, renderizar = (getattr(app, name) for name in STAGES[job.get("type")])
+                    if booklet is not None:
+                        renderizar = getattr(app, BOOKLET_STAGES[job.get("type")])
+                    gen_kwargs = _accepts(gerar, kwargs)
+                    if "pool" in inspect.signature(gerar).parameters:
+                        gen_kwargs["pool"] = pool
+                    puzzle = gerar(**gen_kwargs)
+                except Exception as e:
+                    puzzle = None
+                    results[i]["error"] = f"{type(e).__name__}: {e}"
+                gen_seconds += time.perf_counter() - t0
+                if puzzle is None:
+                    results[i]["error"] = results[i]["error"] or "geração falhou (veja o log)"
+                    results[i]["seconds"] = round(time.perf_counter() - t0, 3)
+                    continue
+
+                args = puzzle if isinstance(puzzle, tuple) else (puzzle,)
+                pending.append((i, t0, renderers.submit(renderizar, *args, **_accepts(renderizar, kwargs))))
+
+                # grava o que já terminou (em ordem) e limita os puzzles renderizados em memória
+                while pending and (pending[0][2].done() or len(pending) > 2 * render_workers):
+                    write_oldest()
+            while pending:
+                write_oldest()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - t_start
+    n_ok = sum(1 for r in results if r["ok"])
+    per_minute = n_ok * 60.0 / elapsed if elapsed > 0 else 0.0
+    print(f"🎉 Pipeline: {n_ok}/{len(jobs)} puzzles em {elapsed:.1f}s "
+          f"({per_minute:.1f}/min; geração {gen_seconds:.1f}s, {render_workers} thread(s) de renderização)")
+    return {
+        "jobs": results,
+        "seconds": round(elapsed, 3),
+        "generate_seconds": round(gen_seconds, 3),
+        "per_minute": round(per_minute, 2),
+        "render_workers": render_workers,
+    }
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import BinaryIO, Iterator, List, Optional, Sequence
+
+from engligen.rendering.pdf import SYMBOL_CODES, PdfCanvas, PdfWriter, text_width
+from engligen.rendering.vector_renderer import HATCH_COLOR, HATCH_SPACING, Scene
+
+# Caderno PDF (A4) com vários puzzles, gravado em fluxo:
+#   - para cada puzzle: página do exercício (grade + lista de dicas, que continua nas
+#     páginas seguintes se precisar) gravada assim que o puzzle chega
+#   - gabaritos também são gravados na hora, mas entram no fim do caderno
+#     (PdfWriter.add_page(at_end=True)); na memória fica só a lista de ids das páginas
+PAGE_W, PAGE_H = 595.28, 841.89  # A4 em pt
+MARGIN = 42.0
+MAX_SCALE = 0.6  # pt por px da cena (célula de 40 px -> ~8,5 mm)
+TITLE_SIZE = 11
+TEXT_SIZE = 10
+LEADING = 13.0
+TITLE_COLOR = (90, 90, 90)
+TEXT_COLOR = (0, 0, 0)
+
+
+def _wrap(line: str, width: float, size: float) -> Iterator[str]:
+    """Quebra `line` por palavras para caber em `width` pt (Helvetica)."""
+    words = line.split(" ")
+    current = ""
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, "sans", size) > width:
+            yield current
+            current = word
+        else:
+            current = candidate
+    yield current
+
+
+def _draw_text(canvas: PdfCanvas, x: float, y: float, text: str, *, size: float, color) -> None:
+    """Texto em Helvetica, trocando as setas (→, ↓) pela fonte Symbol."""
+    run = ""
+    for ch in text + "\0":
+        if ch in SYMBOL_CODES or ch == "\0":
+            if run:
+                canvas.text(x, y, run, font="sans", size=size, color=color)
+                x += text_width(run, "sans", size)
+                run = ""
+            if ch != "\0":
+                canvas.text(x, y, ch, font="symbol", size=size, color=color)
+                x += text_width(ch, "symbol", size)
+        else:
+            run += ch
+
+
+class BookletWriter:
+    """
+    Escreve um caderno PDF com vários puzzles em `fh`, um puzzle por vez:
+
+        with open("caderno.pdf", "wb") as fh:
+            booklet = BookletWriter(fh)
+            for ...:
+                booklet.add_puzzle("u1_cw01", exercicio, gabarito, linhas_de_dicas)
+            booklet.close()
+    """
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self._pdf = PdfWriter(fh, hatch_color=HATCH_COLOR, hatch_spacing=HATCH_SPACING, scale=MAX_SCALE)
+        self.puzzles = 0
+
+    @property
+    def page_count(self) -> int:
+        return self._pdf.page_count
+
+    def _page(self, title: str) -> PdfCanvas:
+        canvas = PdfCanvas(PAGE_W, PAGE_H, scale=1.0)
+        _draw_text(canvas, MARGIN, MARGIN + TITLE_SIZE, title, size=TITLE_SIZE, color=TITLE_COLOR)
+        return canvas
+
+    def _place(self, canvas: PdfCanvas, scene: Scene, top: float, max_h: float) -> float:
+        """Desenha a cena centralizada a partir de `top`, cabendo em `max_h`; retorna a altura usada."""
+        scale = min(MAX_SCALE, (PAGE_W - 2 * MARGIN) / scene.width, max_h / scene.height)
+        canvas.push((PAGE_W - scene.width * scale) / 2, top, scale)
+        scene.paint(canvas)
+        canvas.pop()
+        return scene.height * scale
+
+    def add_puzzle(self, title: str, exercise: Scene, answers: Scene, clues: Sequence[str] = ()) -> int:
+        """Grava as páginas de um puzzle; retorna quantas páginas foram adicionadas."""
+        before = self.page_count
+        self.puzzles += 1
+        label = f"{self.puzzles}. {title}"
+        top = MARGIN + TITLE_SIZE + 14
+        bottom = PAGE_H - MARGIN
+
+        # exercício: a grade ocupa até ~65% da página quando há dicas embaixo
+        canvas = self._page(label)
+        room = bottom - top
+        y = top + self._place(canvas, exercise, top, room * 0.65 if clues else room) + 20
+
+        text_w = PAGE_W - 2 * MARGIN
+        for line in clues:
+            for i, part in enumerate(_wrap(line, text_w - 14, TEXT_SIZE)):
+                if y + LEADING > bottom:
+                    self._pdf.add_page(canvas)
+                    canvas = self._page(f"{label} (cont.)")
+                    y = top
+                y += LEADING
+                _draw_text(canvas, MARGIN + (14 if i else 0), y, part, size=TEXT_SIZE, color=TEXT_COLOR)
+        self._pdf.add_page(canvas)
+
+        # gabarito: gravado agora, posicionado no fim do caderno
+        canvas = self._page(f"Gabarito — {label}")
+        self._place(canvas, answers, top, bottom - top)
+        self._pdf.add_page(canvas, at_end=True)
+        return self.page_count - before
+
+    def close(self) -> None:
+        self._pdf.close()
+
+
+def clue_lines(text: Optional[str]) -> List[str]:
+    """Linhas de um .txt de dicas, sem as linhas em branco do fim."""
+    lines = (text or "").splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return lines
@@ -1,13 +1,19 @@
+from __future__ import annotations
+import io
 import os
-from typing import Dict, List, Tuple
-from engligen.core.crossword import Crossword
+from typing import TYPE_CHECKING, Dict, List, Mapping, Tuple
+
+if TYPE_CHECKING:
+    from engligen.core.crossword import Crossword
 
 class ClueGenerator:
     """
     Gera um arquivo .txt com a lista de dicas em texto puro,
     separadas por direções, e mantém um mapa das posições numeradas.
+
+    `clues_map` pode ser um dict simples ou um WordBank (Mapping word -> clue).
     """
-    def __init__(self, crossword_obj: Crossword, clues_map: Dict[str, str]):
+    def __init__(self, crossword_obj: Crossword, clues_map: Mapping[str, str]):
         self.crossword = crossword_obj
         self.clues_map = clues_map
         self.clue_positions: Dict[Tuple[int, int], List[Dict]] = {}
@@ -57,31 +63,47 @@ class ClueGenerator:
                 "dir": info['direction']
             })
 
-    def generate_text_file(self, filename: str):
-        """Gera o arquivo .txt com a lista de dicas."""
-        # A geração de clues já foi feita no __init__, então não precisa chamar de novo
-        
-        output_dir = os.path.dirname(filename)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        
+    def to_text(self) -> str:
+        """Lista de dicas em texto puro (mesmo conteúdo do .txt), sem tocar no disco."""
         dir_map = {
             "horizontal": "HORIZONTAL (Esquerda → Direita)",
             "vertical": "VERTICAL (Cima → Baixo)",
         }
 
-        with open(filename, "w", encoding="utf-8") as f:
-            for d_name, d_key in dir_map.items():
-                words_in_dir = {w: d for w, d in self.word_clues.items() if d["direction"] == d_name}
-                if not words_in_dir:
-                    continue
-                
-                sorted_clues = sorted(words_in_dir.items(), key=lambda item: item[1]['num'])
-                
-                f.write(f"{d_key}\n")
-                f.write(f"{'-'*len(d_key)}\n")
-                for word, clue_data in sorted_clues:
-                    f.write(f"{clue_data['num']}. {clue_data['clue']}\n")
-                f.write("\n")
-
-        print(f"📄 Arquivo de dicas '{os.path.basename(filename)}' gerado com sucesso!")
\ No newline at end of file
+        lines: List[str] = []
+        for d_name, d_key in dir_map.items():
+            words_in_dir = {w: d for w, d in self.word_clues.items() if d["direction"] == d_name}
+            if not words_in_dir:
+                continue
+
+            sorted_clues = sorted(words_in_dir.items(), key=lambda item: item[1]['num'])
+
+            lines.append(d_key)
+            lines.append('-' * len(d_key))
+            for word, clue_data in sorted_clues:
+                lines.append(f"{clue_data['num']}. {clue_data['clue']}")
+            lines.append("")
+        return "".join(line + "\n" for line in lines)
+
+    def to_bytes(self, encoding: str = "utf-8") -> bytes:
+        """Conteúdo do .txt de dicas já codificado (para servir, zipar ou enviar)."""
+        return self.to_text().encode(encoding)
+
+    def generate_text_file(self, filename):
+        """
+        Gera o .txt com a lista de dicas. `filename` pode ser um caminho ou um
+        arquivo já aberto (texto ou binário, ex.: io.BytesIO, membro de um zip).
+        """
+        # A geração de clues já foi feita no __init__, então não precisa chamar de novo
+        if hasattr(filename, "write"):
+            filename.write(self.to_text() if isinstance(filename, io.TextIOBase) else self.to_bytes())
+            return
+
+        output_dir = os.path.dirname(filename)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
+
+        print(f"📄 Arquivo de dicas '{os.path.basename(filename)}' gerado com sucesso!")
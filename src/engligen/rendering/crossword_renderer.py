@@ -1,6 +1,59 @@
 from __future__ import annotations
+import io
 from typing import Dict, List, Optional, Set, Tuple
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+from engligen.rendering.glyphs import FontFace, get_face
+from engligen.rendering.png_modes import check_mode, save_png
+
+def clue_starts(clue_gen) -> Dict[Tuple[int, int], Tuple[str, Set[str]]]:
+    """
+    Início de cada palavra numerada: {(r, c): (número, {"across", "down"})}.
+    Lido de clue_positions: {(r,c): [{'num': '1', 'dir': 'horizontal'|'vertical'}, ...]}.
+    """
+    starts: Dict[Tuple[int, int], Tuple[str, Set[str]]] = {}
+    for (rc, infos) in clue_gen.clue_positions.items():
+        r, c = rc
+        dirs: Set[str] = set()
+        num_val: Optional[str] = None
+        for info in infos:
+            d = (info.get("dir") or "").lower()
+            if d in ("horizontal", "across"):
+                dirs.add("across")
+            elif d in ("vertical", "down"):
+                dirs.add("down")
+            n = info.get("num")
+            if n is not None:
+                num_val = str(n)
+        if num_val is None:
+            continue
+        if (r, c) not in starts:
+            starts[(r, c)] = (num_val, set())
+        starts[(r, c)][1].update(dirs)
+    return starts
+
+
+# ladrilhos de hachura prontos, por (largura, altura, cor, espaçamento, espessura)
+_HATCH_CACHE: Dict[Tuple, Image.Image] = {}
+
+
+def _hatch_tile(w: int, h: int, color, spacing: int, thickness: int) -> Image.Image:
+    """Hachura diagonal de uma célula (RGBA, fundo transparente), desenhada uma vez e reaproveitada."""
+    key = (w, h, tuple(color), spacing, thickness)
+    tile = _HATCH_CACHE.get(key)
+    if tile is None:
+        tile = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        d = ImageDraw.Draw(tile)
+
+        # Diagonal \\
+        for i in range(-h, w, spacing):
+            d.line([(i, 0), (i + h, h)], fill=color, width=thickness)
+        # Diagonal / (mais clara)
+        color2 = (color[0], color[1], color[2], max(80, color[3] // 2))
+        for i in range(0, w + h, spacing):
+            d.line([(i, 0), (0, i)], fill=color2, width=thickness)
+        _HATCH_CACHE[key] = tile
+    return tile
 
 class CrosswordRenderer:
     """
@@ -9,8 +62,15 @@ class CrosswordRenderer:
     - Blocos com hachura diagonal (sem preto sólido)
     - Números + setas com gap (evita sobrepor)
     - Letras: no gabarito (answers=True) ou nas posições prefill (answers=False)
+
+    preview=True: prévia rápida de baixa resolução (células de 16 px, blocos cinza
+    lisos, sem header/números/setas) — para conferir a grade em milissegundos.
     """
 
+    PREVIEW_CELL = 16
+    PREVIEW_PAD = 4
+    PREVIEW_BLOCK = (200, 200, 200, 255)
+
     def __init__(
         self,
         crossword,
@@ -23,6 +83,10 @@ class CrosswordRenderer:
         watermark_text: Optional[str] = None,  # não usado
         corner_pad: int = 2,
         arrow_gap_px: Optional[int] = None,
+        output_mode: str = "rgb",        # "rgb" | "palette" | "1bit" (ver png_modes)
+        png_compress_level: int = 6,
+        png_optimize: bool = False,
+        preview: bool = False,
     ) -> None:
         self.crossword = crossword
         self.clue_gen = clue_generator
@@ -32,14 +96,74 @@ class CrosswordRenderer:
         self.header_text = header_text
         self.corner_pad = int(corner_pad)
         self.arrow_gap = 2 if arrow_gap_px is None else int(arrow_gap_px)
+        self.output_mode = check_mode(output_mode)
+        self.png_compress_level = int(png_compress_level)
+        self.png_optimize = bool(png_optimize)
+        self.preview = bool(preview)
+        if self.preview:
+            self.cell, self.pad, self.header_text = self.PREVIEW_CELL, self.PREVIEW_PAD, None
 
         # posições reveladas no exercício
         self.prefilled_positions: Set[Tuple[int, int]] = set()
 
-        self._font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
-
     # ---------- API pública ----------
-    def generate_image(self, filename: str, answers: bool = False) -> None:
+    def generate_image(self, filename, answers: bool = False) -> None:
+        """Grava a folha em `filename`: caminho ou arquivo binário aberto (BytesIO, zip, socket...)."""
+        self._save(self.render_pair()[1] if answers else self._render_exercise(), filename)
+
+    def to_bytes(self, answers: bool = False) -> bytes:
+        """PNG da folha (exercício ou gabarito) em memória, sem arquivo temporário."""
+        buf = io.BytesIO()
+        self.generate_image(buf, answers=answers)
+        return buf.getvalue()
+
+    def to_bytes_pair(self) -> Tuple[bytes, bytes]:
+        """(exercício, gabarito) em PNG na memória, com as camadas comuns desenhadas uma vez."""
+        exercise, answer_sheet = io.BytesIO(), io.BytesIO()
+        self.generate_images(exercise, answer_sheet)
+        return exercise.getvalue(), answer_sheet.getvalue()
+
+    def generate_images(self, exercise_filename, answers_filename) -> None:
+        """Exercício + gabarito numa passada só (mesma camada base)."""
+        exercise, answer_sheet = self.render_pair()
+        self._save(exercise, exercise_filename)
+        self._save(answer_sheet, answers_filename)
+
+    def render_pair(self) -> Tuple[Image.Image, Image.Image]:
+        """
+        (exercício, gabarito) em RGB. A camada comum — header, grade, blocos, letras de
+        prefill, números e setas — é desenhada uma vez; o gabarito é ela + as demais letras.
+        """
+        base, ctx = self._render_base()
+        exercise = base.convert("RGB")
+        grid = self.crossword.grid
+        rest = [(r, c) for r, row in enumerate(grid) for c, ch in enumerate(row)
+                if ch and (r, c) not in self.prefilled_positions]
+        self._draw_letters(ImageDraw.Draw(base), ctx, rest)
+        return exercise, base.convert("RGB")
+
+    def _render_exercise(self) -> Image.Image:
+        base, _ctx = self._render_base()
+        return base.convert("RGB")
+
+    def _save(self, image: Image.Image, filename) -> None:
+        # Salva (300 DPI) no modo de saída configurado
+        save_png(image, filename, mode=self.output_mode, compress_level=self.png_compress_level,
+                 optimize=self.png_optimize, dpi=(300, 300))
+
+    def _draw_letters(self, draw: ImageDraw.ImageDraw, ctx: Dict, cells) -> None:
+        grid = self.crossword.grid
+        ox, oy, font = ctx["ox"], ctx["oy"], ctx["letter_font"]
+        for r, c in cells:
+            ch = grid[r][c]
+            x0 = ox + c * self.cell
+            y0 = oy + r * self.cell
+            cx, cy = x0 + self.cell // 2, y0 + self.cell // 2
+            tw, th = font.text_size(ch)
+            font.draw(draw, (cx - tw // 2, cy - th // 2), ch, ctx["letter_color"])
+
+    def _render_base(self) -> Tuple[Image.Image, Dict]:
+        """Camada comum (RGBA) e o contexto de layout para desenhar as letras depois."""
         grid: List[List[Optional[str]]] = self.crossword.grid
         rows, cols = len(grid), len(grid[0])
 
@@ -56,9 +180,9 @@ class CrosswordRenderer:
 
         # Header
         if self.header_text:
-            tw, th = self._text_size(draw, self.header_text, header_font)
+            tw, th = header_font.text_size(self.header_text)
             draw.text(((W - tw) // 2, self.pad + (header_h - th) // 2),
-                      self.header_text, fill=(0, 0, 0), font=header_font)
+                      self.header_text, fill=(0, 0, 0), font=header_font.font)
 
         ox, oy = self.pad, self.pad + header_h
 
@@ -73,54 +197,38 @@ class CrosswordRenderer:
         arrow_font = self._get_font(max(9, int(self.cell * 0.30)), prefer="arial")
         letter_font = self._get_font(max(12, int(self.cell * 0.55)), prefer="arial")
 
-        # Células (hachura só em blocos)
+        # Hachura dos blocos: o mesmo ladrilho carimbado (paste) numa camada única,
+        # composta uma vez só sobre a imagem (os blocos não se sobrepõem)
+        tile = _hatch_tile(self.cell, self.cell, hatch_color, 6, 1)
+        hatch_layer: Optional[Image.Image] = None
         for r in range(rows):
             for c in range(cols):
-                x0 = ox + c * self.cell
-                y0 = oy + r * self.cell
-                x1, y1 = x0 + self.cell, y0 + self.cell
-                rect = (x0, y0, x1, y1)
-
                 if grid[r][c] is None:
-                    self._draw_hatch_cell(image, rect, color=hatch_color, spacing=6, thickness=1)
-                # borda
-                draw.rectangle(rect, outline=grid_color, width=1)
+                    if self.preview:  # prévia: bloco liso, sem hachura
+                        x0, y0 = ox + c * self.cell, oy + r * self.cell
+                        draw.rectangle((x0, y0, x0 + self.cell, y0 + self.cell), fill=self.PREVIEW_BLOCK)
+                        continue
+                    if hatch_layer is None:
+                        hatch_layer = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+                    hatch_layer.paste(tile, (ox + c * self.cell, oy + r * self.cell))
+        if hatch_layer is not None:
+            image.alpha_composite(hatch_layer)
 
-        # Letras (gabarito ou prefill)
+        # Bordas das células
         for r in range(rows):
             for c in range(cols):
-                ch = grid[r][c]
-                if not ch:
-                    continue
-                if answers or (r, c) in self.prefilled_positions:
-                    x0 = ox + c * self.cell
-                    y0 = oy + r * self.cell
-                    cx, cy = x0 + self.cell // 2, y0 + self.cell // 2
-                    tw, th = self._text_size(draw, ch, letter_font)
-                    draw.text((cx - tw // 2, cy - th // 2), ch, fill=letter_color, font=letter_font)
-
-        # Números + setas
-        # clue_positions: {(r,c): [{'num': '1', 'dir': 'horizontal'|'vertical'}, ...]}
-        starts: Dict[Tuple[int, int], Tuple[str, Set[str]]] = {}
-        for (rc, infos) in self.clue_gen.clue_positions.items():
-            r, c = rc
-            dirs: Set[str] = set()
-            num_val: Optional[str] = None
-            for info in infos:
-                d = (info.get("dir") or "").lower()
-                if d in ("horizontal", "across"):
-                    dirs.add("across")
-                elif d in ("vertical", "down"):
-                    dirs.add("down")
-                n = info.get("num")
-                if n is not None:
-                    num_val = str(n)
-            if num_val is None:
-                continue
-            if (r, c) not in starts:
-                starts[(r, c)] = (num_val, set())
-            starts[(r, c)][1].update(dirs)
+                x0 = ox + c * self.cell
+                y0 = oy + r * self.cell
+                draw.rectangle((x0, y0, x0 + self.cell, y0 + self.cell), outline=grid_color, width=1)
+
+        # Letras de prefill (o gabarito acrescenta as demais por cima, em render_pair)
+        ctx = {"ox": ox, "oy": oy, "letter_font": letter_font, "letter_color": letter_color}
+        prefill = [(r, c) for r in range(rows) for c in range(cols)
+                   if grid[r][c] and (r, c) in self.prefilled_positions]
+        self._draw_letters(draw, ctx, prefill)
 
+        # Números + setas (a prévia não tem espaço para eles)
+        starts = {} if self.preview else clue_starts(self.clue_gen)
         for (r, c), (num_txt, dirs) in starts.items():
             if grid[r][c] is None:
                 continue
@@ -128,30 +236,28 @@ class CrosswordRenderer:
             y0 = oy + r * self.cell + self.corner_pad
 
             # número
-            ntw, nth = self._text_size(draw, num_txt, num_font)
-            draw.text((x0, y0), num_txt, fill=num_color, font=num_font)
+            ntw, nth = num_font.text_size(num_txt)
+            num_font.draw(draw, (x0, y0), num_txt, num_color)
 
             # setas
             if "across" in dirs:
                 arrow = "→"
-                atw, ath = self._text_size(draw, arrow, arrow_font)
+                atw, ath = arrow_font.text_size(arrow)
                 ax = x0 + ntw + self.arrow_gap
                 ay = y0
                 # não invadir a letra
                 ax = min(ax, ox + (c + 1) * self.cell - 1 - atw)
-                draw.text((ax, ay), arrow, fill=num_color, font=arrow_font)
+                arrow_font.draw(draw, (ax, ay), arrow, num_color)
 
             if "down" in dirs:
                 arrow = "↓"
-                atw, ath = self._text_size(draw, arrow, arrow_font)
+                atw, ath = arrow_font.text_size(arrow)
                 ax = x0
                 ay = y0 + nth + self.arrow_gap
                 ay = min(ay, oy + (r + 1) * self.cell - 1 - ath)
-                draw.text((ax, ay), arrow, fill=num_color, font=arrow_font)
+                arrow_font.draw(draw, (ax, ay), arrow, num_color)
 
-        # Salva (300 DPI)
-        image = image.convert("RGB")
-        image.save(filename, format="PNG", dpi=(300, 300))
+        return image, ctx
 
     # ---------- Prefill helpers ----------
     def compute_prefill_first_letters(self, include_across: bool = True, include_down: bool = False) -> Set[Tuple[int, int]]:
@@ -173,28 +279,9 @@ class CrosswordRenderer:
         return set(coords[:k])
 
     # ---------- Internals ----------
-    def _get_font(self, size: int, prefer: str = "arial") -> ImageFont.FreeTypeFont:
-        key = (prefer, size)
-        if key in self._font_cache:
-            return self._font_cache[key]
-        try:
-            font = ImageFont.truetype(f"{prefer}.ttf", size=size)
-        except Exception:
-            font = ImageFont.load_default()
-        self._font_cache[key] = font
-        return font
-
-    def _text_size(self, draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont) -> Tuple[int, int]:
-        """Compatível com Pillow ≥10 (usa textbbox) e versões antigas (fallback)."""
-        try:
-            l, t, r, b = draw.textbbox((0, 0), text, font=font)
-            return (r - l, b - t)
-        except Exception:
-            # fallbacks
-            if hasattr(font, "getbbox"):
-                l, t, r, b = font.getbbox(text)
-                return (r - l, b - t)
-            return (len(text) * max(6, getattr(font, "size", 12) // 2), getattr(font, "size", 12))
+    def _get_font(self, size: int, prefer: str = "arial") -> FontFace:
+        # cache e atlas de glifos por processo (compartilhados entre renderers)
+        return get_face(size, [f"{prefer}.ttf"])
 
     def _draw_hatch_cell(
         self,
@@ -205,19 +292,7 @@ class CrosswordRenderer:
         spacing: int = 6,
         thickness: int = 1,
     ) -> None:
-        """Hachura diagonal *apenas dentro* da célula (overlay com alpha)."""
+        """Hachura diagonal *apenas dentro* da célula (ladrilho em cache, composto com alpha)."""
         x0, y0, x1, y1 = rect
         w, h = max(1, x1 - x0), max(1, y1 - y0)
-
-        overlay = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-        d = ImageDraw.Draw(overlay)
-
-        # Diagonal \\
-        for i in range(-h, w, spacing):
-            d.line([(i, 0), (i + h, h)], fill=color, width=thickness)
-        # Diagonal / (mais clara)
-        color2 = (color[0], color[1], color[2], max(80, color[3] // 2))
-        for i in range(0, w + h, spacing):
-            d.line([(i, 0), (0, i)], fill=color2, width=thickness)
-
-        base_img.alpha_composite(overlay, dest=(x0, y0))
+        base_img.alpha_composite(_hatch_tile(w, h, color, spacing, thickness), dest=(x0, y0))
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Cache de fontes e atlas de glifos compartilhados pelo processo inteiro:
+#   - a fonte (nome/caminho, tamanho) é aberta uma vez só, inclusive o fallback
+#     para a fonte padrão quando a TTF não existe (não tenta de novo a cada renderer)
+#   - cada glifo (texto, fração de pixel da posição) é rasterizado uma vez numa
+#     máscara L e depois carimbado com draw.bitmap — mesmos pixels de draw.text
+
+_lock = threading.Lock()
+_FACES: Dict[Tuple[Tuple[str, ...], int], "FontFace"] = {}
+_SCRATCH = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+class Glyph:
+    """Máscara rasterizada + deslocamento em relação ao ponto de desenho (parte inteira)."""
+
+    __slots__ = ("mask", "dx", "dy")
+
+    def __init__(self, mask: Optional[Image.Image], dx: int, dy: int) -> None:
+        self.mask = mask
+        self.dx = dx
+        self.dy = dy
+
+
+class FontFace:
+    """Uma fonte carregada e seu atlas de glifos/medidas."""
+
+    def __init__(self, font: ImageFont.ImageFont) -> None:
+        self.font = font
+        self._glyphs: Dict[Tuple[str, float, float], Glyph] = {}
+        self._bboxes: Dict[str, Tuple[int, int, int, int]] = {}
+
+    def bbox(self, text: str) -> Tuple[int, int, int, int]:
+        """(l, t, r, b) de `text` desenhado na origem (== draw.textbbox((0, 0), ...))."""
+        box = self._bboxes.get(text)
+        if box is None:
+            box = tuple(int(v) for v in _SCRATCH.textbbox((0, 0), text, font=self.font))
+            self._bboxes[text] = box
+        return box
+
+    def text_size(self, text: str) -> Tuple[int, int]:
+        l, t, r, b = self.bbox(text)
+        return (r - l, b - t)
+
+    def glyph(self, text: str, frac: Tuple[float, float] = (0.0, 0.0)) -> Glyph:
+        """Glifo de `text` para a fração de pixel `frac` da posição (o antialias depende dela)."""
+        key = (text, frac[0], frac[1])
+        g = self._glyphs.get(key)
+        if g is None:
+            fx, fy = frac
+            l, t, r, b = (int(v) for v in _SCRATCH.textbbox((fx, fy), text, font=self.font))
+            # desenha num rascunho com origem >= 0 (o Pillow trunca a posição e usa a
+            # fração no antialias) e recorta só os pixels acesos
+            ox, oy = max(0, -l), max(0, -t)
+            scratch = Image.new("L", (max(1, r + ox + 2), max(1, b + oy + 2)), 0)
+            ImageDraw.Draw(scratch).text((fx + ox, fy + oy), text, fill=255, font=self.font)
+            box = scratch.getbbox()
+            if box is None:
+                g = Glyph(None, 0, 0)
+            else:
+                g = Glyph(scratch.crop(box), box[0] - ox, box[1] - oy)
+            self._glyphs[key] = g
+        return g
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[float, float], text: str, fill) -> None:
+        """Equivale a draw.text(xy, text, fill=fill, font=self.font), carimbando o glifo do atlas."""
+        x, y = xy
+        ix, iy = math.floor(x), math.floor(y)
+        g = self.glyph(text, (x - ix, y - iy))
+        if g.mask is not None:
+            draw.bitmap((ix + g.dx, iy + g.dy), g.mask, fill=fill)
+
+
+def get_face(size: int, candidates: Sequence[Optional[str]]) -> FontFace:
+    """
+    Primeira TTF de `candidates` (nome ou caminho) que abrir no tamanho `size`;
+    se nenhuma abrir, a fonte padrão do Pillow. Cacheado por processo.
+    """
+    names = tuple(c for c in candidates if c)
+    key = (names, int(size))
+    face = _FACES.get(key)
+    if face is not None:
+        return face
+    with _lock:
+        face = _FACES.get(key)
+        if face is None:
+            font = None
+            for name in names:
+                try:
+                    font = ImageFont.truetype(name, size=int(size))
+                    break
+                except Exception:
+                    continue
+            if font is None:
+                font = ImageFont.load_default()
+            face = FontFace(font)
+            _FACES[key] = face
+    return face
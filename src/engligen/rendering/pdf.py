@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+# Escritor PDF mínimo (PDF 1.4), sem dependências:
+#   - fontes padrão Type1 (Helvetica, Courier, Symbol) — não precisam ser embutidas
+#   - um padrão de hachura (tiling pattern) compartilhado por todas as páginas
+#   - páginas gravadas em fluxo: cada página vai para o arquivo assim que é
+#     adicionada; só a tabela xref (offsets) fica na memória até o close()
+
+FONTS = {
+    "sans": ("F1", "Helvetica"),
+    "mono": ("F2", "Courier"),
+    "symbol": ("F3", "Symbol"),
+}
+
+# larguras (1/1000 em) da Helvetica para centralizar texto; demais caracteres ~556
+_HELVETICA_WIDTHS = dict(zip(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,:;-()",
+    [667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667,
+     611, 722, 667, 944, 667, 667, 611,
+     556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556, 556, 556, 333, 500,
+     278, 556, 500, 722, 500, 500, 500,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 278, 278, 278, 333, 333, 333],
+))
+# Symbol: seta → (0xAE) e ↓ (0xAF)
+SYMBOL_CODES = {"→": 0xAE, "↓": 0xAF}
+_SYMBOL_WIDTHS = {0xAE: 987, 0xAF: 603}
+
+# alturas de maiúscula (1/1000 em), para centralizar letras na vertical
+CAP_HEIGHT = {"sans": 718, "mono": 562, "symbol": 700}
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """Largura aproximada de `text` (mesmas métricas que o leitor de PDF usa)."""
+    if font == "mono":
+        return 0.6 * size * len(text)
+    if font == "symbol":
+        return sum(_SYMBOL_WIDTHS.get(SYMBOL_CODES.get(ch, 0), 600) for ch in text) * size / 1000.0
+    return sum(_HELVETICA_WIDTHS.get(ch, 556) for ch in text) * size / 1000.0
+
+
+def encode_text(text: str, font: str) -> bytes:
+    """String PDF literal (com escapes) na codificação da fonte."""
+    if font == "symbol":
+        raw = bytes(SYMBOL_CODES.get(ch, 0x3F) for ch in text)
+    else:
+        raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _num(v: float) -> str:
+    return ("%.3f" % v).rstrip("0").rstrip(".") if v != int(v) else str(int(v))
+
+
+def _rgb(color: Tuple[int, int, int]) -> str:
+    return " ".join(_num(c / 255.0) for c in color[:3])
+
+
+class PdfCanvas:
+    """
+    Monta o content stream de uma página em coordenadas de pixel com origem no topo
+    (como no Pillow); `scale` converte px -> pt (0.24 = 300 DPI).
+    """
+
+    def __init__(self, width_px: float, height_px: float, scale: float = 0.24) -> None:
+        self.width = width_px * scale
+        self.height = height_px * scale
+        self._ops: List[str] = [f"{_num(scale)} 0 0 {_num(-scale)} 0 {_num(self.height)} cm"]
+
+    def rect(self, x: float, y: float, w: float, h: float, *, stroke=None, fill=None,
+             pattern: Optional[str] = None, width: float = 1) -> None:
+        ops = self._ops
+        if pattern:
+            ops.append(f"/Pattern cs /{pattern} scn {_num(x)} {_num(y)} {_num(w)} {_num(h)} re f")
+        if fill is not None:
+            ops.append(f"{_rgb(fill)} rg {_num(x)} {_num(y)} {_num(w)} {_num(h)} re f")
+        if stroke is not None:
+            ops.append(f"{_rgb(stroke)} RG {_num(width)} w {_num(x)} {_num(y)} {_num(w)} {_num(h)} re S")
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, *, color, width: float = 1) -> None:
+        self._ops.append(f"{_rgb(color)} RG {_num(width)} w {_num(x0)} {_num(y0)} m {_num(x1)} {_num(y1)} l S")
+
+    def text(self, x: float, y: float, text: str, *, font: str, size: float, color) -> None:
+        """`text` com a linha de base em (x, y)."""
+        name = FONTS[font][0]
+        self._ops.append(
+            f"BT {_rgb(color)} rg /{name} {_num(size)} Tf 1 0 0 -1 {_num(x)} {_num(y)} Tm "
+            + encode_text(text, font).decode("latin-1") + " Tj ET"
+        )
+
+    def push(self, x: float, y: float, scale: float = 1.0) -> None:
+        """Desenha o que vier a seguir transladado para (x, y) e escalado (até o pop())."""
+        self._ops.append(f"q {_num(scale)} 0 0 {_num(scale)} {_num(x)} {_num(y)} cm")
+
+    def pop(self) -> None:
+        self._ops.append("Q")
+
+    def content(self) -> bytes:
+        return "\n".join(self._ops).encode("latin-1")
+
+
+class PdfWriter:
+    """
+    Grava um PDF de várias páginas em `fh` (arquivo binário), página a página.
+
+        with open("saida.pdf", "wb") as fh:
+            pdf = PdfWriter(fh)
+            pdf.add_page(canvas)
+            pdf.close()
+    """
+
+    # objetos fixos: 1 catálogo, 2 árvore de páginas, 3-5 fontes, 6 hachura
+    _CATALOG, _PAGES, _HATCH = 1, 2, 6
+
+    def __init__(self, fh: BinaryIO, *, hatch_color=(170, 170, 170), hatch_spacing: float = 6,
+                 scale: float = 0.24, compress: bool = True) -> None:
+        self._fh = fh
+        self._offsets: Dict[int, int] = {}
+        self._pos = 0
+        self._next_id = 7
+        self._kids: List[int] = []
+        self._tail: List[int] = []
+        self._compress = compress
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        font_ids = {}
+        for i, (name, base) in enumerate(FONTS.values()):
+            obj = 3 + i
+            enc = "" if base == "Symbol" else " /Encoding /WinAnsiEncoding"
+            self._object(obj, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base}{enc} >>".encode())
+            font_ids[name] = obj
+        self._resources = (
+            "<< /Font << " + " ".join(f"/{n} {o} 0 R" for n, o in font_ids.items()) + " >> "
+            f"/Pattern << /Hatch {self._HATCH} 0 R >> >>"
+        ).encode()
+
+        # hachura: diagonal \ na cor dada e / mais clara (mesmo desenho do PNG)
+        s = hatch_spacing
+        light = tuple(round(c + (255 - c) / 2) for c in hatch_color[:3])
+        tile = (f"{_rgb(hatch_color)} RG 1 w 0 0 m {_num(s)} {_num(s)} l S "
+                f"{_rgb(light)} RG {_num(s)} 0 m 0 {_num(s)} l S").encode()
+        self._stream(
+            self._HATCH,
+            f"/Type /Pattern /PatternType 1 /PaintType 1 /TilingType 1 /BBox [0 0 {_num(s)} {_num(s)}] "
+            f"/XStep {_num(s)} /YStep {_num(s)} /Resources << >> "
+            f"/Matrix [{_num(scale)} 0 0 {_num(-scale)} 0 0]",
+            tile,
+        )
+
+    # ---------- baixo nível ----------
+    def _write(self, data: bytes) -> None:
+        self._fh.write(data)
+        self._pos += len(data)
+
+    def _object(self, obj: int, body: bytes) -> None:
+        self._offsets[obj] = self._pos
+        self._write(b"%d 0 obj\n" % obj + body + b"\nendobj\n")
+
+    def _stream(self, obj: int, dict_body: str, data: bytes) -> None:
+        if self._compress:
+            data = zlib.compress(data)
+            dict_body += " /Filter /FlateDecode"
+        self._object(obj, f"<< {dict_body} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    # ---------- API ----------
+    def add_page(self, canvas: PdfCanvas, *, at_end: bool = False) -> None:
+        """
+        Grava a página já. `at_end=True` a coloca depois de todas as outras (ex.: gabaritos
+        no fim do caderno) — só a ordem na árvore de páginas muda, nada fica em memória.
+        """
+        content_id, page_id = self._new_id(), self._new_id()
+        self._stream(content_id, "", canvas.content())
+        self._object(page_id, (
+            f"<< /Type /Page /Parent {self._PAGES} 0 R "
+            f"/MediaBox [0 0 {_num(canvas.width)} {_num(canvas.height)}] "
+            f"/Contents {content_id} 0 R /Resources "
+        ).encode() + self._resources + b" >>")
+        (self._tail if at_end else self._kids).append(page_id)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._kids) + len(self._tail)
+
+    def close(self) -> None:
+        pages = self._kids + self._tail
+        kids = " ".join(f"{k} 0 R" for k in pages)
+        self._object(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+        self._object(self._CATALOG, f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>".encode())
+
+        xref_pos = self._pos
+        size = self._next_id
+        lines = [b"xref\n", b"0 %d\n" % size, b"0000000000 65535 f \n"]
+        for obj in range(1, size):
+            off = self._offsets.get(obj)
+            lines.append(b"%010d 00000 n \n" % off if off is not None else b"0000000000 65535 f \n")
+        self._write(b"".join(lines))
+        self._write(f"trailer\n<< /Size {size} /Root {self._CATALOG} 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode())
+        self._fh.flush()
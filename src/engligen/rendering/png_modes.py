@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+from PIL import Image
+
+# Modos de gravação dos PNGs. As folhas só têm preto, cinzas e uma ou duas cores de
+# destaque, então não precisam de RGB de 24 bits:
+#   - "rgb":     como sempre foi (RGB, 24 bits)
+#   - "palette": paleta fixa pequena (modo P, 8 bits) — cinzas + cores de destaque
+#   - "1bit":    preto e branco (modo 1); cinzas claros da hachura viram preto
+# Codificar P/1 é várias vezes mais rápido e gera arquivos várias vezes menores.
+OUTPUT_MODES = ("rgb", "palette", "1bit")
+
+GRAY_LEVELS = 16
+BILEVEL_THRESHOLD = 200  # luminância acima disso vira branco (hachura 170 fica preta)
+
+_lock = threading.Lock()
+_PALETTES: Dict[Tuple, Image.Image] = {}
+
+
+def check_mode(mode: Optional[str]) -> str:
+    mode = str(mode or "rgb").lower()
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"modo de saída inválido: {mode!r} (use {', '.join(OUTPUT_MODES)})")
+    return mode
+
+
+def fixed_palette(accents: Sequence[Tuple[int, int, int]] = ()) -> Image.Image:
+    """
+    Imagem P com a paleta fixa: rampa de cinzas + cada cor de destaque e suas misturas
+    com preto (bordas antialias das letras sobre o destaque). Cacheada por processo.
+    """
+    key = tuple(tuple(c[:3]) for c in accents)
+    pal = _PALETTES.get(key)
+    if pal is None:
+        colors = []
+        step = 255 // (GRAY_LEVELS - 1)
+        for i in range(GRAY_LEVELS):
+            colors.append((i * step,) * 3)
+        for color in key:
+            for k in (1.0, 0.75, 0.5, 0.25):
+                colors.append(tuple(int(round(v * k)) for v in color))
+        flat = [v for c in colors for v in c]
+        pal = Image.new("P", (1, 1))
+        pal.putpalette(flat + flat[:3] * (256 - len(colors)))
+        with _lock:
+            _PALETTES.setdefault(key, pal)
+    return pal
+
+
+def convert(image: Image.Image, mode: str, accents: Sequence[Tuple[int, int, int]] = ()) -> Image.Image:
+    """Converte uma folha RGB para o modo de saída (sem dithering: traços continuam nítidos)."""
+    if mode == "palette":
+        return image.convert("RGB").quantize(palette=fixed_palette(accents), dither=Image.Dither.NONE)
+    if mode == "1bit":
+        return image.convert("L").point(lambda v: 255 if v > BILEVEL_THRESHOLD else 0, mode="1")
+    return image
+
+
+def save_png(
+    image: Image.Image,
+    filename,
+    *,
+    mode: str = "rgb",
+    compress_level: int = 6,
+    optimize: bool = False,
+    accents: Sequence[Tuple[int, int, int]] = (),
+    dpi: Optional[Tuple[int, int]] = None,
+) -> None:
+    """Grava `image` como PNG no modo pedido (`filename`: caminho ou arquivo binário)."""
+    params = {"compress_level": int(compress_level), "optimize": bool(optimize)}
+    if dpi:
+        params["dpi"] = dpi
+    convert(image, mode, accents).save(filename, format="PNG", **params)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Prévia em texto (terminal) das grades — instantânea, sem Pillow.
+#   Crossword:  letras (ou "_" nas casas em branco do exercício), "#" nos blocos
+#   WordSearch: todas as letras; no gabarito, "." fora das palavras colocadas
+BLOCK = "#"
+BLANK = "_"
+FILLER = "."
+
+
+def _frame(rows: Iterable[List[str]], width: int) -> str:
+    border = "+" + "-" * (width * 2 + 1) + "+"
+    lines = [border]
+    lines.extend("| " + " ".join(row) + " |" for row in rows)
+    lines.append(border)
+    return "\n".join(lines)
+
+
+def crossword_ascii(cw, *, answers: bool = True, prefilled: Optional[Set[Tuple[int, int]]] = None) -> str:
+    """Grade da cruzada em ASCII; com answers=False só as casas de `prefilled` mostram a letra."""
+    grid = cw.grid
+    shown = prefilled or set()
+    rows = []
+    for r, row in enumerate(grid):
+        cells = []
+        for c, ch in enumerate(row):
+            if ch is None:
+                cells.append(BLOCK)
+            elif answers or (r, c) in shown:
+                cells.append(ch)
+            else:
+                cells.append(BLANK)
+        rows.append(cells)
+    return _frame(rows, len(grid[0]) if grid else 0)
+
+
+def wordsearch_ascii(ws, *, answers: bool = False) -> str:
+    """Grade do caça-palavras em ASCII; no gabarito, só as letras das palavras colocadas."""
+    n = int(ws.size)
+    keep: Optional[Set[Tuple[int, int]]] = None
+    if answers:
+        keep = set()
+        for w, pos in (ws.placed_words or {}).items():
+            for i in range(len(w)):
+                keep.add((pos["r"] + i * pos["dr"], pos["c"] + i * pos["dc"]))
+    rows = [
+        [(ws.grid[r][c] or FILLER) if keep is None or (r, c) in keep else FILLER for c in range(n)]
+        for r in range(n)
+    ]
+    return _frame(rows, n)
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import io
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+from engligen.rendering.crossword_renderer import clue_starts
+from engligen.rendering.pdf import CAP_HEIGHT, PdfCanvas, PdfWriter, text_width
+
+# Backend vetorial (SVG/PDF) para os dois tipos de puzzle: desenha direto a partir
+# da grade e das posições — linhas, hachura como padrão (pattern) e texto como texto,
+# sem rasterizar. Mesmo layout dos renderers PNG (px a 300 DPI).
+VECTOR_FORMATS = ("svg", "pdf")
+DPI = 300
+HATCH_COLOR = (170, 170, 170)
+HATCH_SPACING = 6
+
+_SVG_FAMILY = {
+    "sans": "Arial, Helvetica, sans-serif",
+    "mono": "'DejaVu Sans Mono', 'Courier New', Courier, monospace",
+    "symbol": "Arial, Helvetica, sans-serif",
+}
+
+
+def _svg_color(color) -> str:
+    return "#%02x%02x%02x" % tuple(color[:3])
+
+
+def _n(v: float) -> str:
+    return ("%.2f" % v).rstrip("0").rstrip(".")
+
+
+def _write(target, data: bytes) -> None:
+    if hasattr(target, "write"):
+        target.write(data)
+    else:
+        with open(target, "wb") as f:
+            f.write(data)
+
+
+class Scene:
+    """Lista de primitivas em px (origem no topo), exportável para SVG ou para uma página PDF."""
+
+    def __init__(self, width: float, height: float) -> None:
+        self.width = width
+        self.height = height
+        self.ops: List[Tuple] = []
+
+    def copy(self) -> "Scene":
+        other = Scene(self.width, self.height)
+        other.ops = list(self.ops)
+        return other
+
+    # ---------- primitivas ----------
+    def rect(self, x: float, y: float, w: float, h: float, *, stroke=None, fill=None,
+             hatch: bool = False, width: float = 1) -> None:
+        self.ops.append(("rect", x, y, w, h, stroke, fill, hatch, width))
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, *, color, width: float = 1) -> None:
+        self.ops.append(("line", x0, y0, x1, y1, color, width))
+
+    def text(self, x: float, y: float, text: str, *, font: str, size: float, color) -> None:
+        """Texto com a linha de base em (x, y)."""
+        self.ops.append(("text", x, y, text, font, size, color))
+
+    def text_centered(self, cx: float, cy: float, text: str, *, font: str, size: float, color) -> None:
+        """Centraliza pela largura e pela altura de maiúscula (letras da grade)."""
+        x = cx - text_width(text, font, size) / 2
+        y = cy + CAP_HEIGHT[font] * size / 2000.0
+        self.text(x, y, text, font=font, size=size, color=color)
+
+    def text_top_left(self, x: float, top: float, text: str, *, font: str, size: float, color) -> None:
+        self.text(x, top + CAP_HEIGHT[font] * size / 1000.0, text, font=font, size=size, color=color)
+
+    # ---------- saídas ----------
+    def to_svg(self) -> bytes:
+        W, H = self.width, self.height
+        mm = 25.4 / DPI
+        s = HATCH_SPACING
+        light = tuple(round(c + (255 - c) / 2) for c in HATCH_COLOR)
+        out = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{W * mm:.2f}mm" height="{H * mm:.2f}mm" '
+            f'viewBox="0 0 {W} {H}">',
+            f'<defs><pattern id="hatch" patternUnits="userSpaceOnUse" width="{s}" height="{s}">'
+            f'<path d="M0 0L{s} {s}" stroke="{_svg_color(HATCH_COLOR)}" stroke-width="1"/>'
+            f'<path d="M{s} 0L0 {s}" stroke="{_svg_color(light)}" stroke-width="1"/></pattern></defs>',
+            f'<rect width="{W}" height="{H}" fill="#ffffff"/>',
+        ]
+        styles: Dict[Tuple, str] = {}
+        body: List[str] = []
+
+        def cls(key: Tuple, css: str) -> str:
+            if key not in styles:
+                styles[key] = f".s{len(styles)}{{{css}}}"
+            return f"s{list(styles).index(key)}"
+
+        # primitivas consecutivas com o mesmo estilo viram um único <path> (arquivo bem menor)
+        run_key: Optional[Tuple] = None
+        run: List[str] = []
+
+        def flush() -> None:
+            if run:
+                if run_key[0] == "hatch":
+                    attrs = 'fill="url(#hatch)"'
+                elif run_key[0] == "fill":
+                    attrs = 'class="%s"' % cls(run_key, f"fill:{_svg_color(run_key[1])}")
+                else:
+                    _, color, width = run_key
+                    attrs = 'class="%s"' % cls(
+                        run_key, f"fill:none;stroke:{_svg_color(color)};stroke-width:{_n(width)}")
+                body.append(f'<path {attrs} d="{"".join(run)}"/>')
+                run.clear()
+
+        def add(key: Tuple, segment: str) -> None:
+            nonlocal run_key
+            if key != run_key:
+                flush()
+                run_key = key
+            run.append(segment)
+
+        for op in self.ops:
+            kind = op[0]
+            if kind == "rect":
+                _, x, y, w, h, stroke, fill, hatch, width = op
+                box = f"M{_n(x)} {_n(y)}h{_n(w)}v{_n(h)}h{_n(-w)}z"
+                if hatch:
+                    add(("hatch",), box)
+                if fill is not None:
+                    add(("fill", fill), box)
+                if stroke is not None:
+                    add(("stroke", stroke, width), box)
+            elif kind == "line":
+                _, x0, y0, x1, y1, color, width = op
+                add(("stroke", color, width), f"M{_n(x0)} {_n(y0)}L{_n(x1)} {_n(y1)}")
+            else:
+                flush()
+                run_key = None
+                _, x, y, text, font, size, color = op
+                c = cls(("text", font, size, color),
+                        f"font-family:{_SVG_FAMILY[font]};font-size:{_n(size)}px;fill:{_svg_color(color)}")
+                body.append(f'<text class="{c}" x="{_n(x)}" y="{_n(y)}">{escape(text)}</text>')
+        flush()
+
+        if styles:
+            out.append("<style>" + "".join(styles.values()) + "</style>")
+        out.extend(body)
+        out.append("</svg>\n")
+        return "\n".join(out).encode("utf-8")
+
+    def paint(self, canvas: PdfCanvas) -> None:
+        """Desenha a cena num PdfCanvas (coordenadas px da cena; ver PdfCanvas.push)."""
+        for op in self.ops:
+            kind = op[0]
+            if kind == "rect":
+                _, x, y, w, h, stroke, fill, hatch, width = op
+                canvas.rect(x, y, w, h, stroke=stroke, fill=fill, pattern="Hatch" if hatch else None, width=width)
+            elif kind == "line":
+                _, x0, y0, x1, y1, color, width = op
+                canvas.line(x0, y0, x1, y1, color=color, width=width)
+            else:
+                _, x, y, text, font, size, color = op
+                canvas.text(x, y, text, font=font, size=size, color=color)
+
+    def to_pdf_canvas(self) -> PdfCanvas:
+        canvas = PdfCanvas(self.width, self.height, scale=72.0 / DPI)
+        self.paint(canvas)
+        return canvas
+
+    def to_pdf(self) -> bytes:
+        buf = io.BytesIO()
+        pdf = PdfWriter(buf, hatch_color=HATCH_COLOR, hatch_spacing=HATCH_SPACING, scale=72.0 / DPI)
+        pdf.add_page(self.to_pdf_canvas())
+        pdf.close()
+        return buf.getvalue()
+
+    def encode(self, fmt: str) -> bytes:
+        return self.to_pdf() if fmt == "pdf" else self.to_svg()
+
+
+class _VectorRenderer(ABC):
+    """Base comum: mesma API dos renderers PNG (to_bytes*/generate_image*/render_pair)."""
+
+    def __init__(self, fmt: str) -> None:
+        fmt = (fmt or "svg").lower()
+        if fmt not in VECTOR_FORMATS:
+            raise ValueError(f"formato vetorial inválido: {fmt!r} (use {', '.join(VECTOR_FORMATS)})")
+        self.fmt = fmt
+
+    @abstractmethod
+    def render_pair(self) -> Tuple[Scene, Scene]:
+        """(exercício, gabarito) como cenas vetoriais."""
+
+    def to_bytes(self, answers: bool = False) -> bytes:
+        return self.render_pair()[1 if answers else 0].encode(self.fmt)
+
+    def to_bytes_pair(self) -> Tuple[bytes, bytes]:
+        exercise, answer_sheet = self.render_pair()
+        return exercise.encode(self.fmt), answer_sheet.encode(self.fmt)
+
+    def generate_image(self, filename, answers: bool = False) -> None:
+        _write(filename, self.to_bytes(answers))
+
+    def generate_images(self, exercise_filename, answers_filename) -> None:
+        exercise, answer_sheet = self.to_bytes_pair()
+        _write(exercise_filename, exercise)
+        _write(answers_filename, answer_sheet)
+
+
+class CrosswordVectorRenderer(_VectorRenderer):
+    """Palavras-cruzadas em SVG/PDF com o layout do CrosswordRenderer (ink-saver)."""
+
+    GRID = (60, 60, 60)
+    TEXT = (0, 0, 0)
+
+    def __init__(
+        self,
+        crossword,
+        clue_generator,
+        *,
+        fmt: str = "svg",
+        cell_size: int = 40,
+        padding: int = 25,
+        ink_saver: bool = True,
+        header_text: Optional[str] = None,
+        corner_pad: int = 2,
+        arrow_gap_px: Optional[int] = None,
+    ) -> None:
+        super().__init__(fmt)
+        self.crossword = crossword
+        self.clue_gen = clue_generator
+        self.cell = int(cell_size)
+        self.pad = int(padding)
+        self.ink_saver = bool(ink_saver)
+        self.header_text = header_text
+        self.corner_pad = int(corner_pad)
+        self.arrow_gap = 2 if arrow_gap_px is None else int(arrow_gap_px)
+
+        # posições reveladas no exercício
+        self.prefilled_positions: Set[Tuple[int, int]] = set()
+
+    def render_pair(self) -> Tuple[Scene, Scene]:
+        """(exercício, gabarito): o gabarito é a cena do exercício + as letras restantes."""
+        grid = self.crossword.grid
+        rows, cols = len(grid), len(grid[0])
+        cell = self.cell
+        header_h = int(cell * 0.9) if self.header_text else 0
+        ox, oy = self.pad, self.pad + header_h
+        scene = Scene(self.pad * 2 + cols * cell, self.pad * 2 + rows * cell + header_h)
+
+        if self.header_text:
+            size = cell // 2
+            scene.text_centered(scene.width / 2, self.pad + header_h / 2, self.header_text,
+                                font="sans", size=size, color=self.TEXT)
+
+        # blocos: hachura como padrão; depois as bordas de todas as células
+        for r in range(rows):
+            for c in range(cols):
+                if grid[r][c] is None:
+                    scene.rect(ox + c * cell, oy + r * cell, cell, cell, hatch=True)
+        for r in range(rows):
+            for c in range(cols):
+                scene.rect(ox + c * cell, oy + r * cell, cell, cell, stroke=self.GRID)
+
+        letter_size = max(12, int(cell * 0.55))
+
+        def letters(target: Scene, cells) -> None:
+            for r, c in cells:
+                target.text_centered(ox + c * cell + cell / 2, oy + r * cell + cell / 2, grid[r][c],
+                                    font="sans", size=letter_size, color=self.TEXT)
+
+        letters(scene, ((r, c) for r in range(rows) for c in range(cols)
+                        if grid[r][c] and (r, c) in self.prefilled_positions))
+
+        # números + setas (mesmas regras de posição do PNG)
+        num_size = max(10, int(cell * 0.33))
+        arrow_size = max(9, int(cell * 0.30))
+        num_h = CAP_HEIGHT["sans"] * num_size / 1000.0
+        for (r, c), (num_txt, dirs) in clue_starts(self.clue_gen).items():
+            if grid[r][c] is None:
+                continue
+            x0 = ox + c * cell + self.corner_pad
+            y0 = oy + r * cell + self.corner_pad
+            scene.text_top_left(x0, y0, num_txt, font="sans", size=num_size, color=self.TEXT)
+            if "across" in dirs:
+                aw = text_width("→", "symbol", arrow_size)
+                ax = min(x0 + text_width(num_txt, "sans", num_size) + self.arrow_gap, ox + (c + 1) * cell - 1 - aw)
+                scene.text_top_left(ax, y0, "→", font="symbol", size=arrow_size, color=self.TEXT)
+            if "down" in dirs:
+                ah = CAP_HEIGHT["symbol"] * arrow_size / 1000.0
+                ay = min(y0 + num_h + self.arrow_gap, oy + (r + 1) * cell - 1 - ah)
+                scene.text_top_left(x0, ay, "↓", font="symbol", size=arrow_size, color=self.TEXT)
+
+        answers = scene.copy()
+        letters(answers, ((r, c) for r in range(rows) for c in range(cols)
+                          if grid[r][c] and (r, c) not in self.prefilled_positions))
+        return scene, answers
+
+
+class WordSearchVectorRenderer(_VectorRenderer):
+    """Caça-palavras em SVG/PDF com o layout do WordSearchRenderer."""
+
+    GRID = (30, 30, 30)
+    TEXT = (0, 0, 0)
+    HIGHLIGHT_FILL = (220, 240, 255)
+    HIGHLIGHT_STROKE = (200, 0, 0)
+
+    def __init__(
+        self,
+        wordsearch,
+        *,
+        fmt: str = "svg",
+        cell_size: int = 40,
+        padding: int = 25,
+        highlight_style: str = "fill",
+        stroke_width: int = 5,
+    ) -> None:
+        super().__init__(fmt)
+        self.ws = wordsearch
+        self.n = int(wordsearch.size)
+        self.cell = int(cell_size)
+        self.pad = int(padding)
+        self.style = str(highlight_style or "fill").lower()
+        self.stroke_width = int(stroke_width)
+
+    def _placements(self):
+        for w, pos in (self.ws.placed_words or {}).items():
+            yield pos["r"], pos["c"], pos["dr"], pos["dc"], len(w)
+
+    def render_pair(self) -> Tuple[Scene, Scene]:
+        n, cell, pad = self.n, self.cell, self.pad
+        side = pad * 2 + n * cell
+
+        def grid_scene() -> Scene:
+            scene = Scene(side, side)
+            scene.rect(pad, pad, n * cell, n * cell, stroke=self.GRID)
+            for i in range(1, n):
+                scene.line(pad, pad + i * cell, pad + n * cell, pad + i * cell, color=self.GRID)
+                scene.line(pad + i * cell, pad, pad + i * cell, pad + n * cell, color=self.GRID)
+            return scene
+
+        size = int(cell * 0.55)
+        letters = Scene(side, side)
+        for r in range(n):
+            for c in range(n):
+                ch = self.ws.grid[r][c]
+                if ch:
+                    letters.text_centered(pad + c * cell + cell / 2, pad + r * cell + cell / 2, ch,
+                                          font="mono", size=size, color=self.TEXT)
+
+        exercise = grid_scene()
+        exercise.ops.extend(letters.ops)
+
+        if self.style == "fill":
+            # destaques por baixo das letras
+            answers = grid_scene()
+            for r, c, dr, dc, L in self._placements():
+                for i in range(L):
+                    answers.rect(pad + (c + i * dc) * cell, pad + (r + i * dr) * cell, cell, cell,
+                                 fill=self.HIGHLIGHT_FILL)
+            answers.ops.extend(letters.ops)
+        else:
+            answers = exercise.copy()
+            for r, c, dr, dc, L in self._placements():
+                answers.line(pad + (c + 0.5) * cell, pad + (r + 0.5) * cell,
+                             pad + (c + (L - 1) * dc + 0.5) * cell, pad + (r + (L - 1) * dr + 0.5) * cell,
+                             color=self.HIGHLIGHT_STROKE, width=self.stroke_width)
+        return exercise, answers
@@ -1,15 +1,22 @@
 from __future__ import annotations
+import io
 from typing import List, Tuple
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
+from engligen.rendering.glyphs import get_face
+from engligen.rendering.png_modes import check_mode, save_png
 
 class WordSearchRenderer:
     """
     Renderizador de caça-palavras:
       - Exercício: grade + letras
       - Respostas: destaques (fill) OU linhas (stroke) nas palavras colocadas
+      - preview=True: prévia rápida de baixa resolução (células de 16 px)
     """
 
+    PREVIEW_CELL = 16
+    PREVIEW_PAD = 4
+
     BACKGROUND = (255, 255, 255)
     GRID = (30, 30, 30)
     TEXT = (0, 0, 0)
@@ -24,7 +31,11 @@ class WordSearchRenderer:
         padding: int = 25,
         highlight_style: str = "fill",   # "fill" ou "stroke"
         stroke_width: int = 5,
-        font_path: str | None = None
+        font_path: str | None = None,
+        output_mode: str = "rgb",        # "rgb" | "palette" | "1bit" (ver png_modes)
+        png_compress_level: int = 6,
+        png_optimize: bool = False,
+        preview: bool = False,
     ) -> None:
         self.ws = wordsearch
         self.n = int(wordsearch.size)
@@ -33,40 +44,82 @@ class WordSearchRenderer:
         self.style = str(highlight_style or "fill").lower()
         self.stroke_width = int(stroke_width)
         self.font_path = font_path
+        self.output_mode = check_mode(output_mode)
+        self.png_compress_level = int(png_compress_level)
+        self.png_optimize = bool(png_optimize)
+        self.preview = bool(preview)
+        if self.preview:
+            self.cell, self.pad = self.PREVIEW_CELL, self.PREVIEW_PAD
+            self.stroke_width = max(1, min(self.stroke_width, 3))
 
         # fonte monoespaçada; fallback para default do PIL
-        self.font = None
-        if self.font_path:
-            try:
-                self.font = ImageFont.truetype(self.font_path, size=int(self.cell * 0.55))
-            except Exception:
-                self.font = None
-        if self.font is None:
-            try:
-                self.font = ImageFont.truetype("DejaVuSansMono.ttf", size=int(self.cell * 0.55))
-            except Exception:
-                self.font = ImageFont.load_default()
+        self.face = get_face(int(self.cell * (0.75 if self.preview else 0.55)),
+                             [self.font_path, "DejaVuSansMono.ttf"])
+        self.font = self.face.font
 
     # ---------- API ----------
 
-    def generate_image(self, filename: str, answers: bool = False) -> None:
+    def generate_image(self, filename, answers: bool = False) -> None:
+        """Grava a folha em `filename`: caminho ou arquivo binário aberto (BytesIO, zip, socket...)."""
+        image = self.render_pair()[1] if answers else self._render_exercise()
+        self._save(image, filename)
+
+    def to_bytes(self, answers: bool = False) -> bytes:
+        """PNG da folha (exercício ou gabarito) em memória, sem arquivo temporário."""
+        buf = io.BytesIO()
+        self.generate_image(buf, answers=answers)
+        return buf.getvalue()
+
+    def to_bytes_pair(self) -> Tuple[bytes, bytes]:
+        """(exercício, gabarito) em PNG na memória, com as camadas comuns desenhadas uma vez."""
+        exercise, answer_sheet = io.BytesIO(), io.BytesIO()
+        self.generate_images(exercise, answer_sheet)
+        return exercise.getvalue(), answer_sheet.getvalue()
+
+    def generate_images(self, exercise_filename, answers_filename) -> None:
+        """Exercício + gabarito numa passada só (grade e letras desenhadas uma vez)."""
+        exercise, answer_sheet = self.render_pair()
+        self._save(exercise, exercise_filename)
+        self._save(answer_sheet, answers_filename)
+
+    def _save(self, image: Image.Image, filename) -> None:
+        save_png(image, filename, mode=self.output_mode, compress_level=self.png_compress_level,
+                 optimize=self.png_optimize, accents=(self.HIGHLIGHT_FILL, self.HIGHLIGHT_STROKE))
+
+    def _render_exercise(self) -> Image.Image:
         W = H = self.pad * 2 + self.n * self.cell
         img = Image.new("RGB", (W, H), self.BACKGROUND)
         draw = ImageDraw.Draw(img)
-
         self._draw_grid(draw)
-
-        # Se for gabarito com FILL, desenhe os destaques ANTES das letras (para não cobri-las)
-        if answers and self.style == "fill":
-            self._draw_answers_fill(draw)
-
         self._draw_letters(draw)
+        return img
 
-        # Se for gabarito com STROKE, desenhe as linhas por cima
-        if answers and self.style != "fill":
-            self._draw_answers_stroke(draw)
-
-        img.save(filename, format="PNG")
+    def render_pair(self) -> Tuple[Image.Image, Image.Image]:
+        """
+        (exercício, gabarito). Grade e letras são desenhadas uma vez: as letras viram
+        uma máscara (L) carimbada com paste por cima de cada folha — assim os destaques
+        do gabarito (FILL) continuam por baixo delas.
+        """
+        W = H = self.pad * 2 + self.n * self.cell
+        grid_layer = Image.new("RGB", (W, H), self.BACKGROUND)
+        self._draw_grid(ImageDraw.Draw(grid_layer))
+
+        letters = Image.new("L", (W, H), 0)
+        self._draw_letters(ImageDraw.Draw(letters), fill=255)
+
+        exercise = grid_layer.copy()
+        exercise.paste(self.TEXT, mask=letters)
+
+        if self.style == "fill":
+            # Se for gabarito com FILL, desenhe os destaques ANTES das letras (para não cobri-las)
+            answer_sheet = grid_layer
+            self._draw_answers_fill(ImageDraw.Draw(answer_sheet))
+            answer_sheet.paste(self.TEXT, mask=letters)
+        else:
+            # Se for gabarito com STROKE, desenhe as linhas por cima
+            answer_sheet = exercise.copy()
+            self._draw_answers_stroke(ImageDraw.Draw(answer_sheet))
+        return exercise, answer_sheet
 
     # ---------- desenho básico ----------
 
@@ -87,7 +140,7 @@ class WordSearchRenderer:
             x = self.pad + i * self.cell
             draw.line([x, self.pad, x, self.pad + self.n * self.cell], fill=self.GRID, width=1)
 
-    def _draw_letters(self, draw: ImageDraw.ImageDraw) -> None:
+    def _draw_letters(self, draw: ImageDraw.ImageDraw, fill=None) -> None:
         """
         Pillow 11 removeu `draw.textsize`. Use `font.getbbox` (ou `draw.textbbox` como fallback)
         e centralize compensando o offset do bbox (x0,y0) do glifo.
@@ -100,20 +153,15 @@ class WordSearchRenderer:
                 cx = self.pad + c * self.cell + self.cell / 2
                 cy = self.pad + r * self.cell + self.cell / 2
 
-                # mede o glifo
-                try:
-                    # preferir getbbox pela estabilidade
-                    bx0, by0, bx1, by1 = self.font.getbbox(ch)
-                except Exception:
-                    # fallback: usa o draw.textbbox
-                    bx0, by0, bx1, by1 = draw.textbbox((0, 0), ch, font=self.font)
+                # mede o glifo (medidas e máscara vêm do atlas compartilhado)
+                bx0, by0, bx1, by1 = self.face.bbox(ch)
 
                 w = bx1 - bx0
                 h = by1 - by0
                 # compensar o offset de origem do bbox (bx0,by0)
                 x = cx - w / 2 - bx0
                 y = cy - h / 2 - by0
-                draw.text((x, y), ch, fill=self.TEXT, font=self.font)
+                self.face.draw(draw, (x, y), ch, self.TEXT if fill is None else fill)
 
     # ---------- gabarito ----------
 
@@ -133,12 +181,18 @@ class WordSearchRenderer:
                 cells.append((rr, cc))
                 rr += dr
                 cc += dc
+        # em 1 bit o azul claro sumiria (vira branco): usa um pontilhado no lugar
+        dots = self.output_mode == "1bit"
         for rr, cc in cells:
             x0 = self.pad + cc * self.cell
             y0 = self.pad + rr * self.cell
             x1 = x0 + self.cell
             y1 = y0 + self.cell
-            draw.rectangle([x0, y0, x1, y1], fill=self.HIGHLIGHT_FILL)
+            if dots:
+                draw.point([(x, y) for y in range(y0 + 2, y1, 4) for x in range(x0 + 2 + (y // 4) % 2 * 2, x1, 4)],
+                           fill=self.TEXT)
+            else:
+                draw.rectangle([x0, y0, x1, y1], fill=self.HIGHLIGHT_FILL)
 
     def _draw_answers_stroke(self, draw: ImageDraw.ImageDraw) -> None:
         for _, r, c, dr, dc, L in self._collect_placements():
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from engligen.core import puzzle_file
+
+if TYPE_CHECKING:
+    from engligen.app import EngligenApp
+
+# Estoque de puzzles prontos por unidade (config "stock"), gerados em tempo ocioso:
+#   data/.cache/stock/<unidade>/<tipo>_<tamanho>/<criação>.json   (arquivo de puzzle + "stock")
+# - Cada item é um rascunho (nada entra no histórico ao gerar). Os itens de uma unidade
+#   não repetem palavras entre si: o próximo é gerado excluindo as já reservadas no estoque.
+# - Ao tirar um item (take), as palavras entram no histórico numa reserva atômica
+#   (EngligenApp.reservar_uso); se alguma já tiver sido usada desde a geração, o item é
+#   descartado e o próximo é tentado. claim() separa o item sem reservar: commit()
+#   confirma, release() devolve (o servidor só confirma ao decidir responder 200).
+# - Cada item guarda a assinatura dos arquivos da unidade (caminho + mtime + tamanho):
+#   mudou a wordlist, os itens antigos são descartados e o refill gera novos.
+DEFAULT_PER_SIZE = 2
+RETRY_SECONDS = 600.0  # após uma falha de geração, espera antes de tentar o mesmo tamanho de novo
+DEFAULT_SIZES: Dict[str, List[Any]] = {"crossword": [[12, 12]], "wordsearch": [15]}
+
+Size = Tuple[int, ...]
+
+
+def _size_label(size: Size) -> str:
+    return "x".join(str(n) for n in size)
+
+
+class PuzzleStock:
+    """
+    Estoque por unidade do curso (course.units do config):
+
+        stock = PuzzleStock(app)
+        stock.refill()                              # completa tudo (ou refill(limit=1) no ócio)
+        got = stock.take("u1", "crossword", (12, 12))  # puzzle pronto (já no histórico) ou None
+    """
+
+    def __init__(self, app: "EngligenApp", *, root: Optional[Path] = None, pool=None) -> None:
+        cfg = (app.config or {}).get("stock") or {}
+        self.app = app
+        self.root = Path(root) if root is not None else app.cache_dir / "stock"
+        self.pool = pool
+        self.enabled = bool(cfg.get("enabled", True))
+        self.per_size = max(0, int(cfg.get("per_size", DEFAULT_PER_SIZE)))
+        self.idle_seconds = float(cfg.get("idle_seconds", 5))
+        self._failed: Dict[Tuple[str, str, Size], float] = {}
+        self.specs: List[Tuple[str, Size]] = []
+        for kind in ("crossword", "wordsearch"):
+            for raw in cfg.get(kind, DEFAULT_SIZES[kind]):
+                size = tuple(int(n) for n in raw) if isinstance(raw, (list, tuple)) else (int(raw),)
+                self.specs.append((kind, size))
+
+    # ---------- unidades ----------
+    def units(self) -> List[str]:
+        return self.app.course_units()
+
+    def unit_overrides(self, unit: str) -> Dict[str, Any]:
+        """Overrides de arquivo para gerar_* com os bancos da unidade."""
+        common, themed = self.app.unit_wordlists(unit)
+        return {"common_file_override": str(common) if common else None,
+                "themed_files_override": [str(p) for p in themed]}
+
+    def signature(self, unit: str) -> str:
+        common, themed = self.app.unit_wordlists(unit)
+        h = hashlib.sha1()
+        for p in themed + ([common] if common else []):
+            try:
+                st = p.stat()
+                h.update(f"{p.resolve()}|{st.st_mtime_ns}|{st.st_size}\n".encode("utf-8"))
+            except OSError:
+                h.update(f"{p}|-\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def spec_for(self, kind: str, size: Sequence[int]) -> Optional[Tuple[str, Size]]:
+        size = tuple(int(n) for n in size)
+        return (kind, size) if (kind, size) in self.specs else None
+
+    # ---------- arquivos ----------
+    def _folder(self, unit: str, kind: str, size: Size) -> Path:
+        return self.root / unit / f"{kind}_{_size_label(size)}"
+
+    def _items(self, unit: str, kind: str, size: Size) -> List[Path]:
+        folder = self._folder(unit, kind, size)
+        try:
+            return sorted(p for p in folder.iterdir() if p.suffix == ".json")  # mais antigos primeiro
+        except OSError:
+            return []
+
+    @staticmethod
+    def _meta(path: Path) -> Optional[Dict]:
+        try:
+            return puzzle_file.read(path).get("stock") or {}
+        except (OSError, ValueError):
+            return None
+
+    def _purge_stale(self, unit: str, signature: str) -> Set[str]:
+        """Remove itens de wordlists antigas; retorna as palavras reservadas pelos que ficam."""
+        held: Set[str] = set()
+        removed = 0
+        for kind, size in self.specs:
+            for path in self._items(unit, kind, size):
+                meta = self._meta(path)
+                if meta is None or meta.get("signature") != signature:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                    continue
+                held.update(meta.get("themed") or ())
+                held.update(meta.get("common") or ())
+        if removed:
+            print(f"♻️  Estoque {unit}: {removed} puzzle(s) descartado(s) (wordlist mudou).")
+        return held
+
+    def _store(self, unit: str, kind: str, size: Size, payload: Dict) -> Path:
+        folder = self._folder(unit, kind, size)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{time.time_ns()}-{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        puzzle_file.write(payload, tmp)
+        os.replace(tmp, path)
+        return path
+
+    # ---------- reposição ----------
+    def _generate(self, unit: str, kind: str, size: Size, held: Set[str]) -> Optional[Dict]:
+        """Um rascunho novo (sem histórico), sem repetir as palavras já no estoque."""
+        overrides = self.unit_overrides(unit)
+        if kind == "crossword":
+            got = self.app.gerar_crossword(altura=size[0], largura=size[-1], pool=self.pool,
+                                           registrar=False, exclude=held, **overrides)
+            if got is None:
+                return None
+            cw, bank = got
+            payload, words = cw.to_dict(bank), list(cw.placed_words)
+        else:
+            ws = self.app.gerar_wordsearch(size=size[0], registrar=False, exclude=held, **overrides)
+            if ws is None:
+                return None
+            common, themed = self.app.unit_wordlists(unit)
+            bank = self.app.load_wordbank(common, themed, max_len=size[0])
+            payload, words = ws.to_dict(), ws.source_words()
+        themed_words, common_words = bank.split_by_role(words)
+        payload["stock"] = {"unit": unit, "signature": self.signature(unit), "created": round(time.time(), 3),
+                            "themed": sorted(themed_words), "common": sorted(common_words)}
+        return payload
+
+    def refill(
+        self,
+        units: Optional[Sequence[str]] = None,
+        *,
+        should_stop: Optional[Callable[[], bool]] = None,
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        Completa o estoque (todas as unidades ou `units`) até per_size por tamanho.
+        `limit`: no máximo N puzzles nesta chamada; `should_stop()` é consultado antes de
+        cada puzzle (ex.: chegou pedido no servidor). Retorna quantos foram gerados.
+        """
+        if not self.enabled or self.per_size == 0:
+            return 0
+        made = 0
+        for unit in units or self.units():
+            if not self.app.unit_wordlists(unit)[1]:
+                continue  # unidade sem arquivo temático
+            signature = self.signature(unit)
+            held = self._purge_stale(unit, signature)
+            for kind, size in self.specs:
+                if time.monotonic() < self._failed.get((unit, kind, size), 0.0):
+                    continue
+                while len(self._items(unit, kind, size)) < self.per_size:
+                    if (limit is not None and made >= limit) or (should_stop and should_stop()):
+                        return made
+                    payload = self._generate(unit, kind, size, held)
+                    if payload is None:
+                        print(f"⚠️  Estoque {unit}: não foi possível gerar {kind} {_size_label(size)} "
+                              "(palavras livres insuficientes?).")
+                        self._failed[(unit, kind, size)] = time.monotonic() + RETRY_SECONDS
+                        break
+                    self._store(unit, kind, size, payload)
+                    held.update(payload["stock"]["themed"])
+                    held.update(payload["stock"]["common"])
+                    made += 1
+                    print(f"📦 Estoque {unit}: +1 {kind} {_size_label(size)}.")
+        return made
+
+    # ---------- retirada ----------
+    def claim(self, unit: str, kind: str, size: Sequence[int]) -> Optional["StockClaim"]:
+        """
+        Separa o puzzle mais antigo do estoque SEM tocar no histórico (ex.: o servidor só
+        confirma quando decide responder): claim.commit() reserva as palavras,
+        claim.release() devolve o item ao estoque. None se vazio.
+        """
+        spec = self.spec_for(kind, size)
+        if spec is None or not self.enabled:
+            return None
+        signature = self.signature(unit)
+        for path in self._items(unit, kind, spec[1]):
+            claimed = path.with_suffix(".taking")
+            try:
+                os.rename(path, claimed)  # só um processo consegue "pegar" cada item
+            except OSError:
+                continue
+            try:
+                data = puzzle_file.read(claimed)
+            except (OSError, ValueError):
+                claimed.unlink(missing_ok=True)
+                continue
+            meta = data.get("stock") or {}
+            if meta.get("signature") != signature:
+                claimed.unlink(missing_ok=True)
+                continue
+            if kind == "crossword":
+                from engligen.core.crossword import Crossword
+
+                puzzle = Crossword.from_dict(data)
+            else:
+                from engligen.core.wordsearch import WordSearch
+
+                puzzle = WordSearch.from_dict(data)
+            return StockClaim(self, unit, kind, spec[1], path, claimed, meta, puzzle)
+        return None
+
+    def take(self, unit: str, kind: str, size: Sequence[int]):
+        """
+        Tira o puzzle mais antigo do estoque e reserva suas palavras no histórico (atômico).
+        Retorna Crossword/WordSearch (a cruzada traz as dicas em .clues) ou None se vazio.
+        """
+        while True:
+            got = self.claim(unit, kind, size)
+            if got is None:
+                return None
+            if not got.commit():
+                return got.puzzle
+
+    def status(self) -> List[Dict[str, Any]]:
+        """[{unit, type, size, ready, target}] de todas as unidades e tamanhos do estoque."""
+        rows = []
+        for unit in self.units():
+            for kind, size in self.specs:
+                rows.append({"unit": unit, "type": kind, "size": _size_label(size),
+                             "ready": len(self._items(unit, kind, size)), "target": self.per_size})
+        return rows
+
+
+class StockClaim:
+    """Item separado do estoque (arquivo .taking): confirmar (commit) ou devolver (release)."""
+
+    def __init__(self, stock: PuzzleStock, unit: str, kind: str, size: Size, path: Path, claimed: Path,
+                 meta: Dict, puzzle) -> None:
+        self.stock = stock
+        self.unit = unit
+        self.kind = kind
+        self.size = size
+        self.path = path
+        self.claimed = claimed
+        self.meta = meta
+        self.puzzle = puzzle
+
+    def commit(self) -> Set[str]:
+        """
+        Reserva as palavras no histórico (atômico) e tira o item do estoque de vez.
+        Retorna as que já tinham sido usadas desde a geração (item descartado).
+        """
+        meta = self.meta
+        conflicts = self.stock.app.reservar_uso(meta.get("themed") or (), meta.get("common") or ())
+        self.claimed.unlink(missing_ok=True)
+        if conflicts:
+            print(f"⚠️  Estoque {self.unit}: puzzle descartado, {len(conflicts)} palavra(s) já usada(s) "
+                  "desde que foi gerado.")
+        else:
+            print(f"⚡ Puzzle do estoque ({self.unit}, {self.kind} {_size_label(self.size)}).")
+        return conflicts
+
+    def release(self) -> None:
+        """Devolve o item ao estoque, no mesmo lugar da fila (nada foi gravado no histórico)."""
+        try:
+            os.rename(self.claimed, self.path)
+        except OSError:
+            self.claimed.unlink(missing_ok=True)
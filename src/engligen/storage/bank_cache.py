@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Formato binário (.bank) — uma leitura só:
+#   header  : MAGIC, versão, byteorder, mtime_ns, size, n_validos, n_total
+#   lengths : n × uint16   (tamanho de cada palavra)
+#   masks   : n × uint32   (bit i = letra chr(65+i) presente na palavra)
+#   words   : uint32 + blob utf-8 (palavras separadas por \x00)
+#   clues   : uint32 + blob utf-8 (dicas separadas por \x00)
+MAGIC = b"EGWB"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHqqII")
+_BLOB_LEN = struct.Struct("<I")
+_SEP = "\x00"
+_LITTLE = 0 if sys.byteorder == "little" else 1
+
+# bancos aceitos: array JSON ([{...}, ...]) ou JSON Lines (um {"word","clue"} por linha)
+BANK_SUFFIXES = (".json", ".jsonl", ".ndjson")
+_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def letter_mask(word: str) -> int:
+    """Máscara de 26 bits com as letras A–Z presentes em `word`."""
+    m = 0
+    for ch in word:
+        o = ord(ch) - 65
+        if 0 <= o < 26:
+            m |= 1 << o
+    return m
+
+
+def iter_normalized(items: Iterable) -> Iterator[Tuple[str, str]]:
+    """Saneamento mínimo, item a item: (word strip+upper, clue); ignora itens inválidos."""
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        w = it.get("word")
+        w = w.strip().upper() if isinstance(w, str) else ""
+        if w:
+            c = it.get("clue")
+            yield (w, c if isinstance(c, str) else "")
+
+
+def _iter_json_lines(f: IO[str]) -> Iterator:
+    """Um objeto por linha; linha inválida vira None (conta no total, cai na normalização)."""
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def read_bank_items(path: Path) -> Optional[Iterator]:
+    """
+    Itens crus do banco `path`. JSON Lines (extensão .jsonl/.ndjson ou primeiro
+    caractere '{') é lido em fluxo, linha a linha — o arquivo nunca fica inteiro na
+    memória; um array JSON é lido com json.load. None se não abrir ou não for válido.
+    """
+    path = Path(path)
+    try:
+        f = open(path, "r", encoding="utf-8-sig")
+    except OSError:
+        return None
+    try:
+        first = ""
+        while not first:
+            chunk = f.read(64)
+            if not chunk:
+                break
+            first = chunk.lstrip()[:1]
+        f.seek(0)
+        if path.suffix.lower() in _LINES_SUFFIXES or first == "{":
+            return _iter_json_lines(f)
+        data = json.load(f)
+    except (OSError, ValueError):
+        f.close()
+        return None
+    f.close()
+    return iter(data) if isinstance(data, list) else None
+
+
+class CompiledBank:
+    """Banco de palavras já normalizado (carregado do cache ou recém-compilado)."""
+
+    __slots__ = ("words", "clues", "lengths", "masks", "total")
+
+    def __init__(self, words: List[str], clues: List[str], lengths: array, masks: array, total: int) -> None:
+        self.words = words
+        self.clues = clues
+        self.lengths = lengths
+        self.masks = masks
+        self.total = total
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def items(self) -> List[Dict]:
+        """Mesmo formato de EngligenApp._load_words_file: [{'word','clue'}, ...]."""
+        return list(self.iter_items())
+
+    def iter_items(self, max_len: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Itens {'word','clue'} sob demanda; com `max_len`, só as palavras que cabem
+        (o filtro usa o array de tamanhos, sem tocar nas strings descartadas).
+        """
+        words, clues = self.words, self.clues
+        if max_len is None:
+            for w, c in zip(words, clues):
+                yield {"word": w, "clue": c}
+            return
+        for i, L in enumerate(self.lengths):
+            if L <= max_len:
+                yield {"word": words[i], "clue": clues[i]}
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, str]], total: int = 0) -> "CompiledBank":
+        """Compila em uma passada (aceita gerador): nada além das colunas fica na memória."""
+        words: List[str] = []
+        clues: List[str] = []
+        lengths = array("H")
+        masks = array("I")
+        for w, c in pairs:
+            words.append(w)
+            clues.append(c)
+            lengths.append(min(len(w), 0xFFFF))
+            masks.append(letter_mask(w))
+        return cls(words, clues, lengths, masks, total)
+
+    # ---------- serialização ----------
+    def to_bytes(self, mtime_ns: int, size: int) -> bytes:
+        wb = _SEP.join(self.words).encode("utf-8")
+        cb = _SEP.join(self.clues).encode("utf-8")
+        return b"".join([
+            _HEADER.pack(MAGIC, VERSION, _LITTLE, mtime_ns, size, len(self.words), self.total),
+            self.lengths.tobytes(),
+            self.masks.tobytes(),
+            _BLOB_LEN.pack(len(wb)), wb,
+            _BLOB_LEN.pack(len(cb)), cb,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["CompiledBank", int, int]:
+        """Retorna (banco, mtime_ns, size) da origem. Levanta ValueError se inválido."""
+        mv = memoryview(data)
+        magic, version, order, mtime_ns, size, n, total = _HEADER.unpack_from(mv, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("cache de banco incompatível")
+        pos = _HEADER.size
+
+        lengths = array("H")
+        lengths.frombytes(mv[pos:pos + 2 * n])
+        pos += 2 * n
+        masks = array("I")
+        masks.frombytes(mv[pos:pos + 4 * n])
+        pos += 4 * n
+        if order != _LITTLE:
+            lengths.byteswap()
+            masks.byteswap()
+
+        blobs: List[List[str]] = []
+        for _ in range(2):
+            (ln,) = _BLOB_LEN.unpack_from(mv, pos)
+            pos += _BLOB_LEN.size
+            txt = bytes(mv[pos:pos + ln]).decode("utf-8")
+            pos += ln
+            blobs.append(txt.split(_SEP) if n else [])
+        words, clues = blobs
+        if len(words) != n or len(clues) != n or len(lengths) != n:
+            raise ValueError("cache de banco truncado")
+        return cls(words, clues, lengths, masks, total), mtime_ns, size
+
+
+# -------------------- cache em disco --------------------
+def cache_path_for(path: Path, cache_dir: Path) -> Path:
+    key = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{Path(path).stem}.{key}.bank"
+
+
+def _source_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_cached(path: Path, cache_dir: Path) -> Optional[CompiledBank]:
+    stamp = _source_stamp(path)
+    if stamp is None:
+        return None
+    try:
+        with open(cache_path_for(path, cache_dir), "rb") as f:
+            data = f.read()
+        bank, mtime_ns, size = CompiledBank.from_bytes(data)
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+    if (mtime_ns, size) != stamp:
+        return None
+    return bank
+
+
+def _write_cached(path: Path, cache_dir: Path, bank: CompiledBank, stamp: Tuple[int, int]) -> None:
+    target = cache_path_for(path, cache_dir)
+    tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(bank.to_bytes(*stamp))
+        os.replace(tmp, target)
+    except OSError:
+        # cache é só otimização: sem permissão de escrita, segue sem ele
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _tally(items: Iterable, counter: List[int]) -> Iterator:
+    for it in items:
+        counter[0] += 1
+        yield it
+
+
+def load_bank(
+    path: Path,
+    cache_dir: Path,
+    parse: Callable[[Path], Optional[Iterable]] = read_bank_items,
+) -> Optional[CompiledBank]:
+    """
+    Carrega o banco `path` do cache compilado (chave: caminho + mtime + tamanho).
+    Se o cache não existir ou estiver velho, usa `parse` para ler o JSON/JSON Lines
+    e compila em fluxo (leitura -> normalização -> colunas), grava o .bank e
+    retorna. None se o arquivo for inválido.
+    """
+    bank = _read_cached(path, cache_dir)
+    if bank is not None:
+        return bank
+
+    stamp = _source_stamp(path)
+    raw = parse(path)
+    if raw is None:
+        return None
+    total = [0]
+    try:
+        bank = CompiledBank.from_pairs(iter_normalized(_tally(raw, total)))
+    except (OSError, ValueError):  # ex.: bytes inválidos no meio de um .jsonl
+        return None
+    bank.total = total[0]
+    if stamp is not None:
+        _write_cached(path, cache_dir, bank, stamp)
+    return bank
+
+
+def peek_counts(path: Path, cache_dir: Path) -> Optional[Tuple[int, int]]:
+    """
+    (válidos, total) lendo só o header do cache. None se o cache estiver
+    ausente/velho — nesse caso use load_bank para compilá-lo.
+    """
+    stamp = _source_stamp(path)
+    if stamp is None:
+        return None
+    try:
+        with open(cache_path_for(path, cache_dir), "rb") as f:
+            head = f.read(_HEADER.size)
+        magic, version, _order, mtime_ns, size, n, total = _HEADER.unpack(head)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION or (mtime_ns, size) != stamp:
+        return None
+    return (n, total)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from engligen.storage.locking import file_lock
+
+
+class UsageHistory:
+    """
+    Histórico de uso append-only para um arquivo used_*.json.
+
+      - snapshot : o próprio used_*.json (lista ordenada, formato legado — continua legível)
+      - diário   : used_*.jsonl ao lado, um evento JSON por linha:
+                     {"op": "add", "words": [...], "ts": ...}
+                     {"op": "reset", "ts": ...}
+
+    Cada puzzle acrescenta UMA linha (O(palavras do puzzle), não O(histórico)).
+    A cada `compact_every` eventos o estado é consolidado no snapshot via arquivo
+    temporário + os.replace (atômico) e o diário é zerado. Uma queda no meio da
+    compactação é inofensiva: reaplicar o diário sobre o snapshot novo é idempotente.
+
+    O estado carregado fica em memória; `load()` relê só o trecho novo do diário
+    quando o snapshot não mudou.
+
+    Concorrência: leitura, append e compactação acontecem sob um lock consultivo
+    (used_*.lock), então vários processos `engligen` podem compartilhar o mesmo
+    histórico — cada `add` é um read-modify-write que mescla com o que os outros
+    já gravaram, sem perder usos.
+    """
+
+    def __init__(self, snapshot_path: Path, *, compact_every: int = 256, lock_timeout: float = 60.0) -> None:
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".jsonl")
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.compact_every = max(1, int(compact_every))
+        self.lock_timeout = float(lock_timeout)
+
+        self._state: Set[str] = set()
+        self._snap_stamp: Optional[Tuple[int, int]] = None
+        self._journal_pos = 0
+        self._journal_events = 0
+        self._loaded = False
+
+    # -------------------- leitura --------------------
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read_snapshot(self) -> Set[str]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                arr = json.load(f)
+            if isinstance(arr, list):
+                return set((w or "").upper() for w in arr if isinstance(w, str))
+        except Exception:
+            pass
+        return set()
+
+    def _read_events(self, start: int) -> Tuple[List[Tuple[str, List[str]]], int]:
+        """Eventos válidos do diário a partir do byte `start` e a posição final consumida."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(start)
+                chunk = f.read()
+        except OSError:
+            return ([], start)
+        # só consome linhas completas; uma linha parcial (queda no meio do append) fica para depois
+        end = chunk.rfind(b"\n") + 1
+        events: List[Tuple[str, List[str]]] = []
+        for raw in chunk[:end].splitlines():
+            try:
+                ev = json.loads(raw)
+            except ValueError:
+                continue
+            op = ev.get("op") if isinstance(ev, dict) else None
+            if op == "add":
+                events.append((op, [(w or "").upper() for w in ev.get("words") or [] if isinstance(w, str)]))
+            elif op == "reset":
+                events.append((op, []))
+        return (events, start + end)
+
+    def _replay(self, start: int) -> None:
+        """Aplica os eventos do diário a partir do byte `start`."""
+        events, self._journal_pos = self._read_events(start)
+        for op, words in events:
+            if op == "add":
+                self._state.update(words)
+            else:
+                self._state.clear()
+        self._journal_events += len(events)
+
+    def _load(self) -> Set[str]:
+        snap = self._stamp(self.snapshot_path)
+        journal = self._stamp(self.journal_path)
+        journal_size = journal[1] if journal else 0
+
+        if not self._loaded or snap != self._snap_stamp or journal_size < self._journal_pos:
+            # snapshot mudou (ou diário foi compactado por outro processo): recarrega tudo
+            self._state = self._read_snapshot() if snap else set()
+            self._snap_stamp = snap
+            self._journal_pos = 0
+            self._journal_events = 0
+            self._loaded = True
+        if journal_size > self._journal_pos:
+            self._replay(self._journal_pos)
+        return self._state
+
+    def load(self) -> Set[str]:
+        """Estado atual (snapshot + diário). Retorna uma cópia."""
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            return set(self._load())
+
+    def tail(
+        self, snap_stamp: Optional[Tuple[int, int]], start: int
+    ) -> Optional[Tuple[List[Tuple[str, List[str]]], int]]:
+        """
+        Eventos gravados depois da posição (`snap_stamp`, `start`), para quem mantém
+        uma cópia derivada do estado (ex.: bitmaps). None se houve compactação desde
+        então — nesse caso é preciso recarregar tudo com load().
+        """
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            if self._stamp(self.snapshot_path) != snap_stamp:
+                return None
+            journal = self._stamp(self.journal_path)
+            if (journal[1] if journal else 0) < start:
+                return None
+            return self._read_events(start)
+
+    def load_with_position(self) -> Tuple[Set[str], Optional[Tuple[int, int]], int]:
+        """Estado atual + a posição (snapshot, diário) a que ele corresponde."""
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            state = set(self._load())
+            return (state, self._snap_stamp, self._journal_pos)
+
+    # -------------------- escrita --------------------
+    def _append(self, event: dict) -> None:
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "a+b") as f:
+            # linha parcial de uma queda anterior: isola antes de acrescentar
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, words: Iterable[str]) -> Set[str]:
+        """
+        Registra novos usos (uma linha no diário) sob o lock: relê o estado atual,
+        acrescenta e devolve as palavras que JÁ constavam — por exemplo, usadas por
+        outra execução em paralelo depois que esta carregou o histórico.
+        """
+        ws = {(w or "").upper() for w in words if w}
+        if not ws:
+            return set()
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            conflicts = ws & self._load()
+            self._add_locked(ws)
+        return conflicts
+
+    def _add_locked(self, ws: Set[str]) -> None:
+        self._append({"op": "add", "words": sorted(ws), "ts": round(time.time(), 3)})
+        self._load()
+        if self._journal_events >= self.compact_every:
+            self._compact()
+
+    def reset(self, words: Iterable[str] = ()) -> None:
+        """Zera o histórico (e opcionalmente já registra `words`) numa única seção crítica."""
+        ws = sorted({(w or "").upper() for w in words if w})
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            self._load()
+            self._append({"op": "reset", "ts": round(time.time(), 3)})
+            if ws:
+                self._append({"op": "add", "words": ws, "ts": round(time.time(), 3)})
+            self._load()
+
+    def compact(self) -> None:
+        """Consolida snapshot + diário num novo snapshot (os.replace) e zera o diário."""
+        with file_lock(self.lock_path, timeout=self.lock_timeout):
+            self._compact()
+
+    def _compact(self) -> None:
+        state = self._load()
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sorted(state), f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # diário zerado DEPOIS do snapshot: se cair entre os dois, o replay é idempotente
+        with open(self.journal_path, "wb"):
+            pass
+        self._loaded = False
+        self._load()
+
+
+def reserve_all(claims: Sequence[Tuple[UsageHistory, Iterable[str]]]) -> Set[str]:
+    """
+    Reserva atômica em um ou mais históricos: com os locks de todos (em ordem fixa, sem
+    deadlock entre processos), registra as palavras de cada um SÓ se nenhuma já constar.
+    Retorna as que já constavam — vazio = reservado; senão nada foi gravado.
+    """
+    merged = {}
+    for history, words in claims:
+        ws = {(w or "").upper() for w in words if w}
+        entry = merged.setdefault(str(history.lock_path), (history, set()))
+        entry[1].update(ws)
+    ordered = [merged[k] for k in sorted(merged)]
+    with ExitStack() as stack:
+        for history, _ws in ordered:
+            stack.enter_context(file_lock(history.lock_path, timeout=history.lock_timeout))
+        conflicts: Set[str] = set()
+        for history, ws in ordered:
+            conflicts |= ws & history._load()
+        if conflicts:
+            return conflicts
+        for history, ws in ordered:
+            if ws:
+                history._add_locked(ws)
+    return set()
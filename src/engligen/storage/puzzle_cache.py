@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Cache endereçado por conteúdo dos puzzles gerados (data/.cache/puzzles):
+#   <chave>/puzzle.json           arquivo de puzzle (engligen.core.puzzle_file)
+#   <chave>/<chave_render>/...    saídas renderizadas ({sufixo: bytes}) + index.json
+# A chave é o hash das ENTRADAS da geração (banco, papéis, snapshot do histórico,
+# seed, tamanho, densidade...): entradas idênticas => puzzle idêntico, sem regenerar.
+# Limite de tamanho em disco com descarte LRU (mtime da pasta = último uso).
+CACHE_VERSION = 3
+
+_PUZZLE = "puzzle.json"
+_INDEX = "index.json"
+
+
+def cache_key(**parts: Any) -> str:
+    """sha256 do JSON canônico de `parts` (+ versão do cache)."""
+    raw = json.dumps({"v": CACHE_VERSION, **parts}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def digest_bits(bits: int) -> str:
+    """Hash curto de um bitmap (histórico / máscara de papéis) para compor chaves."""
+    return hashlib.sha1(bits.to_bytes(max(1, (bits.bit_length() + 7) // 8), "little")).hexdigest()
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PuzzleCache:
+    """Cache em disco de puzzles e renderizações, com limite de bytes e descarte LRU."""
+
+    def __init__(self, root: Path, *, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    def _touch(self, entry: Path) -> None:
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    # ---------- puzzles ----------
+    def get(self, key: str):
+        """Crossword/WordSearch guardado sob `key`, ou None."""
+        from engligen.core.puzzle_file import load_puzzle
+
+        entry = self.root / key
+        try:
+            puzzle = load_puzzle(entry / _PUZZLE)
+        except (OSError, ValueError, KeyError):
+            return None
+        self._touch(entry)
+        return puzzle
+
+    def put(self, key: str, puzzle) -> None:
+        from engligen.core.puzzle_file import dumps
+
+        entry = self.root / key
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            _write_atomic(entry / _PUZZLE, dumps(puzzle.to_dict()))
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar no cache de puzzles: {e}")
+            return
+        self._evict()
+
+    # ---------- saídas renderizadas ----------
+    def get_outputs(self, key: str, render_key: str) -> Optional[Dict[str, bytes]]:
+        folder = self.root / key / render_key
+        try:
+            with open(folder / _INDEX, "r", encoding="utf-8") as f:
+                suffixes: List[str] = json.load(f)
+            outputs = {}
+            for suffix in suffixes:
+                with open(folder / suffix, "rb") as f:
+                    outputs[suffix] = f.read()
+        except (OSError, ValueError):
+            return None
+        self._touch(self.root / key)
+        return outputs
+
+    def put_outputs(self, key: str, render_key: str, outputs: Dict[str, bytes]) -> None:
+        entry = self.root / key
+        if not (entry / _PUZZLE).exists():
+            return  # renderização sem o puzzle correspondente não tem utilidade
+        folder = entry / render_key
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            for suffix, data in outputs.items():
+                _write_atomic(folder / suffix, data)
+            # o índice por último: sem ele a entrada não é considerada completa
+            _write_atomic(folder / _INDEX, json.dumps(list(outputs)).encode("utf-8"))
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar no cache de puzzles: {e}")
+            return
+        self._touch(entry)
+        self._evict()
+
+    # ---------- LRU ----------
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas até caber em max_bytes."""
+        with self._lock:
+            entries: List[Tuple[float, int, Path]] = []
+            try:
+                for it in os.scandir(self.root):
+                    if it.is_dir():
+                        entries.append((it.stat().st_mtime, _dir_size(Path(it.path)), Path(it.path)))
+            except OSError:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _mtime, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
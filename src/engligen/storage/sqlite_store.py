@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from engligen.core.wordbank import COMMON, THEMED, WordBank
+from engligen.storage.bank_cache import BANK_SUFFIXES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    slug TEXT PRIMARY KEY,
+    ord  INTEGER NOT NULL,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS words (
+    id       INTEGER PRIMARY KEY,
+    word     TEXT NOT NULL,
+    clue     TEXT NOT NULL DEFAULT '',
+    length   INTEGER NOT NULL,
+    role     TEXT NOT NULL,
+    unit     TEXT,
+    unit_ord INTEGER,
+    UNIQUE (word, role, unit)
+);
+CREATE INDEX IF NOT EXISTS words_role_len_unit ON words (role, length, unit_ord);
+CREATE INDEX IF NOT EXISTS words_role_unit ON words (role, unit_ord);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage (
+    kind TEXT NOT NULL,
+    word TEXT NOT NULL,
+    ts   REAL NOT NULL,
+    PRIMARY KEY (kind, word)
+) WITHOUT ROWID;
+"""
+# UNIQUE (word, role, unit) não vale para o coringa: no SQLite, NULLs são todos distintos
+_COMMON_UNIQUE = "CREATE UNIQUE INDEX IF NOT EXISTS words_common_unique ON words (word, role) WHERE unit IS NULL"
+
+
+class SQLiteWordStore:
+    """
+    Backend opcional (config: "storage": {"backend": "sqlite", "path": "data/engligen.db"})
+    para bancos grandes: palavras, unidades e histórico de uso num único arquivo SQLite.
+
+      - words  : uma linha por (palavra, papel, unidade), indexada por papel/tamanho/ordem da unidade
+      - usage  : histórico por tipo ("themed" | "common"), atualizado em transação
+      - units  : ordem das unidades do curso (para "unidades ≤ ativa")
+      - meta   : words_version, trocado a cada importação (chave do cache de bancos da app)
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # timeout: espera o lock de escrita de outros processos em vez de falhar
+        # (a app serializa o acesso; check_same_thread=False permite jobs em threads)
+        self.conn = sqlite3.connect(str(self.path), timeout=60.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'words_common_unique'").fetchone():
+            with self.conn:
+                # bancos criados antes do índice podem ter coringas repetidos: fica a 1ª linha
+                self.conn.execute(
+                    "DELETE FROM words WHERE unit IS NULL AND id NOT IN "
+                    "(SELECT MIN(id) FROM words WHERE unit IS NULL GROUP BY word, role)"
+                )
+                self.conn.execute(_COMMON_UNIQUE)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -------------------- unidades --------------------
+    def unit_ord(self, slug: Optional[str]) -> Optional[int]:
+        if not slug:
+            return None
+        row = self.conn.execute("SELECT ord FROM units WHERE slug = ?", (slug,)).fetchone()
+        return int(row[0]) if row else None
+
+    def has_words(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM words LIMIT 1").fetchone() is not None
+
+    # -------------------- consultas --------------------
+    def _scope(self, max_unit_ord: Optional[int], only_unit_ord: Optional[int]) -> Tuple[str, List]:
+        if only_unit_ord is not None:
+            return ("unit_ord = ?", [only_unit_ord])
+        if max_unit_ord is not None:
+            return ("unit_ord <= ?", [max_unit_ord])
+        return ("1", [])
+
+    def unused_words(
+        self,
+        role: str,
+        *,
+        length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        max_unit_ord: Optional[int] = None,
+        only_unit_ord: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Palavras de `role` ainda não usadas, de tamanho L (ou até `max_length`) e, se
+        temáticas, das unidades do escopo — uma consulta pelo índice words_role_len_unit,
+        com o histórico checado pela chave de usage (sem ler a tabela de uso inteira).
+        """
+        where, args = self._scope(max_unit_ord, only_unit_ord) if role == THEMED else ("1", [])
+        len_sql, len_args = "", []
+        if length is not None:
+            len_sql, len_args = " AND w.length = ?", [int(length)]
+        elif max_length is not None:
+            len_sql, len_args = " AND w.length <= ?", [int(max_length)]
+        sql = (
+            "SELECT w.word FROM words w WHERE w.role = ?" + len_sql + " AND " + where +
+            " AND NOT EXISTS (SELECT 1 FROM usage u WHERE u.kind = ? AND u.word = w.word)"
+        )
+        return [w for (w,) in self.conn.execute(sql, [role, *len_args, *args, role])]
+
+    def words_version(self) -> Optional[str]:
+        """Marca da última importação (muda a cada import_banks); None em bancos antigos."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'words_version'").fetchone()
+        return row[0] if row else None
+
+    def load_wordbank(
+        self,
+        *,
+        max_unit_ord: Optional[int] = None,
+        only_unit_ord: Optional[int] = None,
+        max_length: Optional[int] = None,
+        include_common: bool = True,
+    ) -> WordBank:
+        """WordBank com os temáticos do escopo (unidades) + todo o coringa (até `max_length` letras)."""
+        bank = WordBank()
+        where, args = self._scope(max_unit_ord, only_unit_ord)
+        len_sql, len_args = ("", []) if max_length is None else (" AND length <= ?", [int(max_length)])
+        for w, c, unit in self.conn.execute(
+            "SELECT word, clue, unit FROM words WHERE role = ? AND " + where + len_sql + " ORDER BY unit_ord, id",
+            [THEMED, *args, *len_args],
+        ):
+            bank.add(w, c, role=THEMED, source=unit or "")
+        if not include_common:
+            return bank
+        for w, c in self.conn.execute(
+            "SELECT word, clue FROM words WHERE role = ?" + len_sql + " ORDER BY id", [COMMON, *len_args]
+        ):
+            bank.add(w, c, role=COMMON, source=COMMON)
+        return bank
+
+    # -------------------- histórico --------------------
+    def load_used(self, kind: str) -> Set[str]:
+        return {w for (w,) in self.conn.execute("SELECT word FROM usage WHERE kind = ?", (kind,))}
+
+    def mark_used(self, kind: str, words: Iterable[str]) -> Set[str]:
+        """
+        Acrescenta usos (idempotente) numa única transação IMMEDIATE e devolve as
+        palavras que já constavam (ex.: usadas por outro processo em paralelo).
+        """
+        ws = sorted(set(words))
+        now = time.time()
+        conflicts: Set[str] = set()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for w in ws:
+                if self.conn.execute("SELECT 1 FROM usage WHERE kind = ? AND word = ?", (kind, w)).fetchone():
+                    conflicts.add(w)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO usage (kind, word, ts) VALUES (?, ?, ?)",
+                ((kind, w, now) for w in ws),
+            )
+        return conflicts
+
+    def reserve_used(self, claims: Dict[str, Iterable[str]]) -> Set[str]:
+        """
+        Reserva atômica ({kind: palavras}): numa única transação IMMEDIATE, registra tudo
+        só se nenhuma palavra já constar. Retorna as que já constavam (vazio = reservado).
+        """
+        now = time.time()
+        conflicts: Set[str] = set()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for kind, words in claims.items():
+                for w in set(words):
+                    if self.conn.execute("SELECT 1 FROM usage WHERE kind = ? AND word = ?", (kind, w)).fetchone():
+                        conflicts.add(w)
+            if not conflicts:
+                for kind, words in claims.items():
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO usage (kind, word, ts) VALUES (?, ?, ?)",
+                        ((kind, w, now) for w in sorted(set(words))),
+                    )
+        return conflicts
+
+    def replace_used(self, kind: str, used: Set[str]) -> None:
+        """Faz o histórico de `kind` ficar igual a `used` (diff aplicado numa transação)."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS _used_new (word TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM _used_new")
+            self.conn.executemany("INSERT OR IGNORE INTO _used_new (word) VALUES (?)", ((w,) for w in used))
+            self.conn.execute(
+                "DELETE FROM usage WHERE kind = ? AND word NOT IN (SELECT word FROM _used_new)", (kind,)
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO usage (kind, word, ts) SELECT ?, word, ? FROM _used_new", (kind, now)
+            )
+
+    # -------------------- importação --------------------
+    def import_banks(
+        self,
+        *,
+        units: Sequence[Tuple[str, str, List[Dict]]],
+        common: Optional[List[Dict]] = None,
+        used: Optional[Dict[str, Set[str]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Importação única (substitui o conteúdo atual):
+          units  : [(slug, nome, itens [{'word','clue'}]), ...] na ordem do curso
+          common : itens do banco coringa
+          used   : {"themed": set(...), "common": set(...)} (históricos legados)
+        """
+        counts = {"units": 0, THEMED: 0, COMMON: 0, "usage": 0}
+        now = time.time()
+        with self.conn:
+            self.conn.execute("DELETE FROM words")
+            self.conn.execute("DELETE FROM units")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('words_version', ?)", (str(time.time_ns()),)
+            )
+            for ordv, (slug, name, items) in enumerate(units):
+                self.conn.execute("INSERT INTO units (slug, ord, name) VALUES (?, ?, ?)", (slug, ordv, name))
+                counts["units"] += 1
+                cur = self.conn.executemany(
+                    "INSERT OR IGNORE INTO words (word, clue, length, role, unit, unit_ord) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((it["word"], it.get("clue") or "", len(it["word"]), THEMED, slug, ordv) for it in items),
+                )
+                counts[THEMED] += max(0, cur.rowcount)
+            if common:
+                cur = self.conn.executemany(
+                    "INSERT OR IGNORE INTO words (word, clue, length, role, unit, unit_ord) VALUES (?, ?, ?, ?, NULL, NULL)",
+                    ((it["word"], it.get("clue") or "", len(it["word"]), COMMON) for it in common),
+                )
+                counts[COMMON] += max(0, cur.rowcount)
+            for kind, words in (used or {}).items():
+                cur = self.conn.executemany(
+                    "INSERT OR IGNORE INTO usage (kind, word, ts) VALUES (?, ?, ?)",
+                    ((kind, w, now) for w in words),
+                )
+                counts["usage"] += max(0, cur.rowcount)
+        return counts
+
+
+def import_from_json_layout(app, db_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Importa o layout atual (data/wordlists/*.json|*.jsonl + config.json + used_*.json) para o SQLite.
+    Unidades do config entram na ordem do curso; demais .json temáticos viram unidades
+    extras (slug = nome do arquivo) depois delas.
+    """
+    cfg = app.config or {}
+    units_cfg = [u for u in ((cfg.get("course") or {}).get("units") or []) if isinstance(u, dict)]
+
+    common_path = app._resolve_file(cfg.get("common_words_file")) if cfg.get("common_words_file") else None
+    seen: Set[Path] = set()
+    units: List[Tuple[str, str, List[Dict]]] = []
+    for u in units_cfg:
+        p = app._resolve_file(u.get("themed_words_file"))
+        if p is None or not u.get("slug"):
+            continue
+        seen.add(p.resolve())
+        units.append((str(u["slug"]), str(u.get("name") or u["slug"]), app._load_words_file(p) or []))
+
+    wordlists = sorted(app.wordlists_dir.iterdir()) if app.wordlists_dir.is_dir() else []
+    for p in (q for q in wordlists if q.suffix.lower() in BANK_SUFFIXES):
+        if p.name.startswith(("used_", "config")) or p.resolve() in seen:
+            continue
+        n = p.name.lower()
+        if common_path is None and ("general" in n or "common" in n or "coringa" in n):
+            common_path = p
+            continue
+        if common_path is not None and p.resolve() == common_path.resolve():
+            continue
+        units.append((p.stem, p.stem, app._load_words_file(p) or []))
+
+    common = app._load_words_file(common_path) if common_path else None
+    used = {
+        THEMED: app._history(app.used_thematic_path).load(),
+        COMMON: app._history(app.used_common_path).load(),
+    }
+    store = SQLiteWordStore(db_path or app.sqlite_path)
+    try:
+        return store.import_banks(units=units, common=common, used=used)
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """python -m engligen.storage.sqlite_store [caminho.db] — importação única."""
+    from engligen.app import EngligenApp
+
+    args = sys.argv[1:] if argv is None else argv
+    app = EngligenApp()
+    db = app._as_path(args[0]) if args else None
+    counts = import_from_json_layout(app, db)
+    print(f"✔️  SQLite: {db or app.sqlite_path}")
+    print(f"   unidades: {counts['units']} | temáticas: {counts[THEMED]} | coringa: {counts[COMMON]} | usos: {counts['usage']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from engligen.core.wordbank import WordBank
+from engligen.core.wordtrie import WordTrie
+
+# Arquivo .trie (data/.cache/): WordTrie de um WordBank, gravado com WordTrie.to_bytes.
+# O nome leva o fingerprint do banco (sequência de palavras): editou a wordlist, o
+# fingerprint muda e o trie é remontado na próxima geração. Vários bancos convivem
+# (unidades, tamanhos de grade), então ao gravar um novo só os MAX_TRIES usados mais
+# recentemente ficam (mtime = último uso); os de wordlists antigas saem sozinhos.
+MAX_TRIES = 8
+
+
+def trie_path_for(bank: WordBank, cache_dir: Path) -> Path:
+    return cache_dir / f"bank.{bank.fingerprint()[:16]}.trie"
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune(cache_dir: Path, keep: Path) -> None:
+    """Apaga os .trie além dos MAX_TRIES mais recentes (nunca `keep`)."""
+    try:
+        entries = [(p.stat().st_mtime_ns, p) for p in cache_dir.glob("bank.*.trie") if p != keep]
+    except OSError:
+        return
+    for _mtime, p in sorted(entries, reverse=True)[MAX_TRIES - 1:]:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def load_trie(bank: WordBank, cache_dir: Path) -> WordTrie:
+    """
+    Trie de `bank`: da memória (se o banco já tiver um), do .trie em disco ou montado
+    agora (e gravado para as próximas sessões). Fica associado ao banco (bank.trie()).
+    """
+    if bank.has_trie():
+        return bank.trie()
+    path = trie_path_for(bank, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            bank.use_trie(WordTrie.from_bytes(f.read()))
+        _touch(path)
+        return bank.trie()
+    except (OSError, ValueError):
+        pass
+
+    trie = bank.trie()
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(trie.to_bytes())
+        os.replace(tmp, path)
+        _prune(cache_dir, path)
+    except OSError:
+        # é só cache: sem escrita, o trie é remontado na próxima sessão
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    return trie
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+from engligen.core.wordbank import WordBank
+from engligen.storage.history import UsageHistory
+
+# Arquivo .bits (data/.cache/): bitmap de uso alinhado ao índice de um WordBank
+#   header : MAGIC, versão, fingerprint do banco (sha1), stamp do snapshot
+#            (mtime_ns, size; -1 = inexistente), posição no diário, nº de bytes
+#   corpo  : bitmap little-endian (bit i = palavra i do banco)
+# Nome: <histórico>.<hash do caminho>.<fingerprint do banco>.bits. Um histórico serve a
+# vários bancos (unidades, tamanhos de grade); ao gravar, só os MAX_BITS_PER_HISTORY
+# usados mais recentemente (mtime) daquele histórico ficam.
+MAGIC = b"EGUB"
+VERSION = 1
+MAX_BITS_PER_HISTORY = 8
+_HEADER = struct.Struct("<4sH20sqqqI")
+
+
+def _history_prefix(history: UsageHistory) -> str:
+    key = hashlib.sha1(str(history.snapshot_path.resolve()).encode("utf-8")).hexdigest()[:10]
+    return f"{history.snapshot_path.stem}.{key}"
+
+
+def bits_path_for(history: UsageHistory, bank: WordBank, cache_dir: Path) -> Path:
+    return cache_dir / f"{_history_prefix(history)}.{bank.fingerprint()[:12]}.bits"
+
+
+def _prune(path: Path, prefix: str) -> None:
+    """Apaga os .bits do mesmo histórico além dos MAX_BITS_PER_HISTORY mais recentes."""
+    try:
+        entries = [(p.stat().st_mtime_ns, p) for p in path.parent.glob(f"{prefix}.*.bits") if p != path]
+    except OSError:
+        return
+    for _mtime, p in sorted(entries, reverse=True)[MAX_BITS_PER_HISTORY - 1:]:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def _read(path: Path, fp: bytes) -> Optional[Tuple[int, Optional[Tuple[int, int]], int]]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, bank_fp, mtime_ns, size, pos, nbytes = _HEADER.unpack_from(data, 0)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION or bank_fp != fp or len(data) != _HEADER.size + nbytes:
+        return None
+    bits = int.from_bytes(data[_HEADER.size:], "little")
+    stamp = None if mtime_ns < 0 else (mtime_ns, size)
+    return (bits, stamp, pos)
+
+
+def _write(
+    path: Path, prefix: str, fp: bytes, bits: int, stamp: Optional[Tuple[int, int]], pos: int
+) -> None:
+    body = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    mtime_ns, size = stamp if stamp is not None else (-1, -1)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, fp, mtime_ns, size, pos, len(body)) + body)
+        os.replace(tmp, path)
+        _prune(path, prefix)
+    except OSError:
+        # é só cache: sem escrita, o próximo load reconstrói a partir do histórico
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def load_used_bits(history: UsageHistory, bank: WordBank, cache_dir: Path) -> int:
+    """
+    Histórico de `history` como bitmap alinhado a `bank` (bit i = bank.index_of(w)).
+
+    Caminho rápido: lê o .bits (uma leitura pequena) e aplica só os eventos do
+    diário gravados depois dele. Se o banco mudou ou o histórico foi compactado,
+    reconstrói a partir do conjunto completo e regrava o .bits.
+    """
+    fp = bytes.fromhex(bank.fingerprint())
+    prefix = _history_prefix(history)
+    path = bits_path_for(history, bank, cache_dir)
+
+    cached = _read(path, fp)
+    if cached is not None:
+        bits, stamp, pos = cached
+        tail = history.tail(stamp, pos)
+        if tail is not None:
+            events, end = tail
+            for op, words in events:
+                bits = bits | bank.bits_for(words) if op == "add" else 0
+            if end != pos:
+                _write(path, prefix, fp, bits, stamp, end)
+            else:
+                try:
+                    os.utime(path)  # último uso (ver MAX_BITS_PER_HISTORY)
+                except OSError:
+                    pass
+            return bits
+
+    used, stamp, pos = history.load_with_position()
+    bits = bank.bits_for(used)
+    _write(path, prefix, fp, bits, stamp, pos)
+    return bits
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import inspect
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from engligen.app import EngligenApp
+
+# Manifesto (JSON): uma lista de jobs ou um objeto
+#   {
+#     "workers": 2,                          # opcional (padrão 1)
+#     "summary": "output/lote_summary.json", # opcional
+#     "booklet": "output/lote.pdf",          # opcional: tudo num caderno PDF único
+#     "defaults": {"reset": false},          # opcional; aplicado a todos os jobs
+#     "jobs": [
+#       {"type": "crossword", "output_basename": "u1_cw", "altura": 12, "largura": 12, "seed": 7},
+#       {"type": "wordsearch", "output_basename": "u1_ws", "size": 15}
+#     ]
+#   }
+# Cada job aceita exatamente os parâmetros de executar_gerador_crossword /
+# executar_gerador_wordsearch (mais "type").
+JOB_TYPES = {
+    "crossword": "executar_gerador_crossword",
+    "wordsearch": "executar_gerador_wordsearch",
+}
+
+
+def _job_params(method_name: str) -> Tuple[set, set]:
+    """(todos os parâmetros, obrigatórios) de um método executar_* da EngligenApp."""
+    sig = inspect.signature(getattr(EngligenApp, method_name))
+    params = {n for n in sig.parameters if n != "self"}
+    required = {n for n, p in sig.parameters.items()
+                if n != "self" and p.default is inspect.Parameter.empty}
+    return params, required
+
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    """Lê e valida o manifesto. Levanta ValueError com a lista de problemas encontrados."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        raw = json.load(f)
+    if isinstance(raw, list):
+        raw = {"jobs": raw}
+    if not isinstance(raw, dict) or not isinstance(raw.get("jobs"), list):
+        raise ValueError("manifesto deve ser uma lista de jobs ou um objeto com 'jobs'")
+
+    defaults = raw.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("'defaults' deve ser um objeto")
+
+    errors: List[str] = []
+    jobs: List[Dict[str, Any]] = []
+    for i, job in enumerate(raw["jobs"]):
+        if not isinstance(job, dict):
+            errors.append(f"job {i}: deve ser um objeto")
+            continue
+        kind = job.get("type")
+        if kind not in JOB_TYPES:
+            errors.append(f"job {i}: 'type' deve ser um de {sorted(JOB_TYPES)}")
+            continue
+        params, required = _job_params(JOB_TYPES[kind])
+        # defaults só valem para os parâmetros que o tipo do job aceita
+        kwargs = {k: v for k, v in defaults.items() if k in params}
+        kwargs.update({k: v for k, v in job.items() if k != "type"})
+        unknown = sorted(set(kwargs) - params)
+        missing = sorted(required - set(kwargs))
+        if unknown:
+            errors.append(f"job {i} ({kind}): parâmetros desconhecidos {unknown}")
+        if missing:
+            errors.append(f"job {i} ({kind}): parâmetros obrigatórios ausentes {missing}")
+        jobs.append({"type": kind, "kwargs": kwargs})
+
+    names = [j["kwargs"].get("output_basename") for j in jobs]
+    dup = sorted({n for n in names if n and names.count(n) > 1})
+    if dup:
+        errors.append(f"output_basename repetido: {dup}")
+    if errors:
+        raise ValueError("\n".join(errors))
+
+    workers = raw.get("workers", 1)
+    return {
+        "jobs": jobs,
+        "workers": int(workers) if isinstance(workers, int) and workers > 0 else 1,
+        "summary": raw.get("summary"),
+        "booklet": raw.get("booklet"),
+    }
+
+
+def run_batch(
+    manifest_path: Path,
+    *,
+    workers: Optional[int] = None,
+    summary_path: Optional[Path] = None,
+    booklet_path: Optional[Path] = None,
+    app: Optional[EngligenApp] = None,
+) -> Dict[str, Any]:
+    """
+    Executa os jobs do manifesto em pipeline (engligen.pipeline) sobre uma única
+    EngligenApp: bancos indexados, históricos, fontes e o pool de processos são
+    reaproveitados entre jobs. `workers` = threads de renderização; a geração do
+    próximo puzzle corre enquanto os anteriores são renderizados. Com `booklet_path`
+    (ou "booklet" no manifesto), em vez de três arquivos por job sai um único caderno
+    PDF (exercícios + dicas, gabaritos no fim), gravado em fluxo. Grava e retorna o
+    resumo da execução.
+    """
+    from engligen.pipeline import run_pipeline
+
+    manifest_path = Path(manifest_path)
+    manifest = load_manifest(manifest_path)
+    app = app or EngligenApp()
+    n_workers = max(1, int(workers or manifest["workers"]))
+    jobs = manifest["jobs"]
+
+    if booklet_path is None and manifest["booklet"]:
+        booklet_path = app._as_path(manifest["booklet"])
+
+    print(f"📄 Lote: {manifest_path.name} — {len(jobs)} job(s), {n_workers} worker(s)")
+    started_at = time.time()
+    pipeline_jobs = [{"type": j["type"], **j["kwargs"]} for j in jobs]
+    booklet_info = None
+    if booklet_path is None:
+        run = run_pipeline(app, pipeline_jobs, render_workers=n_workers)
+    else:
+        from engligen.rendering.booklet import BookletWriter
+
+        booklet_path = Path(booklet_path)
+        booklet_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(booklet_path, "wb") as fh:
+            booklet = BookletWriter(fh)
+            run = run_pipeline(app, pipeline_jobs, render_workers=n_workers, booklet=booklet)
+            booklet.close()
+        booklet_info = {"path": str(booklet_path), "puzzles": booklet.puzzles, "pages": booklet.page_count}
+    results = run["jobs"]
+    elapsed = run["seconds"]
+
+    n_ok = sum(1 for r in results if r["ok"])
+    summary = {
+        "manifest": str(manifest_path.resolve()),
+        "workers": n_workers,
+        "started_at": round(started_at, 3),
+        "seconds": elapsed,
+        "generate_seconds": run["generate_seconds"],
+        "per_minute": run["per_minute"],
+        "total": len(results),
+        "ok": n_ok,
+        "failed": len(results) - n_ok,
+        "jobs": results,
+    }
+    if booklet_info is not None:
+        summary["booklet"] = booklet_info
+
+    if summary_path is None and manifest["summary"]:
+        summary_path = app._as_path(manifest["summary"])
+    if summary_path is None:
+        summary_path = app.output_dir / f"{manifest_path.stem}_summary.json"
+    summary_path = Path(summary_path)
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    for r in results:
+        mark = "✔️" if r["ok"] else "❌"
+        print(f"{mark} [{r['type']}] {r['output_basename']} ({r['seconds']}s)"
+              + ("" if r["ok"] else f" — {r['error']}"))
+    print(f"🎉 Lote concluído: {n_ok}/{len(results)} ok em {elapsed:.1f}s")
+    if booklet_info is not None:
+        print(f"📄 Caderno: {booklet_info['path']} ({booklet_info['pages']} páginas)")
+    print(f"📄 Resumo: {summary_path}")
+    return summary
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
+from typing import Any, Callable, List, Optional, Tuple, Dict
 
 from engligen.app import EngligenApp
+from engligen.storage.bank_cache import BANK_SUFFIXES, load_bank, peek_counts
 
 
 # ----------------- helpers -----------------
@@ -52,10 +53,20 @@ def _confirm_value(label: str, val: str) -> bool:
 
 
 # ----------------- autodetecção -----------------
+def _attempt_seed(seed: Optional[str], attempt: int) -> Optional[str]:
+    """Seed da N-ésima prévia: cada regeneração precisa de outra seed (a mesma repetiria a grade)."""
+    if seed is None or attempt == 0:
+        return seed
+    try:
+        return str(int(seed) + attempt)
+    except ValueError:
+        return f"{seed}-{attempt}"
+
+
 def _scan_wordlists(root: Path) -> List[Path]:
     root.mkdir(parents=True, exist_ok=True)
     out: List[Path] = []
-    for p in sorted(root.glob("*.json")):
+    for p in sorted(q for q in root.iterdir() if q.suffix.lower() in BANK_SUFFIXES):
         if p.name.startswith("used_"): continue
         if p.name.startswith("config"): continue
         out.append(p)
@@ -72,19 +83,19 @@ def _suggest_role(name: str) -> str:
 def _pick_files_interactive(base: Path) -> Tuple[Optional[str], List[str]]:
     files = _scan_wordlists(base)
     if not files:
-        print("Nenhum .json encontrado em data/wordlists/.")
+        print("Nenhum .json/.jsonl encontrado em data/wordlists/.")
         return (None, [])
 
     print("\nArquivos encontrados em data/wordlists:")
     details: Dict[str, Tuple[int,int]] = {}
+    cache_dir = base.parent / ".cache"
     for i, p in enumerate(files, 1):
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                arr = json.load(f)
-            valid = sum(1 for it in arr if isinstance(it, dict) and (it.get('word') or ""))
-            total = len(arr) if isinstance(arr, list) else 0
-        except Exception:
-            valid, total = 0, 0
+        # contagem via header do cache compilado; compila se estiver velho
+        counts = peek_counts(p, cache_dir)
+        if counts is None:
+            bank = load_bank(p, cache_dir)
+            counts = (len(bank), bank.total) if bank is not None else (0, 0)
+        valid, total = counts
         details[p.name] = (valid, total)
         print(f"   {i}) {p.name:<28}  — itens: {valid}/{total}  — sugestão: {_suggest_role(p.name)}")
 
@@ -172,10 +183,13 @@ class Menu:
         largura = _ask_int("Largura (colunas)", 15)
         if not _ask_yes_no(f"Confirma o valor: {float(largura)}?", True): return
 
-        # Mantido por compatibilidade visual (não é usado pelo app)
         seed = _ask("Seed (vazio = aleatória)", default="").strip() or None
         if seed and not _ask_yes_no(f"Confirma o valor: '{seed}'?", True): return
 
+        # Modo da grade: livre (cresce a partir de uma palavra) ou molde fixo de blocos
+        modo = _ask("Grade: [L]ivre, [M]olde simétrico ou caminho de um molde .txt", default="L").strip()
+        template = None if modo.upper() in ("", "L") else ("auto" if modo.upper() == "M" else modo)
+
         common_file = None
         themed_files: List[str] = []
         if _ask_yes_no("Tentar DETECTAR automaticamente os arquivos em data/wordlists?", True):
@@ -192,10 +206,32 @@ class Menu:
         if not _ask_yes_no(f"Confirma o valor: {float(n_words)}?", True): return
         prefer_thematic = _ask_yes_no("Preferir palavras do banco TEMÁTICO ao escolher as exibidas?", True)
 
+        if _ask_yes_no("Pré-visualizar (ASCII + PNG pequeno) antes de gerar as imagens finais?", False):
+            draft = self._preview_loop(basename, lambda attempt: self.app.gerar_crossword(
+                altura=int(altura), largura=int(largura), seed=_attempt_seed(seed, attempt),
+                common_file_override=common_file, themed_files_override=themed_files,
+                registrar=False, template=template,
+            ))
+            if draft is None:
+                return
+            cw, bank = draft
+            if self.app.registrar_crossword(cw, bank):
+                print("❌ O rascunho usa palavras que outra execução registrou agora há pouco. Gere de novo.")
+                return
+            self.app.gravar_saidas(basename, self.app.renderizar_crossword(
+                cw, bank,
+                header_text=(header if header != "" else None),
+                prefill_words_count=int(n_words),
+                prefill_prefer_thematic=prefer_thematic,
+            ))
+            print("🎉 Tudo pronto!")
+            return
+
         ok = self.app.executar_gerador_crossword(
             output_basename=basename,
             altura=int(altura),
             largura=int(largura),
+            seed=seed,
             header_text=(header if header != "" else None),
             # overrides de arquivo (podem ser None)
             common_file_override=common_file,
@@ -203,6 +239,7 @@ class Menu:
             # prefill por PALAVRAS
             prefill_words_count=int(n_words),
             prefill_prefer_thematic=prefer_thematic,
+            template=template,
             reset=False,
         )
         if not ok:
@@ -240,8 +277,7 @@ class Menu:
         elif modo == "o":
             target_occupancy = _ask_float("target_occupancy (0.10–0.75 recomendado)", 0.40)
 
-        seed_txt = _ask("Seed (vazio = aleatória)", default="42").strip()
-        seed_val = int(seed_txt) if seed_txt != "" else None
+        seed_val = _ask("Seed (vazio = aleatória)", default="42").strip() or None
 
         # estilo do gabarito
         def ask_style() -> str:
@@ -264,6 +300,25 @@ class Menu:
                     pass
                 print("Informe um inteiro entre 1 e 20.")
 
+        if _ask_yes_no("Pré-visualizar (ASCII + PNG pequeno) antes de gerar as imagens finais?", False):
+            banks = {"allow_fallback_common": fallback,
+                     "common_file_override": common_file, "themed_files_override": themed_files}
+            ws = self._preview_loop(basename, lambda attempt: self.app.gerar_wordsearch(
+                size=int(size), target_occupancy=target_occupancy, max_words=max_words,
+                seed=_attempt_seed(seed_val, attempt),
+                registrar=False, **banks,
+            ))
+            if ws is None:
+                return
+            if self.app.registrar_wordsearch(ws, **banks):
+                print("❌ O rascunho usa palavras que outra execução registrou agora há pouco. Gere de novo.")
+                return
+            self.app.gravar_saidas(basename, self.app.renderizar_wordsearch(
+                ws, highlight_style=style, stroke_width=stroke
+            ))
+            print("🎉 Tudo pronto!")
+            return
+
         ok = self.app.executar_gerador_wordsearch(
             output_basename=basename,
             size=int(size),
@@ -280,6 +335,36 @@ class Menu:
         if not ok:
             print("✖ Operação não concluída. Veja mensagens acima.")
 
+    # ---------- Prévia ----------
+    def _preview_loop(self, basename: str, gerar: Callable[[int], Any]) -> Any:
+        """
+        Gera rascunhos (sem histórico) e mostra a prévia rápida até o usuário aceitar.
+        Retorna o rascunho aceito, ou None se cancelar/falhar.
+        """
+        preview_path = self.app.output_dir / f"{basename}_previa.png"
+        attempt = 0
+        try:
+            while True:
+                draft = gerar(attempt)
+                if draft is None:
+                    print("✖ Operação não concluída. Veja mensagens acima.")
+                    return None
+                t0 = time.perf_counter()
+                png = self.app.previa(draft[0] if isinstance(draft, tuple) else draft)
+                self.app.output_dir.mkdir(parents=True, exist_ok=True)
+                preview_path.write_bytes(png)
+                print(f"📄 Prévia: {preview_path} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+
+                op = _ask("Aceitar (a), regenerar (r) ou cancelar (c)", default="a").lower()
+                if op.startswith("c"):
+                    print("Operação cancelada.")
+                    return None
+                if not op.startswith("r"):
+                    return draft
+                attempt += 1
+        finally:
+            preview_path.unlink(missing_ok=True)
+
     # ---------- Wizard de unidade ----------
     def _wizard_unidade(self) -> None:
         print("\n▶ Iniciar NOVA UNIDADE")
@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from engligen.app import RESERVE_ATTEMPTS, EngligenApp
+from engligen.core.puzzle_file import PUZZLE_SUFFIX
+from engligen.pipeline import STAGES, open_pool
+from engligen.stock import PuzzleStock
+
+# Serviço HTTP local (engligen serve), só com a stdlib (asyncio):
+#   GET  /health      -> {"ok": true, "active": n, "waiting": n, ...}
+#   POST /crossword   -> corpo JSON com os parâmetros de gerar_crossword + renderizar_crossword
+#   POST /wordsearch  -> idem para o caça-palavras
+#   GET  /stock       -> estoque por unidade (engligen.stock)
+# Resposta: {"ok": true, "type", "seconds", "puzzle": <arquivo de puzzle>, "files": {sufixo: base64}}
+# ("files": false no corpo omite as imagens). Bancos, fontes e o pool de processos das
+# cruzadas ficam quentes entre os pedidos. No máximo `concurrency` puzzles ao mesmo tempo;
+# além disso até `max_waiting` na fila (depois: 503). Cada pedido tem prazo (`timeout`,
+# limitado ao do servidor). A thread gera e renderiza um rascunho (_Draft); o uso só é
+# gravado (reserva atômica) quando o servidor decide responder 200 — vencido o prazo,
+# responde 504 e o puzzle é descartado sem tocar no histórico de uso (o do estoque volta
+# para a fila). Com "unit" (slug de course.units) o pedido usa os bancos da unidade e,
+# sem seed e num tamanho do estoque, sai do estoque na hora. Nos intervalos sem
+# pedidos o servidor repõe o estoque, um puzzle por vez.
+MAX_BODY = 64 * 1024
+READ_TIMEOUT = 10.0
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+    503: "Service Unavailable", 504: "Gateway Timeout",
+}
+# parâmetros controlados pelo servidor (não vêm do corpo do pedido); "reset" ignoraria
+# e sobrescreveria o histórico de uso — não é algo para um formulário da intranet — e os
+# *_override são caminhos no disco do servidor (os bancos de um pedido vêm de "unit")
+_RESERVED = {
+    "self", "pool", "deadline", "cw", "bank", "ws", "reset",
+    "common_file_override", "themed_files_override",
+}
+
+
+# parâmetros de gerar_wordsearch que definem o banco (repassados a registrar_wordsearch)
+_BANK_PARAMS = ("allow_fallback_common", "common_file_override", "themed_files_override")
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _is_words(v: Any) -> bool:
+    return isinstance(v, list) and all(isinstance(w, str) for w in v)
+
+
+# tipo esperado de cada parâmetro vindo do JSON: (verificação, descrição para o 400).
+# None é aceito onde o padrão da assinatura é None. "template" só aceita "auto" ou as
+# linhas do molde — um caminho abriria arquivos do servidor.
+_PARAM_TYPES: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "altura": (lambda v: _is_int(v) and v > 0, "inteiro positivo"),
+    "largura": (lambda v: _is_int(v) and v > 0, "inteiro positivo"),
+    "size": (lambda v: _is_int(v) and v > 0, "inteiro positivo"),
+    "seed": (_is_int, "inteiro"),
+    "max_words": (lambda v: _is_int(v) and v > 0, "inteiro positivo"),
+    "min_words": (lambda v: _is_int(v) and v >= 0, "inteiro >= 0"),
+    "prefill_words_count": (lambda v: _is_int(v) and v >= 0, "inteiro >= 0"),
+    "stroke_width": (lambda v: _is_int(v) and v > 0, "inteiro positivo"),
+    "target_occupancy": (lambda v: (_is_int(v) or isinstance(v, float)) and 0 < v <= 1, "número em (0, 1]"),
+    "registrar": (lambda v: isinstance(v, bool), "booleano"),
+    "allow_fallback_common": (lambda v: isinstance(v, bool), "booleano"),
+    "ink_saver": (lambda v: isinstance(v, bool), "booleano"),
+    "prefill_prefer_thematic": (lambda v: isinstance(v, bool), "booleano"),
+    "header_text": (lambda v: isinstance(v, str), "texto"),
+    "output_format": (lambda v: isinstance(v, str), "texto"),
+    "highlight_style": (lambda v: isinstance(v, str), "texto"),
+    "exclude": (_is_words, "lista de palavras"),
+    "template": (lambda v: v == "auto" or (_is_words(v) and bool(v)), '"auto" ou lista de linhas do molde'),
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _stage_params(app: EngligenApp, kind: str) -> Tuple[set, set, set]:
+    """(geração, renderização, os que aceitam None) — parâmetros aceitos para `kind`."""
+    gerar, renderizar = (getattr(app, name) for name in STAGES[kind])
+    gen_sig, ren_sig = inspect.signature(gerar).parameters, inspect.signature(renderizar).parameters
+    gen = set(gen_sig) - _RESERVED
+    ren = set(ren_sig) - _RESERVED
+    nullable = {name for name, p in {**gen_sig, **ren_sig}.items() if p.default is None}
+    return gen, ren, nullable
+
+
+def _check_types(kind: str, params: Dict[str, Any], nullable: set) -> None:
+    """HttpError 400 para valores do tipo errado (ex.: "size": "abc"), antes de gerar."""
+    for name, value in params.items():
+        if name not in _PARAM_TYPES or (value is None and name in nullable):
+            continue
+        check, expected = _PARAM_TYPES[name]
+        if not check(value):
+            raise HttpError(400, f"parâmetro {name!r} de {kind} deve ser {expected} (recebido: {value!r})")
+
+
+class PuzzleServer:
+    """
+    Mantém uma EngligenApp aquecida e atende pedidos de geração em JSON:
+
+        server = PuzzleServer(port=8765, concurrency=2, timeout=60)
+        asyncio.run(server.serve_forever())
+    """
+
+    def __init__(
+        self,
+        app: Optional[EngligenApp] = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        concurrency: int = 2,
+        max_waiting: int = 8,
+        timeout: float = 60.0,
+        processes: Optional[int] = None,
+    ) -> None:
+        self.app = app or EngligenApp()
+        self.host = host
+        self.port = int(port)
+        self.concurrency = max(1, int(concurrency))
+        self.max_waiting = max(0, int(max_waiting))
+        self.timeout = float(timeout)
+        self.processes = processes
+        self.active = 0
+        self.waiting = 0
+        self.served = 0
+        self._pool = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._params = {kind: _stage_params(self.app, kind) for kind in STAGES}
+        self.stock = PuzzleStock(self.app)
+        self._refill_task: Optional[asyncio.Task] = None
+        # palavras de puzzles gerados e ainda não confirmados (ver _Draft)
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+
+    # ---------- ciclo de vida ----------
+    async def start(self) -> None:
+        """Aquece bancos/fontes, abre o pool e começa a escutar (self.port = porta real)."""
+        t0 = time.perf_counter()
+        self.app.aquecer()
+        self._pool = open_pool(self.processes)
+        self.stock.pool = self._pool
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="serve")
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.stock.enabled and self.stock.per_size > 0:
+            self._refill_task = asyncio.create_task(self._refill_when_idle())
+        print(f"🌐 engligen serve em http://{self.host}:{self.port} "
+              f"(aquecido em {time.perf_counter() - t0:.1f}s; {self.concurrency} simultâneo(s), prazo {self.timeout:g}s)")
+
+    async def close(self) -> None:
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _refill_when_idle(self) -> None:
+        """Repõe o estoque quando não há pedidos: um puzzle por vez, ocupando uma vaga."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.stock.idle_seconds)
+            if self.active or self.waiting or self._slots.locked():
+                continue
+            async with self._slots:
+                try:
+                    made = await loop.run_in_executor(
+                        self._executor, lambda: self.stock.refill(limit=1, should_stop=lambda: self.waiting > 0)
+                    )
+                except Exception as e:  # falha na reposição não derruba o servidor
+                    print(f"⚠️  Reposição do estoque falhou: {type(e).__name__}: {e}")
+                    made = 0
+            if made:
+                await asyncio.sleep(0)  # pedidos que chegaram durante a geração vêm primeiro
+
+    # ---------- HTTP ----------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+                status, payload = 200, await self._route(method, path, body)
+            except HttpError as e:
+                status, payload = e.status, {"ok": False, "error": str(e)}
+            except asyncio.TimeoutError:
+                status, payload = 400, {"ok": False, "error": "pedido incompleto"}
+            except Exception as e:  # um pedido com erro não derruba o servidor
+                status, payload = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n")
+            writer.write(head.encode("latin-1") + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HttpError(400, "linha de requisição inválida")
+        method, target, _version = request_line
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "Content-Length inválido")
+        if length > MAX_BODY:
+            raise HttpError(413, f"corpo maior que {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), urlsplit(target).path.rstrip("/") or "/", body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            return {"ok": True, "active": self.active, "waiting": self.waiting, "served": self.served,
+                    "concurrency": self.concurrency, "timeout": self.timeout}
+        if path == "/stock":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            return {"ok": True, "stock": self.stock.status()}
+        kind = path.lstrip("/")
+        if kind not in STAGES:
+            raise HttpError(404, f"rota desconhecida: {path}")
+        if method != "POST":
+            raise HttpError(405, "use POST com um corpo JSON")
+        try:
+            params = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HttpError(400, f"JSON inválido: {e}")
+        if not isinstance(params, dict):
+            raise HttpError(400, "o corpo deve ser um objeto JSON")
+        return await self.submit(kind, params)
+
+    # ---------- geração ----------
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Gera + renderiza um puzzle respeitando o limite de concorrência e o prazo do pedido."""
+        params = dict(params)
+        with_files = bool(params.pop("files", True))
+        try:
+            timeout = min(self.timeout, float(params.pop("timeout", self.timeout)))
+        except (TypeError, ValueError):
+            raise HttpError(400, "'timeout' deve ser um número (segundos)")
+        unit = params.pop("unit", None)
+        if unit is not None and unit not in self.app.course_units():
+            raise HttpError(400, f"unidade desconhecida: {unit!r} (course.units do config)")
+        gen_names, render_names, nullable = self._params[kind]
+        unknown = sorted(set(params) - gen_names - render_names)
+        if unknown:
+            raise HttpError(400, f"parâmetros desconhecidos para {kind}: {unknown}")
+        _check_types(kind, params, nullable)
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        t0 = time.perf_counter()
+        for _ in range(RESERVE_ATTEMPTS):
+            draft = await self._draft(kind, params, deadline, unit, timeout)
+            # decisão única: dentro do prazo, o uso é gravado e a resposta é 200; fora, 504
+            # e nada fica no histórico (o item do estoque volta para a fila)
+            if time.monotonic() > deadline:
+                draft.rollback()
+                raise HttpError(504, f"prazo de {timeout:g}s esgotado; puzzle descartado")
+            if not await loop.run_in_executor(None, draft.commit):
+                break
+        else:
+            raise HttpError(409, "as palavras sorteadas foram usadas por outra execução; tente de novo")
+
+        self.served += 1
+        outputs = draft.outputs
+        puzzle = json.loads(outputs.pop(PUZZLE_SUFFIX))
+        response: Dict[str, Any] = {"ok": True, "type": kind, "seconds": round(time.perf_counter() - t0, 3),
+                                    "stock": draft.from_stock, "puzzle": puzzle}
+        if with_files:
+            response["files"] = {suffix: base64.b64encode(data).decode("ascii") for suffix, data in outputs.items()}
+        return response
+
+    async def _draft(
+        self, kind: str, params: Dict[str, Any], deadline: float, unit: Optional[str], timeout: float
+    ) -> "_Draft":
+        """Fila + vaga + geração/renderização numa thread; o rascunho ainda não está no histórico."""
+        loop = asyncio.get_running_loop()
+        if self.waiting >= self.max_waiting and self.active >= self.concurrency:
+            raise HttpError(503, "servidor ocupado, tente novamente em instantes")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"prazo de {timeout:g}s esgotado na fila")
+        finally:
+            self.waiting -= 1
+
+        # a vaga só é liberada quando a thread termina (mesmo se o pedido estourar o prazo)
+        self.active += 1
+        fut = loop.run_in_executor(self._executor, self._generate, kind, params, deadline, unit)
+
+        def release(_f) -> None:
+            self.active -= 1
+            self._slots.release()
+
+        fut.add_done_callback(release)
+        try:
+            draft = await asyncio.wait_for(asyncio.shield(fut), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            fut.add_done_callback(_discard_late)  # terminou depois do 504: desfaz
+            raise HttpError(504, f"prazo de {timeout:g}s esgotado; puzzle descartado")
+        if draft is None:
+            if time.monotonic() > deadline:
+                raise HttpError(504, f"prazo de {timeout:g}s esgotado; puzzle descartado")
+            raise HttpError(422, "não foi possível gerar o puzzle com esses parâmetros (veja o log do servidor)")
+        return draft
+
+    def _generate(
+        self, kind: str, params: Dict[str, Any], deadline: float, unit: Optional[str]
+    ) -> Optional["_Draft"]:
+        """
+        Roda numa thread do executor: estoque ou geração (pool quente) + renderização em
+        memória, sem gravar o uso — ver _Draft. None se não deu para gerar.
+        """
+        gen_names, render_names, _ = self._params[kind]
+        gerar, renderizar = (getattr(self.app, name) for name in STAGES[kind])
+        render_kwargs = {k: v for k, v in params.items() if k in render_names}
+        gen_kwargs = {k: v for k, v in params.items() if k in gen_names}
+        registrar = gen_kwargs.pop("registrar", True)
+        if unit is not None:
+            size = (params.get("altura"), params.get("largura")) if kind == "crossword" else (params.get("size"),)
+            # só pedidos "padrão" (tamanho e nada mais) saem do estoque
+            plain = set(gen_kwargs) <= {"altura", "largura", "size"}
+            if plain and registrar and None not in size:
+                claim = self.stock.claim(unit, kind, size)
+                if claim is not None:
+                    args = (claim.puzzle, claim.puzzle.clues) if kind == "crossword" else (claim.puzzle,)
+                    try:
+                        outputs = renderizar(*args, **render_kwargs)
+                    except BaseException:
+                        claim.release()
+                        raise
+                    return _Draft(outputs, True, claim.commit, claim.release)
+            gen_kwargs.update(self.stock.unit_overrides(unit))
+        if "pool" in inspect.signature(gerar).parameters:
+            gen_kwargs["pool"] = self._pool
+
+        # rascunho (registrar=False): as palavras ficam "em voo" até o commit; gerar e
+        # marcá-las na mesma seção do lock de geração faz o próximo pedido já excluí-las
+        with self.app._generation_lock:
+            with self._in_flight_lock:
+                held = self._in_flight | set(gen_kwargs.pop("exclude", None) or ())
+            puzzle = gerar(deadline=deadline, registrar=False, exclude=held, **gen_kwargs)
+            if puzzle is None:
+                return None
+            words = set(puzzle[0].placed_words if isinstance(puzzle, tuple) else puzzle.source_words())
+            if registrar:
+                with self._in_flight_lock:
+                    self._in_flight |= words
+
+        def release() -> None:
+            with self._in_flight_lock:
+                self._in_flight -= words
+
+        def commit() -> Set[str]:
+            try:
+                if kind == "crossword":
+                    return self.app.registrar_crossword(*puzzle)
+                banks = {k: gen_kwargs[k] for k in _BANK_PARAMS if k in gen_kwargs}
+                return self.app.registrar_wordsearch(puzzle, **banks)
+            finally:
+                release()
+
+        args = puzzle if isinstance(puzzle, tuple) else (puzzle,)
+        try:
+            outputs = renderizar(*args, **render_kwargs)
+        except BaseException:
+            release()
+            raise
+        if not registrar:
+            return _Draft(outputs, False, set, lambda: None)
+        return _Draft(outputs, False, commit, release)
+
+
+class _Draft:
+    """
+    Puzzle já renderizado e ainda fora do histórico: `commit()` grava o uso (reserva
+    atômica; retorna as palavras em conflito) e `rollback()` desfaz (devolve o item do
+    estoque / libera as palavras em voo). O servidor chama exatamente um dos dois.
+    """
+
+    def __init__(
+        self, outputs: Dict[str, bytes], from_stock: bool,
+        commit: Callable[[], Set[str]], rollback: Callable[[], None],
+    ) -> None:
+        self.outputs = outputs
+        self.from_stock = from_stock
+        self.commit = commit
+        self.rollback = rollback
+
+
+def _discard_late(fut: "asyncio.Future") -> None:
+    """Callback: o puzzle ficou pronto depois do 504 — nada vai para o histórico."""
+    if not fut.cancelled() and fut.exception() is None and fut.result() is not None:
+        fut.result().rollback()
+
+
+def request_puzzle(url: str, kind: str, *, client_timeout: float = 120.0, **params: Any) -> Dict[str, Any]:
+    """
+    Cliente mínimo (urllib): pede um puzzle a um `engligen serve` e devolve a resposta,
+    com os arquivos já decodificados ({sufixo: bytes}). Erros HTTP viram RuntimeError.
+    `params` vai no corpo (inclusive "timeout", o prazo do pedido no servidor).
+    """
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    req = Request(f"{url.rstrip('/')}/{kind}", data=json.dumps(params).encode("utf-8"),
+                  headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urlopen(req, timeout=client_timeout) as resp:
+            payload = json.loads(resp.read())
+    except HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error")
+        except ValueError:
+            message = e.reason
+        raise RuntimeError(f"HTTP {e.code}: {message}") from None
+    payload["files"] = {k: base64.b64decode(v) for k, v in (payload.get("files") or {}).items()}
+    return payload
+
+
+def run_server(**kwargs: Any) -> None:
+    """Ponto de entrada do `engligen serve` (Ctrl+C encerra)."""
+    server = PuzzleServer(**kwargs)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado.")
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+# `engligen --help` e os subcomandos leves não podem pagar Pillow, multiprocessing,
+# SQLite nem os motores/renderers: tudo isso é importado sob demanda (ver main.py).
+SRC = Path(__file__).resolve().parents[1] / "src"
+HEAVY = ("PIL", "multiprocessing", "sqlite3", "engligen.core", "engligen.rendering", "engligen.app")
+
+
+def _imported_modules(statement: str) -> Set[str]:
+    """Módulos importados por `statement` num interpretador novo (saída de -X importtime)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    names = set()
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            names.add(line.rsplit("|", 1)[1].strip())
+    return names
+
+
+def test_main_import_stays_light() -> None:
+    modules = _imported_modules("import engligen.main")
+    assert "engligen.main" in modules
+    heavy = sorted(m for m in modules if any(m == h or m.startswith(h + ".") for h in HEAVY))
+    assert not heavy, f"import engligen.main carregou módulos pesados: {heavy}"
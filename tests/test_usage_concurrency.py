@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import multiprocessing
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+from engligen.core.wordbank import COMMON, THEMED
+from engligen.storage.history import UsageHistory, reserve_all
+from engligen.storage.sqlite_store import SQLiteWordStore
+
+# Vários processos martelando o mesmo histórico ao mesmo tempo: nenhum uso pode se
+# perder (add/mark_used), nenhuma palavra pode ser reservada duas vezes
+# (reserve_all/reserve_used) nem sair em dois puzzles gerados em paralelo
+# (EngligenApp). compact_every baixo força compactações no meio da disputa.
+PROCESSES = 4
+ROUNDS = 40
+POOL = [f"W{i:03d}" for i in range(60)]
+GENERATIONS = 4
+
+
+def _words_of(worker: int) -> List[str]:
+    return [f"P{worker}X{i:03d}" for i in range(ROUNDS)]
+
+
+def _claims(worker: int) -> List[Tuple[List[str], List[str]]]:
+    """Pedidos de reserva (temáticas, coringa) sorteados do mesmo POOL em todos os processos."""
+    rng = random.Random(worker)
+    return [(rng.sample(POOL, 3), rng.sample(POOL, 2)) for _ in range(ROUNDS)]
+
+
+def _themed_bank(path: Path) -> None:
+    """Banco temático sintético (palavras distintas de 5 a 7 letras, algumas com hífen) para as gerações."""
+    rng = random.Random(0)
+    words = set()
+    while len(words) < 300:
+        w = "".join(rng.choice("ABCDEFGHIJKLMNOPRSTUVW") for _ in range(rng.randint(5, 7)))
+        words.add(w[:3] + "-" + w[3:] if len(words) % 5 == 0 else w)  # a grade guarda sem o hífen
+    path.write_text(json.dumps([{"word": w, "clue": w.lower()} for w in sorted(words)]), encoding="utf-8")
+
+
+# ---------- trabalhadores (nível de módulo: precisam ser importáveis no processo filho) ----------
+def _app_generate(args: Tuple[str, int]) -> List[List[str]]:
+    """Gera caça-palavras com registro no histórico compartilhado; devolve as palavras de cada um."""
+    from engligen.app import EngligenApp
+
+    root, _worker = args
+    app = EngligenApp()
+    app.cache_dir = Path(root) / ".cache"
+    app.used_thematic_path = Path(root) / "used_thematic.json"
+    app.used_common_path = Path(root) / "used_common.json"
+    handed_out = []
+    for _ in range(GENERATIONS):
+        with contextlib.redirect_stdout(io.StringIO()):
+            ws = app.gerar_wordsearch(
+                size=10, max_words=10, allow_fallback_common=False,
+                themed_files_override=[str(Path(root) / "themed.json")],
+            )
+        if ws is not None:
+            handed_out.append(sorted(ws.source_words()))
+    return handed_out
+
+
+def _history_add(args: Tuple[str, int]) -> None:
+    path, worker = args
+    history = UsageHistory(Path(path), compact_every=7)
+    for w in _words_of(worker):
+        history.add([w])
+
+
+def _history_reserve(args: Tuple[str, str, int]) -> List[Tuple[List[str], List[str]]]:
+    themed_path, common_path, worker = args
+    themed, common = UsageHistory(Path(themed_path), compact_every=5), UsageHistory(Path(common_path), compact_every=5)
+    won = []
+    for t, c in _claims(worker):
+        if not reserve_all([(themed, t), (common, c)]):
+            won.append((t, c))
+    return won
+
+
+def _store_mark(args: Tuple[str, int]) -> None:
+    path, worker = args
+    store = SQLiteWordStore(Path(path))
+    try:
+        for w in _words_of(worker):
+            store.mark_used(THEMED, [w])
+    finally:
+        store.close()
+
+
+def _store_reserve(args: Tuple[str, int]) -> List[Tuple[List[str], List[str]]]:
+    path, worker = args
+    store = SQLiteWordStore(Path(path))
+    won = []
+    try:
+        for t, c in _claims(worker):
+            if not store.reserve_used({THEMED: t, COMMON: c}):
+                won.append((t, c))
+    finally:
+        store.close()
+    return won
+
+
+def _run(func, jobs):
+    with multiprocessing.get_context().Pool(PROCESSES) as pool:
+        return pool.map(func, jobs)
+
+
+def _assert_exclusive(results: List[List[Tuple[List[str], List[str]]]], used: Dict[str, set]) -> None:
+    reserved: Dict[str, List[str]] = {THEMED: [], COMMON: []}
+    for won in results:
+        for t, c in won:
+            reserved[THEMED] += t
+            reserved[COMMON] += c
+    assert reserved[THEMED], "nenhuma reserva deu certo"
+    for kind, words in reserved.items():
+        assert len(words) == len(set(words)), f"palavra reservada duas vezes em {kind}"
+        assert set(words) == used[kind]
+
+
+# ---------- testes ----------
+def test_history_add_loses_nothing(tmp_path: Path) -> None:
+    path = tmp_path / "used_thematic_words.json"
+    _run(_history_add, [(str(path), k) for k in range(PROCESSES)])
+    expected = {w for k in range(PROCESSES) for w in _words_of(k)}
+    assert UsageHistory(path).load() == expected
+
+
+def test_history_reserve_all_is_exclusive(tmp_path: Path) -> None:
+    themed, common = tmp_path / "used_thematic_words.json", tmp_path / "used_common_words.json"
+    results = _run(_history_reserve, [(str(themed), str(common), k) for k in range(PROCESSES)])
+    _assert_exclusive(results, {THEMED: UsageHistory(themed).load(), COMMON: UsageHistory(common).load()})
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "engligen.db"
+    SQLiteWordStore(path).close()  # esquema criado antes da disputa
+    return path
+
+
+def test_store_mark_used_loses_nothing(db_path: Path) -> None:
+    _run(_store_mark, [(str(db_path), k) for k in range(PROCESSES)])
+    store = SQLiteWordStore(db_path)
+    try:
+        assert store.load_used(THEMED) == {w for k in range(PROCESSES) for w in _words_of(k)}
+    finally:
+        store.close()
+
+
+def test_store_reserve_used_is_exclusive(db_path: Path) -> None:
+    results = _run(_store_reserve, [(str(db_path), k) for k in range(PROCESSES)])
+    store = SQLiteWordStore(db_path)
+    try:
+        _assert_exclusive(results, {THEMED: store.load_used(THEMED), COMMON: store.load_used(COMMON)})
+    finally:
+        store.close()
+
+
+def test_parallel_generations_never_repeat_words(tmp_path: Path) -> None:
+    _themed_bank(tmp_path / "themed.json")
+    results = _run(_app_generate, [(str(tmp_path), k) for k in range(PROCESSES)])
+    handed_out = [w for puzzles in results for words in puzzles for w in words]
+    assert len(results[0]) > 0, "nenhum puzzle gerado"
+    assert len(handed_out) == len(set(handed_out)), "palavra entregue em dois puzzles"
+    assert set(handed_out) == UsageHistory(tmp_path / "used_thematic.json").load()
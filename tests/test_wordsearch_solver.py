@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List
+
+from engligen.core.wordsearch import WordSearch
+from engligen.core.wordsearch_solver import WordSearchSolver, find_all, verify_placements
+
+# Grade 8×8 montada à mão (semente fixa no preenchimento): horizontal, reversa,
+# as duas diagonais e vertical para cima. O preenchimento só usa letras que não
+# aparecem nas palavras, então cada uma ocorre exatamente onde foi posta.
+SIZE = 8
+PLACED: Dict[str, Dict[str, int]] = {
+    "SMITH": {"r": 0, "c": 0, "dr": 0, "dc": 1},    # →
+    "WEALTH": {"r": 2, "c": 7, "dr": 0, "dc": -1},  # ←
+    "MARKET": {"r": 2, "c": 0, "dr": 1, "dc": 1},   # ↘
+    "PRICE": {"r": 7, "c": 2, "dr": -1, "dc": 1},   # ↗
+    "LEVY": {"r": 7, "c": 7, "dr": -1, "dc": 0},    # ↑
+}
+FILLER = "QZJ"
+
+
+def _grid(placed: Dict[str, Dict[str, int]] = PLACED, seed: int = 26) -> List[List[str]]:
+    rng = random.Random(seed)
+    grid = [[rng.choice(FILLER) for _ in range(SIZE)] for _ in range(SIZE)]
+    for w, pos in placed.items():
+        for i, ch in enumerate(w):
+            r, c = pos["r"] + i * pos["dr"], pos["c"] + i * pos["dc"]
+            assert grid[r][c] in FILLER or grid[r][c] == ch, f"{w} cruza outra palavra em ({r},{c})"
+            grid[r][c] = ch
+    return grid
+
+
+def test_find_all_finds_every_placement() -> None:
+    hits = find_all(_grid(), PLACED)
+    assert hits == {w: [pos] for w, pos in PLACED.items()}
+
+
+def test_find_all_reports_missing_words_and_normalizes() -> None:
+    hits = WordSearchSolver(["wealth", "Levy", "BOND"]).find_all(_grid())
+    assert hits == {"WEALTH": [PLACED["WEALTH"]], "LEVY": [PLACED["LEVY"]], "BOND": []}
+
+
+def test_verify_placements_accepts_the_answer_key() -> None:
+    assert verify_placements(_grid(), PLACED) == {}
+
+
+def test_verify_placements_flags_tampered_grid() -> None:
+    grid = _grid()
+    grid[4][2] = "Q"  # terceira letra de MARKET (diagonal)
+    assert verify_placements(grid, PLACED) == {"MARKET": 0}
+
+    grid = _grid()
+    for i, ch in enumerate("LEVY"):  # segunda cópia de LEVY, na linha livre
+        grid[1][i] = ch
+    assert verify_placements(grid, PLACED) == {"LEVY": 2}
+
+    moved = dict(PLACED, PRICE={"r": 3, "c": 6, "dr": 1, "dc": -1})  # gabarito no sentido errado
+    assert verify_placements(_grid(), moved) == {"PRICE": -1}
+
+
+def test_generated_puzzle_matches_its_answer_key() -> None:
+    words = ["ECONOMICS", "INFLATION", "CAPITAL", "MARKET", "WEALTH", "DEMAND", "SUPPLY", "PRICE"]
+    ws = WordSearch(words, size=12, seed=26)
+    ws.generate()
+    assert set(ws.placed_words) == set(words)
+    directions = {(p["dr"], p["dc"]) for p in ws.placed_words.values()}
+    assert directions - set(WordSearch._DIRS_CANON), "nenhuma palavra reversa"
+    assert directions & {(1, 1), (-1, 1), (1, -1), (-1, -1)}, "nenhuma diagonal"
+    assert ws.find_all() == {w: [pos] for w, pos in ws.placed_words.items()}
+    assert verify_placements(ws.grid, ws.placed_words) == {}